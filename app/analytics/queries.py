@@ -0,0 +1,170 @@
+"""
+Group-by aggregates over analytics snapshots.
+
+This module computes the reports analysts ask for (average score by briefcase
+and hopping, twirl distribution, submissions per day, status counts) with
+vectorised numpy operations over the memory-mapped columns of a Snapshot
+(app/analytics/snapshot.py). Nothing here touches the live database.
+"""
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional, Sequence
+from app.analytics.snapshot import Snapshot, require_numpy
+
+SECONDS_PER_DAY = 86400
+
+# Group keys computed from stored columns
+DERIVED_COLUMNS: Dict[str, Callable[[Snapshot], object]] = {
+    "submission_day": lambda snapshot: snapshot.column("submission_timestamp") // SECONDS_PER_DAY,
+}
+
+# Dense group indexes are used while the product of key ranges stays below this
+_MAX_DENSE_GROUPS = 1 << 24
+
+def key_column(snapshot: Snapshot, name: str):
+    """
+    Return a stored or derived column usable as a group key.
+
+    Args:
+        snapshot (Snapshot): Open snapshot
+        name (str): Column name or a key of DERIVED_COLUMNS
+
+    Returns:
+        numpy.ndarray: Integer key values
+    """
+    if name in DERIVED_COLUMNS:
+        return DERIVED_COLUMNS[name](snapshot)
+    return snapshot.column(name)
+
+def _decode_key(snapshot: Snapshot, name: str, value: int):
+    """Turn an integer key back into its natural value."""
+    if name == "status":
+        return snapshot.statuses[value]
+    if name in ("has_briefcase", "involves_hopping", "is_original", "archived"):
+        return bool(value)
+    if name == "submission_day":
+        return date(1970, 1, 1) + timedelta(days=value)
+    return value
+
+def group_by(
+    snapshot: Snapshot,
+    keys: Sequence[str],
+    value: Optional[str] = None,
+    where=None
+) -> List[dict]:
+    """
+    Count rows (and sum/average a value column) per combination of key columns.
+
+    Keys are small-range integers, so every combination is mapped to a dense
+    group index and aggregated with a single bincount per statistic. Key
+    combinations spanning a very large range fall back to sorting.
+
+    Args:
+        snapshot (Snapshot): Open snapshot
+        keys (Sequence[str]): Key columns (stored or derived)
+        value (Optional[str]): Column to sum and average per group
+        where (Optional[numpy.ndarray]): Boolean mask of rows to include
+
+    Returns:
+        List[dict]: One dict per non-empty group, ordered by the integer key
+        values, with the key values, "count" and, with a value column, "sum" and "mean"
+    """
+    np = require_numpy()
+    key_arrays = [key_column(snapshot, name) for name in keys]
+    values = snapshot.column(value) if value is not None else None
+    if where is not None:
+        key_arrays = [array[where] for array in key_arrays]
+        values = values[where] if values is not None else None
+    if not len(key_arrays[0]):
+        return []
+
+    minimums = [int(array.min()) for array in key_arrays]
+    sizes = [int(array.max()) - minimum + 1 for array, minimum in zip(key_arrays, minimums)]
+    dense = 1
+    for size in sizes:
+        dense *= size
+
+    if dense <= _MAX_DENSE_GROUPS:
+        # Combine the keys in the narrowest integer type that holds every group index
+        index_type = np.min_scalar_type(dense - 1)
+        group_index = None
+        for array, minimum, size in zip(key_arrays, minimums, sizes):
+            part = (array - minimum if minimum else array).astype(index_type, copy=False)
+            group_index = part if group_index is None else group_index * index_type.type(size) + part
+        counts = np.bincount(group_index, minlength=dense)
+        sums = np.bincount(group_index, weights=values, minlength=dense) if values is not None else None
+        present = np.flatnonzero(counts)
+        group_keys = np.unravel_index(present, sizes)
+        group_keys = [keys_of_dim + minimum for keys_of_dim, minimum in zip(group_keys, minimums)]
+        counts = counts[present]
+        sums = sums[present] if sums is not None else None
+    else:
+        stacked = np.stack([array.astype(np.int64) for array in key_arrays], axis=1)
+        unique, inverse, counts = np.unique(stacked, axis=0, return_inverse=True, return_counts=True)
+        inverse = inverse.reshape(-1)
+        sums = np.bincount(inverse, weights=values, minlength=len(unique)) if values is not None else None
+        group_keys = [unique[:, dim] for dim in range(len(keys))]
+
+    groups = []
+    for position in range(len(counts)):
+        group = {name: _decode_key(snapshot, name, int(group_keys[dim][position])) for dim, name in enumerate(keys)}
+        group["count"] = int(counts[position])
+        if sums is not None:
+            group["sum"] = int(sums[position])
+            group["mean"] = float(sums[position]) / group["count"]
+        groups.append(group)
+    return groups
+
+def average_score_by_features(snapshot: Snapshot) -> List[dict]:
+    """
+    Average silliness score per briefcase/hopping combination.
+
+    Args:
+        snapshot (Snapshot): Open snapshot
+
+    Returns:
+        List[dict]: has_briefcase, involves_hopping, count, sum and mean per combination
+    """
+    return group_by(snapshot, ["has_briefcase", "involves_hopping"], value="silliness_score")
+
+def twirl_distribution(snapshot: Snapshot) -> Dict[int, int]:
+    """
+    Number of applications per twirl count.
+
+    Args:
+        snapshot (Snapshot): Open snapshot
+
+    Returns:
+        Dict[int, int]: Twirl count -> applications (counts without applications are omitted)
+    """
+    np = require_numpy()
+    counts = np.bincount(snapshot.column("number_of_twirls").astype(np.intp))
+    return {int(twirls): int(counts[twirls]) for twirls in np.flatnonzero(counts)}
+
+def submissions_per_day(snapshot: Snapshot, since: Optional[date] = None) -> Dict[date, int]:
+    """
+    Number of applications submitted per day (UTC).
+
+    Args:
+        snapshot (Snapshot): Open snapshot
+        since (Optional[date]): Only count submissions on or after this day
+
+    Returns:
+        Dict[date, int]: Day -> submissions, for days with at least one submission
+    """
+    where = None
+    if since is not None:
+        first_second = (since - date(1970, 1, 1)).days * SECONDS_PER_DAY
+        where = snapshot.column("submission_timestamp") >= first_second
+    return {group["submission_day"]: group["count"] for group in group_by(snapshot, ["submission_day"], where=where)}
+
+def status_counts(snapshot: Snapshot) -> Dict[str, int]:
+    """
+    Number of applications per status.
+
+    Args:
+        snapshot (Snapshot): Open snapshot
+
+    Returns:
+        Dict[str, int]: Status -> applications
+    """
+    return {group["status"]: group["count"] for group in group_by(snapshot, ["status"])}
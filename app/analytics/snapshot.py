@@ -0,0 +1,395 @@
+"""
+Memory-mapped columnar snapshots of applications for analytics.
+
+This module exports the applications table (and, optionally, archived
+applications) into a single file of fixed-width integer columns, and opens such
+files as numpy arrays backed directly by a read-only memory map. Reports run
+against the snapshot instead of the live database (see app/analytics/queries.py).
+
+File layout:
+
+    magic        8 bytes  b"SWSNAP01"
+    header size  4 bytes  big-endian
+    header       JSON: row count, creation time, status dictionary and the
+                 dtype and offset of every column; padded to DATA_OFFSET
+    columns      one contiguous little-endian array per column, 64-byte aligned
+
+Exporting needs no third-party packages; reading needs numpy (in requirements.txt).
+"""
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+import uuid
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from datetime import datetime
+from itertools import accumulate
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+from sqlalchemy import BigInteger, Integer, cast, extract, func, select
+from sqlalchemy.engine import Connection, Engine
+from app.db.archive import SegmentStore, archive_store
+from app.models.application import Application, ArchivedApplication
+
+try:
+    import numpy
+except ImportError:  # Only needed to read snapshots, so exporting works without it
+    numpy = None
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+MAGIC = b"SWSNAP01"
+
+_HEADER_SIZE = struct.Struct(">I")
+
+# Column data starts here; the header is written last into the space before it
+DATA_OFFSET = 4096
+
+_ALIGNMENT = 64
+
+EPOCH = datetime(1970, 1, 1)
+
+# (column, dtype) of every snapshot column. Timestamps are seconds since the
+# Unix epoch (UTC); status is a code into the header's status list; archived is
+# 1 for applications read from archive segments.
+SNAPSHOT_COLUMNS = (
+    ("silliness_score", "<i2"),
+    ("score_base", "<i2"),
+    ("score_briefcase", "<i2"),
+    ("score_hopping", "<i2"),
+    ("score_twirls", "<i2"),
+    ("score_originality", "<i2"),
+    ("has_briefcase", "|u1"),
+    ("involves_hopping", "|u1"),
+    ("is_original", "|u1"),
+    ("number_of_twirls", "<i2"),
+    ("hop_count", "<i4"),
+    ("description_length", "<i4"),
+    ("status", "|u1"),
+    ("submission_timestamp", "<i8"),
+    ("updated_at", "<i8"),
+    ("archived", "|u1"),
+)
+
+_TIMESTAMP_COLUMNS = ("submission_timestamp", "updated_at")
+
+# array module type codes with the same item sizes as the dtypes above
+_TYPECODES = {"|u1": "B", "<i2": "h", "<i4": "i", "<i8": "q"}
+
+class SnapshotError(Exception):
+    """A file is not a readable snapshot."""
+
+def _aligned(offset: int) -> int:
+    """Round an offset up to the column alignment."""
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+class SnapshotWriter:
+    """
+    Writes a snapshot of a known number of rows in batches.
+
+    The file is built under a temporary name and renamed into place by close(),
+    so readers of an existing snapshot are never disturbed. Batches may be
+    appended from several threads when each writes its own range of rows.
+    """
+
+    def __init__(self, path: str, row_count: int):
+        self.path = path
+        self.row_count = row_count
+        self.written = 0
+        self.statuses: List[str] = []
+        self._status_codes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        self.columns = []
+        offset = DATA_OFFSET
+        for name, dtype in SNAPSHOT_COLUMNS:
+            self.columns.append({"name": name, "dtype": dtype, "offset": offset})
+            offset = _aligned(offset + row_count * array(_TYPECODES[dtype]).itemsize)
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._temp_path = f"{path}.{os.getpid()}-{uuid.uuid4().hex}.tmp"
+        self._file = open(self._temp_path, "wb")
+        self._file.truncate(offset)
+
+    def status_code(self, status: str) -> int:
+        """Return the code of a status, adding it to the dictionary if new."""
+        code = self._status_codes.get(status)
+        if code is None:
+            with self._lock:
+                code = self._status_codes.get(status)
+                if code is None:
+                    code = len(self.statuses)
+                    self.statuses.append(status)
+                    self._status_codes[status] = code
+        return code
+
+    def append(self, values: Dict[str, Sequence[int]], start: Optional[int] = None) -> int:
+        """
+        Write a batch of encoded rows.
+
+        Args:
+            values (Dict[str, Sequence[int]]): Column name -> integer values (lists
+                or numpy arrays); all columns of SNAPSHOT_COLUMNS, with the same length
+            start (Optional[int]): Row number of the first value; defaults to
+                appending after the rows written so far (single writer only)
+
+        Returns:
+            int: Number of rows written
+        """
+        count = len(values[SNAPSHOT_COLUMNS[0][0]])
+        if start is None:
+            start = self.written
+        if start + count > self.row_count:
+            raise SnapshotError(f"Snapshot {self.path} is sized for {self.row_count} rows")
+        for column in self.columns:
+            column_values = values[column["name"]]
+            if numpy is not None and isinstance(column_values, numpy.ndarray):
+                data = column_values.astype(column["dtype"], copy=False)
+            else:
+                data = array(_TYPECODES[column["dtype"]], column_values)
+                if sys.byteorder == "big":
+                    data.byteswap()
+            os.pwrite(self._file.fileno(), data.tobytes(), column["offset"] + start * data.itemsize)
+        with self._lock:
+            self.written += count
+        return count
+
+    def close(self) -> None:
+        """
+        Write the header and move the snapshot into place.
+
+        Raises:
+            SnapshotError: If fewer rows were appended than the snapshot was sized for
+        """
+        if self.written != self.row_count:
+            self.abort()
+            raise SnapshotError(f"Expected {self.row_count} rows but {self.written} were written")
+
+        header = json.dumps({
+            "row_count": self.row_count,
+            "created_at": datetime.utcnow().isoformat(),
+            "statuses": self.statuses,
+            "columns": self.columns,
+        }).encode("utf-8")
+        if len(MAGIC) + _HEADER_SIZE.size + len(header) > DATA_OFFSET:
+            self.abort()
+            raise SnapshotError("Snapshot header does not fit before the column data")
+
+        self._file.seek(0)
+        self._file.write(MAGIC + _HEADER_SIZE.pack(len(header)) + header)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self._temp_path, self.path)
+
+    def abort(self) -> None:
+        """Discard the partially written snapshot."""
+        self._file.close()
+        try:
+            os.unlink(self._temp_path)
+        except FileNotFoundError:
+            pass
+
+def _epoch_seconds(column, dialect_name: str):
+    """SQL expression converting a DATETIME column to seconds since the epoch."""
+    if dialect_name == "sqlite":
+        return cast(func.strftime("%s", column), Integer)
+    return cast(extract("epoch", column), BigInteger)
+
+def _encode(writer: SnapshotWriter, columns: Dict[str, list], archived: bool) -> Dict[str, Iterable[int]]:
+    """Turn column values read from the database or a segment into snapshot integers."""
+    count = len(columns["status"])
+    encoded = {
+        name: [value or 0 for value in columns[name]]
+        for name, _ in SNAPSHOT_COLUMNS
+        if name not in ("status", "archived") and name not in _TIMESTAMP_COLUMNS
+    }
+    encoded["status"] = [writer.status_code(status) for status in columns["status"]]
+    encoded["archived"] = [int(archived)] * count
+    for name in _TIMESTAMP_COLUMNS:
+        values = columns[name]
+        encoded[name] = [
+            int((value - EPOCH).total_seconds()) if isinstance(value, datetime) else (value or 0)
+            for value in values
+        ]
+    return encoded
+
+def _selected_columns(dialect_name: str) -> list:
+    """Columns of the applications table read for a snapshot, in SNAPSHOT_COLUMNS order."""
+    table = Application.__table__
+    return [
+        _epoch_seconds(table.c[name], dialect_name).label(name) if name in _TIMESTAMP_COLUMNS else table.c[name]
+        for name, _ in SNAPSHOT_COLUMNS
+        if name != "archived"
+    ]
+
+def _export_shard(
+    writer: SnapshotWriter,
+    connection: Connection,
+    start: int,
+    segments: List[int],
+    store: SegmentStore,
+    batch_size: int
+) -> None:
+    """Write the applications of one database, and its archived segments, from row `start` on."""
+    selected = _selected_columns(connection.dialect.name)
+    names = [column.name for column in selected]
+    position = start
+    result = connection.execution_options(yield_per=batch_size).execute(select(*selected))
+    for partition in result.partitions():
+        position += writer.append(_encode(writer, dict(zip(names, zip(*partition))), archived=False), position)
+    for segment in segments:
+        for group in store.scan(segment):
+            position += writer.append(_encode(writer, group, archived=True), position)
+
+def export_snapshot(
+    engines: Union[Engine, Sequence[Engine]],
+    path: str,
+    include_archived: bool = True,
+    store: SegmentStore = archive_store,
+    batch_size: int = 50000
+) -> int:
+    """
+    Write a snapshot of all applications.
+
+    On SQLite the export runs in one read transaction per database, so the
+    applications table and the archive index are seen at the same point in
+    time. With the default rollback journal this blocks writers until the
+    export finishes; run it off peak, or on a copy of the database.
+
+    With several shards, the rows of each shard are counted first and each
+    shard then fills its own range of the snapshot in a separate thread.
+
+    Args:
+        engines (Union[Engine, Sequence[Engine]]): Database engine, or one engine per shard
+        path (str): Snapshot file to write (replaced atomically)
+        include_archived (bool): Also include applications moved to archive segments
+        store (SegmentStore): Segment store of the archive
+        batch_size (int): Rows per batch
+
+    Returns:
+        int: Number of applications in the snapshot
+    """
+    if isinstance(engines, Engine):
+        engines = [engines]
+
+    with ExitStack() as stack:
+        connections = [stack.enter_context(engine.connect()) for engine in engines]
+        row_counts: List[int] = []
+        segments: List[List[int]] = []
+        for connection in connections:
+            if connection.dialect.name == "sqlite":
+                # pysqlite does not begin transactions for reads by itself
+                connection.exec_driver_sql("BEGIN")
+
+            row_count = connection.execute(select(func.count()).select_from(Application.__table__)).scalar()
+            shard_segments: List[int] = []
+            if include_archived:
+                row_count += connection.execute(
+                    select(func.count()).select_from(ArchivedApplication.__table__)
+                ).scalar()
+                shard_segments = list(connection.execute(
+                    select(ArchivedApplication.segment).distinct().order_by(ArchivedApplication.segment)
+                ).scalars())
+            row_counts.append(row_count)
+            segments.append(shard_segments)
+
+        row_count = sum(row_counts)
+        writer = SnapshotWriter(path, row_count)
+        try:
+            starts = [0, *accumulate(row_counts)][:-1]
+            with ThreadPoolExecutor(max_workers=len(connections), thread_name_prefix="snapshot-export") as executor:
+                futures = [
+                    executor.submit(_export_shard, writer, connection, start, shard_segments, store, batch_size)
+                    for connection, start, shard_segments in zip(connections, starts, segments)
+                ]
+                for future in futures:
+                    future.result()
+            writer.close()
+        except BaseException:
+            writer.abort()
+            raise
+
+    logger.info(f"Exported {row_count} applications to snapshot {path}")
+    return row_count
+
+def require_numpy():
+    """Return numpy, or raise a clear error if it is not installed."""
+    if numpy is None:
+        raise ImportError("Reading analytics snapshots requires numpy (pip install -r requirements.txt)")
+    return numpy
+
+class Snapshot:
+    """
+    A read-only, memory-mapped snapshot.
+
+    Columns are numpy arrays over the mapped file: nothing is copied or read
+    until an operation touches the data, and pages are shared between processes.
+    """
+
+    def __init__(self, path: str):
+        np = require_numpy()
+        self.path = path
+        with open(path, "rb") as snapshot_file:
+            self._mmap = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            self._mmap.close()
+            raise SnapshotError(f"{path} is not an analytics snapshot")
+        (header_size,) = _HEADER_SIZE.unpack_from(self._mmap, len(MAGIC))
+        start = len(MAGIC) + _HEADER_SIZE.size
+        header = json.loads(self._mmap[start:start + header_size])
+
+        self.row_count: int = header["row_count"]
+        self.created_at = datetime.fromisoformat(header["created_at"])
+        self.statuses: List[str] = header["statuses"]
+        self._columns = {
+            column["name"]: np.frombuffer(
+                self._mmap, dtype=np.dtype(column["dtype"]), count=self.row_count, offset=column["offset"]
+            )
+            for column in header["columns"]
+        }
+
+    @property
+    def column_names(self) -> List[str]:
+        """Names of the stored columns."""
+        return list(self._columns)
+
+    def column(self, name: str):
+        """
+        Return a column as a read-only numpy array backed by the memory map.
+
+        Args:
+            name (str): Column name
+
+        Returns:
+            numpy.ndarray: Column values
+
+        Raises:
+            KeyError: If the snapshot has no such column
+        """
+        return self._columns[name]
+
+    def status_code(self, status: str) -> Optional[int]:
+        """Return the code of a status in this snapshot, or None if no application has it."""
+        return self.statuses.index(status) if status in self.statuses else None
+
+    def close(self) -> None:
+        """Release the memory map (deferred while arrays derived from it are still alive)."""
+        self._columns = {}
+        try:
+            self._mmap.close()
+        except BufferError:
+            # Views are still referenced; the map is released when they are collected
+            pass
+
+    def __enter__(self) -> "Snapshot":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
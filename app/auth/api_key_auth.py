@@ -3,21 +3,17 @@ API key authentication implementation.
 
 This module provides functions for validating API keys for protected endpoints.
 """
-import os
 import secrets
 from fastapi import HTTPException, Security, status, Depends, Header
 from fastapi.security.api_key import APIKeyHeader
-from dotenv import load_dotenv
+from app.config import get_settings
 import logging
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
-# Load environment variables
-load_dotenv()
-
-# Get API key from environment or use a default for development only
-API_KEY = os.getenv("SILLY_WALK_API_KEY", "development_api_key_replace_in_production")
+# Get API key from settings (a default is used for development only)
+API_KEY = get_settings().api_key
 
 # Define API key header scheme
 api_key_header = APIKeyHeader(name="X-API-Key")
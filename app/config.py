@@ -0,0 +1,137 @@
+"""
+Application configuration.
+
+This module loads environment variables exactly once and exposes them through
+a cached settings object, so modules no longer call load_dotenv() on import.
+"""
+import os
+from functools import lru_cache
+from typing import List, Optional
+from dotenv import load_dotenv
+
+
+def _get_bool(name: str, default: bool = False) -> bool:
+    """Read a boolean flag from the environment."""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+class Settings:
+    """
+    Runtime settings read from the environment (and an optional .env file).
+    """
+
+    def __init__(self):
+        # API key used by the X-API-Key authentication dependency
+        self.api_key: str = os.getenv("SILLY_WALK_API_KEY", "development_api_key_replace_in_production")
+
+        # Database connection string
+        self.database_url: str = os.getenv("DATABASE_URL", "sqlite:///./silly_walks.db")
+
+        # Optional comma-separated database URLs to shard applications over (replaces
+        # DATABASE_URL when set). The order is significant: keep it when adding shards,
+        # and run scripts/rebalance_shards.py after changing the list.
+        self.database_shard_urls: List[str] = [
+            url.strip() for url in os.getenv("DATABASE_SHARD_URLS", "").split(",") if url.strip()
+        ]
+
+        # General application settings
+        self.app_name: str = os.getenv("APP_NAME", "Silly Walk Grant Application Orchestrator")
+        self.debug: bool = _get_bool("DEBUG")
+
+        # Optional pre-built OpenAPI schema (JSON) produced by scripts/build_openapi.py.
+        # When set, the schema is loaded from disk instead of being generated from the routes.
+        self.openapi_schema_file: Optional[str] = os.getenv("OPENAPI_SCHEMA_FILE") or None
+
+        # Readiness probe: how long a probe result is reused, and when to report not-ready
+        self.health_probe_cache_seconds: float = float(os.getenv("HEALTH_PROBE_CACHE_SECONDS", "2"))
+        self.health_probe_timeout_seconds: float = float(os.getenv("HEALTH_PROBE_TIMEOUT_SECONDS", "1"))
+        self.readiness_max_db_latency_ms: float = float(os.getenv("READINESS_MAX_DB_LATENCY_MS", "250"))
+        self.readiness_max_pool_saturation: float = float(os.getenv("READINESS_MAX_POOL_SATURATION", "1.0"))
+
+        # Idempotency-Key records of POST /applications are replayed for this long
+        # (expired ones are purged by scripts/archive_applications.py)
+        self.idempotency_ttl_seconds: float = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+
+        # Response compression (brotli is used when the optional brotli package is installed)
+        self.compression_enabled: bool = _get_bool("COMPRESSION_ENABLED", True)
+        self.compression_min_size: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+        self.compression_gzip_level: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+        self.compression_brotli_quality: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+        # Change feed (Server-Sent Events) of created and updated applications
+        self.change_feed_buffer_size: int = int(os.getenv("CHANGE_FEED_BUFFER_SIZE", "256"))
+        self.change_feed_max_subscribers: int = int(os.getenv("CHANGE_FEED_MAX_SUBSCRIBERS", "10000"))
+        self.change_feed_heartbeat_seconds: float = float(os.getenv("CHANGE_FEED_HEARTBEAT_SECONDS", "15"))
+        self.change_feed_retention: int = int(os.getenv("CHANGE_FEED_RETENTION", "100000"))
+
+        # Compression of long application descriptions at rest (SQLite only):
+        # "off", "zlib" or "zstd" (needs the optional zstandard package), with optional
+        # comma-separated dictionary files from scripts/train_description_dictionary.py.
+        # The first dictionary is used for new values; keep older ones listed to read old rows.
+        self.description_compression: str = os.getenv("DESCRIPTION_COMPRESSION", "off").strip().lower()
+        self.description_compression_min_size: int = int(os.getenv("DESCRIPTION_COMPRESSION_MIN_SIZE", "256"))
+        level = os.getenv("DESCRIPTION_COMPRESSION_LEVEL")
+        self.description_compression_level: Optional[int] = int(level) if level else None
+        self.description_compression_dictionaries: List[str] = [
+            path.strip() for path in os.getenv("DESCRIPTION_COMPRESSION_DICTIONARIES", "").split(",") if path.strip()
+        ]
+
+        # Archive of decided applications (scripts/archive_applications.py): segment
+        # directory, default age before archiving, records per segment and per row group,
+        # and how many decoded row groups are cached for reads
+        self.archive_dir: str = os.getenv("ARCHIVE_DIR", "./archive")
+        self.archive_after_days: float = float(os.getenv("ARCHIVE_AFTER_DAYS", "90"))
+        self.archive_segment_rows: int = int(os.getenv("ARCHIVE_SEGMENT_ROWS", "10000"))
+        self.archive_row_group_size: int = int(os.getenv("ARCHIVE_ROW_GROUP_SIZE", "256"))
+        self.archive_cache_row_groups: int = int(os.getenv("ARCHIVE_CACHE_ROW_GROUPS", "64"))
+
+        # Analytics snapshot written and read by scripts/analytics.py
+        self.analytics_snapshot_path: str = os.getenv("ANALYTICS_SNAPSHOT_PATH", "./analytics/applications.snapshot")
+
+        # Request profiling: fraction of requests profiled, key enabling profiling of a single
+        # request through the X-Debug-Profile header (empty disables the header), latency above
+        # which a request's SQL timings are always captured (0 disables), and the capture ring buffer
+        self.profiling_sample_rate: float = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+        self.profiling_debug_key: str = os.getenv("PROFILING_DEBUG_KEY", "")
+        self.profiling_slow_request_ms: float = float(os.getenv("PROFILING_SLOW_REQUEST_MS", "2000"))
+        self.profiling_dir: str = os.getenv("PROFILING_DIR", "./profiles")
+        self.profiling_max_entries: int = int(os.getenv("PROFILING_MAX_ENTRIES", "200"))
+
+        # Traffic capture for benchmarks/replay.py: fraction of requests recorded, largest
+        # request body recorded, and the size at which a worker's capture file stops growing
+        self.traffic_capture_enabled: bool = _get_bool("TRAFFIC_CAPTURE_ENABLED", False)
+        self.traffic_capture_dir: str = os.getenv("TRAFFIC_CAPTURE_DIR", "./traffic")
+        self.traffic_capture_sample_rate: float = float(os.getenv("TRAFFIC_CAPTURE_SAMPLE_RATE", "1.0"))
+        self.traffic_capture_max_body_bytes: int = int(os.getenv("TRAFFIC_CAPTURE_MAX_BODY_BYTES", "65536"))
+        self.traffic_capture_max_bytes: int = int(os.getenv("TRAFFIC_CAPTURE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+        # Deferred score enrichment: "module:function" enrichers (none keeps scoring synchronous),
+        # worker processes, jobs in flight at once (at most one per worker), queue polling,
+        # retries, and how long one job may run in its worker before the attempt fails
+        self.scoring_enrichers: List[str] = [
+            spec.strip() for spec in os.getenv("SCORING_ENRICHERS", "").split(",") if spec.strip()
+        ]
+        self.scoring_dispatcher_enabled: bool = _get_bool("SCORING_DISPATCHER_ENABLED", True)
+        self.scoring_workers: int = int(os.getenv("SCORING_WORKERS", "2"))
+        self.scoring_max_in_flight: int = int(os.getenv("SCORING_MAX_IN_FLIGHT", str(self.scoring_workers)))
+        self.scoring_poll_interval: float = float(os.getenv("SCORING_POLL_INTERVAL", "1.0"))
+        self.scoring_max_attempts: int = int(os.getenv("SCORING_MAX_ATTEMPTS", "5"))
+        self.scoring_retry_backoff: float = float(os.getenv("SCORING_RETRY_BACKOFF", "5"))
+        self.scoring_job_timeout: float = float(os.getenv("SCORING_JOB_TIMEOUT", "60"))
+
+
+@lru_cache()
+def get_settings() -> Settings:
+    """
+    Return the process-wide settings object.
+
+    The .env file is loaded on the first call only; later calls reuse the cached instance.
+
+    Returns:
+        Settings: Application settings
+    """
+    load_dotenv()
+    return Settings()
@@ -0,0 +1,244 @@
+"""
+Append-only columnar segment files for archived records.
+
+This module stores records that have left the hot database tables. A segment is
+an immutable file of up to a few thousand records, laid out column by column
+within row groups, so reading one record only decompresses its row group:
+
+    magic        8 bytes  b"SWSEG01\\n"
+    row groups   one zlib-compressed JSON array per column
+    footer       zlib-compressed JSON: column names and kinds, the row group
+                 size, and the offset and length of every column chunk
+    trailer      4 bytes footer length (big-endian) + magic
+
+Records are addressed by (segment number, position). The index from record IDs
+to those addresses is kept in the database (see ArchivedApplication).
+"""
+import json
+import logging
+import os
+import re
+import struct
+import uuid
+import zlib
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Iterator, List
+from app.config import get_settings
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+MAGIC = b"SWSEG01\n"
+
+_TRAILER = struct.Struct(">I8s")
+
+_SEGMENT_NAME = re.compile(r"^segment-(\d{8})\.swa$")
+
+# Column kinds: how values are represented in the JSON column chunks
+KIND_VALUE = "value"
+KIND_UUID = "uuid"
+KIND_DATETIME = "datetime"
+
+_ENCODERS = {
+    KIND_VALUE: lambda value: value,
+    KIND_UUID: lambda value: value.hex if value is not None else None,
+    KIND_DATETIME: lambda value: value.isoformat() if value is not None else None,
+}
+
+_DECODERS = {
+    KIND_VALUE: lambda value: value,
+    KIND_UUID: lambda value: uuid.UUID(value) if value is not None else None,
+    KIND_DATETIME: lambda value: datetime.fromisoformat(value) if value is not None else None,
+}
+
+class SegmentError(Exception):
+    """A segment file is missing, truncated or not a segment."""
+
+class SegmentStore:
+    """
+    Directory of append-only columnar segment files.
+
+    Segments are never modified once written, so decoded footers and row groups
+    are cached without invalidation.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        row_group_size: int = 256,
+        cache_row_groups: int = 64,
+        level: int = 6
+    ):
+        self.directory = directory
+        self.row_group_size = row_group_size
+        self.level = level
+        self._footer = lru_cache(maxsize=4096)(self._load_footer)
+        self._row_group = lru_cache(maxsize=cache_row_groups)(self._load_row_group)
+
+    def segment_path(self, segment: int) -> str:
+        """Return the file path of a segment."""
+        return os.path.join(self.directory, f"segment-{segment:08d}.swa")
+
+    def segments(self) -> List[int]:
+        """Return the numbers of all segments, ascending."""
+        if not os.path.isdir(self.directory):
+            return []
+        matches = (_SEGMENT_NAME.match(name) for name in os.listdir(self.directory))
+        return sorted(int(match.group(1)) for match in matches if match)
+
+    def write(self, columns: Dict[str, str], rows: List[dict]) -> int:
+        """
+        Write records to a new segment.
+
+        The file is written and synced under a temporary name and then linked
+        to the next free segment number, so readers never see a partial
+        segment and concurrent writers never share a number.
+
+        Args:
+            columns (Dict[str, str]): Column name -> kind (KIND_VALUE, KIND_UUID or KIND_DATETIME)
+            rows (List[dict]): Records as column name -> value; the list index is the position
+
+        Returns:
+            int: Number of the new segment
+        """
+        names = list(columns)
+        content = bytearray(MAGIC)
+        row_groups = []
+        for start in range(0, len(rows), self.row_group_size):
+            group = rows[start:start + self.row_group_size]
+            chunks = []
+            for name in names:
+                encode = _ENCODERS[columns[name]]
+                chunk = zlib.compress(
+                    json.dumps(
+                        [encode(row.get(name)) for row in group], ensure_ascii=False, separators=(",", ":")
+                    ).encode("utf-8"),
+                    self.level
+                )
+                chunks.append([len(content), len(chunk)])
+                content += chunk
+            row_groups.append({"rows": len(group), "chunks": chunks})
+
+        footer = zlib.compress(json.dumps({
+            "columns": [[name, columns[name]] for name in names],
+            "row_group_size": self.row_group_size,
+            "row_groups": row_groups,
+        }).encode("utf-8"))
+        content += footer + _TRAILER.pack(len(footer), MAGIC)
+
+        os.makedirs(self.directory, exist_ok=True)
+        temp_path = os.path.join(self.directory, f".segment-{os.getpid()}-{uuid.uuid4().hex}.tmp")
+        with open(temp_path, "wb") as segment_file:
+            segment_file.write(content)
+            segment_file.flush()
+            os.fsync(segment_file.fileno())
+
+        try:
+            segment = max(self.segments(), default=0) + 1
+            while True:
+                try:
+                    os.link(temp_path, self.segment_path(segment))
+                    break
+                except FileExistsError:
+                    segment += 1
+        finally:
+            os.unlink(temp_path)
+
+        logger.info(f"Wrote archive segment {segment} with {len(rows)} records ({len(content)} bytes)")
+        return segment
+
+    def discard(self, segment: int) -> None:
+        """
+        Delete a segment that is not referenced by the index (e.g. after a failed move).
+
+        Args:
+            segment (int): Segment number
+        """
+        try:
+            os.unlink(self.segment_path(segment))
+        except FileNotFoundError:
+            pass
+        self._footer.cache_clear()
+        self._row_group.cache_clear()
+
+    def read(self, segment: int, position: int) -> dict:
+        """
+        Read one record.
+
+        Args:
+            segment (int): Segment number
+            position (int): Position of the record within the segment
+
+        Returns:
+            dict: Column name -> value
+
+        Raises:
+            SegmentError: If the segment is missing or corrupt, or the position is out of range
+        """
+        footer = self._footer(segment)
+        group_index, offset = divmod(position, footer["row_group_size"])
+        if group_index >= len(footer["row_groups"]) or offset >= footer["row_groups"][group_index]["rows"]:
+            raise SegmentError(f"Segment {segment} has no record at position {position}")
+        group = self._row_group(segment, group_index)
+        return {name: values[offset] for name, values in group.items()}
+
+    def scan(self, segment: int) -> Iterator[Dict[str, list]]:
+        """
+        Read a whole segment, one row group at a time, bypassing the row group cache.
+
+        Args:
+            segment (int): Segment number
+
+        Yields:
+            Dict[str, list]: Column name -> values of one row group
+
+        Raises:
+            SegmentError: If the segment is missing or corrupt
+        """
+        for group_index in range(len(self._footer(segment)["row_groups"])):
+            yield self._load_row_group(segment, group_index)
+
+    def _load_footer(self, segment: int) -> dict:
+        """Read and decode the footer of a segment."""
+        path = self.segment_path(segment)
+        try:
+            with open(path, "rb") as segment_file:
+                segment_file.seek(-_TRAILER.size, os.SEEK_END)
+                footer_length, magic = _TRAILER.unpack(segment_file.read(_TRAILER.size))
+                if magic != MAGIC:
+                    raise SegmentError(f"{path} is not an archive segment")
+                segment_file.seek(-_TRAILER.size - footer_length, os.SEEK_END)
+                return json.loads(zlib.decompress(segment_file.read(footer_length)))
+        except (OSError, zlib.error, ValueError) as e:
+            raise SegmentError(f"Cannot read archive segment {path}: {str(e)}") from e
+
+    def _load_row_group(self, segment: int, group_index: int) -> Dict[str, list]:
+        """Read and decode all columns of one row group."""
+        footer = self._footer(segment)
+        chunks = footer["row_groups"][group_index]["chunks"]
+        # Column chunks of a row group are contiguous: one read covers them all
+        start = chunks[0][0]
+        end = chunks[-1][0] + chunks[-1][1]
+        path = self.segment_path(segment)
+        try:
+            with open(path, "rb") as segment_file:
+                segment_file.seek(start)
+                data = segment_file.read(end - start)
+            group = {}
+            for (name, kind), (offset, length) in zip(footer["columns"], chunks):
+                decode = _DECODERS[kind]
+                values = json.loads(zlib.decompress(data[offset - start:offset - start + length]))
+                group[name] = [decode(value) for value in values] if kind != KIND_VALUE else values
+            return group
+        except (OSError, zlib.error, ValueError) as e:
+            raise SegmentError(f"Cannot read archive segment {path}: {str(e)}") from e
+
+_settings = get_settings()
+
+# Segment store for archived applications (see ARCHIVE_* settings)
+archive_store = SegmentStore(
+    _settings.archive_dir,
+    row_group_size=_settings.archive_row_group_size,
+    cache_row_groups=_settings.archive_cache_row_groups
+)
@@ -3,30 +3,60 @@ Database connection setup and session management for SQLAlchemy.
 
 This module handles database connection configuration, session management,
 and table creation.
+
+When DATABASE_SHARD_URLS lists several databases, applications are spread over
+them by a hash of their ID (see app/db/sharding.py). SessionLocal then creates
+ShardedSessions, which send each statement to the shard(s) it concerns, and
+fan_out() runs per-shard reads concurrently.
 """
-import os
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from typing import Callable, List
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from dotenv import load_dotenv
-from fastapi import Depends
+from sqlalchemy.ext.horizontal_shard import ShardedSession
+from sqlalchemy.orm import Session, sessionmaker
+from app.config import get_settings
+from app.db.sharding import make_choosers
+
+# Get database URL(s) from settings; shard 0 is also the primary database
+DATABASE_URL = get_settings().database_url
+SHARD_URLS = get_settings().database_shard_urls or [DATABASE_URL]
 
-# Load environment variables
-load_dotenv()
+def _create_engine(url: str) -> Engine:
+    """Create the engine of one database."""
+    # For SQLite, check_same_thread is needed for use in FastAPI
+    # For production, use a connection pool with reasonable pool_size, max_overflow, and pool_recycle
+    return create_engine(
+        url,
+        connect_args={"check_same_thread": False} if url.startswith("sqlite") else {}
+    )
 
-# Get database URL from environment or use default
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./silly_walks.db")
+# Create SQLAlchemy engines, one per shard
+engines: List[Engine] = [_create_engine(url) for url in SHARD_URLS]
+engine = engines[0]
+shard_count = len(engines)
 
-# Create SQLAlchemy engine
-# For SQLite, check_same_thread is needed for use in FastAPI
-# For production, use a connection pool with reasonable pool_size, max_overflow, and pool_recycle
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
-)
+# Plain sessions bound to a single shard, for per-shard jobs and fan-out reads
+shard_sessions: List[sessionmaker] = [
+    sessionmaker(autocommit=False, autoflush=False, bind=shard_engine) for shard_engine in engines
+]
 
 # Create sessionmaker
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+if shard_count == 1:
+    SessionLocal = shard_sessions[0]
+else:
+    SessionLocal = sessionmaker(
+        class_=ShardedSession,
+        autocommit=False,
+        autoflush=False,
+        shards=dict(enumerate(engines)),
+        **make_choosers(shard_count)
+    )
+
+# Runs per-shard reads of one request side by side
+_fan_out_executor = ThreadPoolExecutor(max_workers=4 * shard_count, thread_name_prefix="shard-fan-out")
 
 # Create base class for models
 Base = declarative_base()
@@ -45,12 +75,63 @@ def get_db():
     finally:
         db.close()
 
+def session_shard_count(db: Session) -> int:
+    """Return the number of shards a session spans (1 for plain sessions)."""
+    return shard_count if isinstance(db, ShardedSession) else 1
+
+def is_sharded(db: Session) -> bool:
+    """Whether a session spans several shards."""
+    return session_shard_count(db) > 1
+
+def fan_out(db: Session, reader: Callable, *args) -> list:
+    """
+    Run a repository function on every shard concurrently.
+
+    Each shard gets its own short-lived plain session, so the function runs
+    unchanged on a single database and sees committed data only, not pending
+    changes of `db`. The caller's context variables (e.g. request profiling) are
+    visible in the shard threads. On a plain session the function just runs on it.
+
+    Args:
+        db (Session): Session of the caller
+        reader (Callable): Function taking a session and `args`
+        *args: Further arguments for `reader`
+
+    Returns:
+        list: Result of `reader` per shard, in shard order
+    """
+    if not is_sharded(db):
+        return [reader(db, *args)]
+
+    def run(session_factory: sessionmaker):
+        shard_db = session_factory()
+        try:
+            return reader(shard_db, *args)
+        finally:
+            shard_db.close()
+
+    futures = [
+        _fan_out_executor.submit(copy_context().run, run, session_factory) for session_factory in shard_sessions
+    ]
+    return [future.result() for future in futures]
+
 def create_tables():
     """
-    Create database tables for all models that inherit from Base.
+    Create database tables for all models that inherit from Base, on every shard.
     Should be called at application startup.
     """
     # Import models here to avoid circular imports
+    from sqlalchemy import inspect
     from app.models.application import Application
+    from app.db.migrations import run_migrations, stamp_latest
+
+    for shard_engine in engines:
+        is_new_database = not inspect(shard_engine).has_table(Application.__tablename__)
+
+        Base.metadata.create_all(bind=shard_engine)
 
-    Base.metadata.create_all(bind=engine)
+        # Fresh databases already have the latest schema; older ones are upgraded in place
+        if is_new_database:
+            stamp_latest(shard_engine)
+        else:
+            run_migrations(shard_engine)
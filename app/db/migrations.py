@@ -0,0 +1,223 @@
+"""
+Lightweight schema migrations for SQLite databases.
+
+SQLite databases track the applied schema version in PRAGMA user_version.
+New databases are created at the latest version by create_tables(); existing
+ones are upgraded step by step on startup. Other databases are expected to be
+managed with dedicated migration tooling.
+
+Run manually with:
+    python -m app.db.migrations
+"""
+import logging
+from typing import Callable, List, Tuple
+import uuid
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+def _binary_uuid_keys(connection: Connection, batch_size: int = 10000) -> None:
+    """
+    Convert application IDs stored as 32-character hex strings to 16-byte blobs
+    and drop the redundant index on the primary key.
+    """
+    connection.execute(text("DROP INDEX IF EXISTS ix_applications_id"))
+
+    converted = 0
+    while True:
+        rows = connection.execute(
+            text("SELECT rowid, id FROM applications WHERE typeof(id) = 'text' LIMIT :limit"),
+            {"limit": batch_size}
+        ).fetchall()
+        if not rows:
+            break
+        connection.execute(
+            text("UPDATE applications SET id = :id WHERE rowid = :rowid"),
+            [{"id": uuid.UUID(row.id).bytes, "rowid": row.rowid} for row in rows]
+        )
+        converted += len(rows)
+
+    if converted:
+        logger.info(f"Converted {converted} application IDs to binary storage")
+
+def _add_column(connection: Connection, table: str, column: str, ddl: str) -> None:
+    """Add a column unless it already exists."""
+    existing = {row.name for row in connection.execute(text(f"PRAGMA table_info({table})"))}
+    if column not in existing:
+        connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+def _application_version(connection: Connection) -> None:
+    """Add the optimistic-concurrency version column."""
+    _add_column(connection, "applications", "version", "INTEGER NOT NULL DEFAULT 1")
+
+def _application_updated_at(connection: Connection) -> None:
+    """Add the last-modified timestamp, initialised to the submission time."""
+    _add_column(connection, "applications", "updated_at", "DATETIME")
+    connection.execute(text("UPDATE applications SET updated_at = submission_timestamp WHERE updated_at IS NULL"))
+
+def _application_changes(connection: Connection) -> None:
+    """Create the changelog table behind the change feed."""
+    # Imported here because the models import the database module
+    from app.models.application import ApplicationChange
+
+    ApplicationChange.__table__.create(connection, checkfirst=True)
+
+def _scoring_features(connection: Connection, batch_size: int = 10000) -> None:
+    """
+    Add the derived scoring feature and score breakdown columns, index hop_count,
+    and backfill them from the stored descriptions and scores.
+    """
+    from app.utils.scoring_rules import ORIGINALITY_POINTS, count_hops, score_breakdown
+
+    for column in (
+        "description_length", "hop_count", "is_original",
+        "score_base", "score_briefcase", "score_hopping", "score_twirls", "score_originality",
+    ):
+        _add_column(connection, "applications", column, "INTEGER NOT NULL DEFAULT 0")
+    connection.execute(text("CREATE INDEX IF NOT EXISTS ix_applications_hop_count ON applications (hop_count)"))
+
+    last_rowid = 0
+    backfilled = 0
+    while True:
+        rows = connection.execute(
+            text(
+                "SELECT rowid, description, has_briefcase, number_of_twirls, silliness_score "
+                "FROM applications WHERE rowid > :last_rowid ORDER BY rowid LIMIT :limit"
+            ),
+            {"last_rowid": last_rowid, "limit": batch_size}
+        ).fetchall()
+        if not rows:
+            break
+
+        updates = []
+        for row in rows:
+            features = {
+                "description_length": len(row.description),
+                "hop_count": count_hops(row.description),
+                "has_briefcase": bool(row.has_briefcase),
+                "number_of_twirls": row.number_of_twirls,
+            }
+            # The originality bonus is the only component not derivable from the
+            # row; recover it from the score that was stored at submission
+            without_originality = score_breakdown(is_original=False, **features)
+            is_original = row.silliness_score - without_originality.total >= ORIGINALITY_POINTS
+            breakdown = score_breakdown(is_original=is_original, **features)
+            updates.append({
+                "rowid": row.rowid,
+                "description_length": features["description_length"],
+                "hop_count": features["hop_count"],
+                "is_original": is_original,
+                "score_base": breakdown.base,
+                "score_briefcase": breakdown.briefcase,
+                "score_hopping": breakdown.hopping,
+                "score_twirls": breakdown.twirls,
+                "score_originality": breakdown.originality,
+            })
+        connection.execute(
+            text(
+                "UPDATE applications SET description_length = :description_length, hop_count = :hop_count, "
+                "is_original = :is_original, score_base = :score_base, score_briefcase = :score_briefcase, "
+                "score_hopping = :score_hopping, score_twirls = :score_twirls, "
+                "score_originality = :score_originality WHERE rowid = :rowid"
+            ),
+            updates
+        )
+        last_rowid = rows[-1].rowid
+        backfilled += len(rows)
+
+    if backfilled:
+        logger.info(f"Backfilled scoring features for {backfilled} applications")
+
+def _archived_applications(connection: Connection) -> None:
+    """Create the index of applications moved to archive segments."""
+    from app.models.application import ArchivedApplication
+
+    ArchivedApplication.__table__.create(connection, checkfirst=True)
+
+def _scoring_jobs(connection: Connection) -> None:
+    """Add the score status and enrichment columns and create the scoring job queue."""
+    from app.models.application import ScoringJob
+
+    _add_column(connection, "applications", "score_enrichment", "INTEGER NOT NULL DEFAULT 0")
+    _add_column(connection, "applications", "score_status", "VARCHAR(20) NOT NULL DEFAULT 'final'")
+    ScoringJob.__table__.create(connection, checkfirst=True)
+
+def _idempotency_keys(connection: Connection) -> None:
+    """Create the table of Idempotency-Key records."""
+    from app.models.application import IdempotencyKey
+
+    IdempotencyKey.__table__.create(connection, checkfirst=True)
+
+# Ordered list of (version, description, upgrade function)
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "store application IDs as 16-byte binary UUIDs", _binary_uuid_keys),
+    (2, "add applications.version", _application_version),
+    (3, "add applications.updated_at", _application_updated_at),
+    (4, "add application_changes changelog", _application_changes),
+    (5, "add scoring feature columns", _scoring_features),
+    (6, "add archived_applications index", _archived_applications),
+    (7, "add score status and scoring_jobs queue", _scoring_jobs),
+    (8, "add idempotency_keys", _idempotency_keys),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+def get_schema_version(connection: Connection) -> int:
+    """
+    Read the schema version of a SQLite database.
+
+    Args:
+        connection (Connection): Database connection
+
+    Returns:
+        int: Applied schema version (0 for databases created before versioning)
+    """
+    return connection.exec_driver_sql("PRAGMA user_version").scalar()
+
+def stamp_latest(engine: Engine) -> None:
+    """
+    Mark a freshly created SQLite database as being at the latest version.
+
+    Args:
+        engine (Engine): Database engine
+    """
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.begin() as connection:
+        connection.exec_driver_sql(f"PRAGMA user_version = {LATEST_VERSION}")
+
+def run_migrations(engine: Engine) -> int:
+    """
+    Apply pending migrations to an existing SQLite database.
+
+    Each migration runs in its own transaction together with the version bump,
+    so an interrupted upgrade resumes where it stopped.
+
+    Args:
+        engine (Engine): Database engine
+
+    Returns:
+        int: Number of migrations applied
+    """
+    if engine.dialect.name != "sqlite":
+        return 0
+
+    applied = 0
+    for version, description, upgrade in MIGRATIONS:
+        with engine.begin() as connection:
+            if get_schema_version(connection) >= version:
+                continue
+            logger.info(f"Applying schema migration {version}: {description}")
+            upgrade(connection)
+            connection.exec_driver_sql(f"PRAGMA user_version = {version}")
+        applied += 1
+    return applied
+
+if __name__ == "__main__":
+    from app.db.database import engines
+
+    logging.basicConfig(level=logging.INFO)
+    count = sum(run_migrations(shard_engine) for shard_engine in engines)
+    print(f"Applied {count} migration(s)")
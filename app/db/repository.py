@@ -4,42 +4,249 @@ Data access layer for CRUD operations.
 This module provides an abstraction layer for database operations,
 hiding the implementation details from the service layer.
 """
-from typing import List, Optional
+from collections import defaultdict
+from datetime import datetime, timedelta
+from operator import attrgetter
+from typing import Iterable, List, Optional
 from uuid import UUID
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, undefer
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.exc import SQLAlchemyError
-from app.models.application import Application
-from app.models.schemas import ApplicationCreate, ApplicationUpdate
-from sqlalchemy import text
+from app.config import get_settings
+from app.db.database import fan_out, is_sharded, session_shard_count
+from app.db.sharding import merge_pages, shard_for, uuid7_on_shard
+from app.models.application import (
+    SCORE_ENRICHMENT_FAILED,
+    SCORE_FINAL,
+    SCORE_PROVISIONAL,
+    Application,
+    ApplicationChange,
+    ArchivedApplication,
+    IdempotencyKey,
+    ScoringJob,
+)
+from app.models.schemas import ApplicationCreate, ApplicationResponse, ApplicationSummary, ApplicationUpdate
+from app.utils import scoring_rules
+from app.utils.broadcast import change_feed_hub
+from sqlalchemy import and_, bindparam, case, delete, func, insert, literal, or_, select, text, update
 import logging
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# IDs per statement in set-based updates (stays below SQLite's bound-parameter limit)
+BULK_CHUNK_SIZE = 500
+
+# Old changelog rows are pruned whenever a sequence number crosses a multiple of this
+CHANGELOG_PRUNE_INTERVAL = 1000
+
+class ApplicationChangeRepository:
+    """
+    Repository for the changelog behind the change feed.
+
+    Changes are recorded in the same transaction as the application write, and
+    published to the in-process broadcast hub once that transaction commits.
+    Each shard keeps the changelog of its own applications, with its own
+    sequence numbers; every row carries the number of its shard.
+    """
+
+    @staticmethod
+    def record(db: Session, changes: List[dict]) -> list:
+        """
+        Append changes to the changelog without committing.
+
+        Args:
+            db (Session): Database session with the pending application write
+            changes (List[dict]): application_id, change, status, version and changed_at per change
+
+        Returns:
+            list: Recorded rows including their shard and sequence numbers, in
+            sequence order per shard
+        """
+        shard_count = session_shard_count(db)
+        changes_by_shard = defaultdict(list)
+        for change in changes:
+            changes_by_shard[shard_for(change["application_id"], shard_count)].append(change)
+
+        changelog = ApplicationChange.__table__
+        rows = []
+        for shard, shard_changes in sorted(changes_by_shard.items()):
+            statement = insert(changelog).returning(
+                literal(shard).label("shard"),
+                changelog.c.seq,
+                changelog.c.application_id,
+                changelog.c.change,
+                changelog.c.status,
+                changelog.c.version,
+                changelog.c.changed_at,
+            )
+            bind_arguments = {"shard_id": shard}
+            if len(shard_changes) == 1:
+                shard_rows = db.execute(statement.values(**shard_changes[0]), bind_arguments=bind_arguments).all()
+            else:
+                shard_rows = sorted(
+                    db.execute(statement, shard_changes, bind_arguments=bind_arguments).all(),
+                    key=lambda row: row.seq
+                )
+
+            if shard_rows and any(row.seq % CHANGELOG_PRUNE_INTERVAL == 0 for row in shard_rows):
+                ApplicationChangeRepository.prune(
+                    db, shard_rows[-1].seq - get_settings().change_feed_retention, shard
+                )
+            rows.extend(shard_rows)
+        return rows
+
+    @staticmethod
+    def publish(rows: list) -> None:
+        """
+        Publish committed changes to change feed subscribers in this process.
+
+        Args:
+            rows (list): Rows returned by record()
+        """
+        change_feed_hub.publish(rows)
+
+    @staticmethod
+    def prune(db: Session, up_to_seq: int, shard: int = 0) -> None:
+        """
+        Delete changelog rows up to and including a sequence number, without committing.
+
+        Args:
+            db (Session): Database session
+            up_to_seq (int): Highest sequence number to delete
+            shard (int): Shard whose changelog to prune
+        """
+        if up_to_seq > 0:
+            db.execute(
+                delete(ApplicationChange).where(ApplicationChange.seq <= up_to_seq),
+                bind_arguments={"shard_id": shard}
+            )
+
+    @staticmethod
+    def get_since(db: Session, after_seq: int, limit: int = 500, shard: int = 0) -> list:
+        """
+        Get changes after a sequence number, oldest first.
+
+        Args:
+            db (Session): Session bound to a single shard
+            after_seq (int): Last sequence number the caller has seen
+            limit (int): Maximum number of changes to return
+            shard (int): Number of that shard, reported in each row
+
+        Returns:
+            list: Changelog rows
+        """
+        return db.execute(
+            select(
+                literal(shard).label("shard"),
+                ApplicationChange.seq,
+                ApplicationChange.application_id,
+                ApplicationChange.change,
+                ApplicationChange.status,
+                ApplicationChange.version,
+                ApplicationChange.changed_at,
+            )
+            .where(ApplicationChange.seq > after_seq)
+            .order_by(ApplicationChange.seq)
+            .limit(limit)
+        ).all()
+
+    @staticmethod
+    def get_bounds(db: Session):
+        """
+        Get the lowest and highest retained sequence numbers.
+
+        Args:
+            db (Session): Session bound to a single shard
+
+        Returns:
+            Row: Row with first_seq and last_seq (both None if the changelog is empty)
+        """
+        return db.execute(
+            select(
+                func.min(ApplicationChange.seq).label("first_seq"),
+                func.max(ApplicationChange.seq).label("last_seq"),
+            )
+        ).one()
+
+    @staticmethod
+    def change_of(application: Application, change: str) -> dict:
+        """Build the changelog entry for an application that was just written."""
+        return {
+            "application_id": application.id,
+            "change": change,
+            "status": application.status,
+            "version": application.version,
+            "changed_at": application.updated_at or datetime.utcnow(),
+        }
+
+def _loaded_columns(application: Application) -> dict:
+    """Column values currently loaded on an application."""
+    return {
+        column.key: application.__dict__[column.key]
+        for column in Application.__mapper__.column_attrs
+        if column.key in application.__dict__
+    }
+
+def _restore_columns(application: Application, values: dict) -> None:
+    """
+    Set column values as committed state again after a commit expired them.
+
+    Only for values known to match the database, e.g. just written or returned
+    by the statement that changed the row; saves reloading the row.
+    """
+    for key, value in values.items():
+        set_committed_value(application, key, value)
+
 class ApplicationRepository:
     """
     Repository for Application entity CRUD operations.
     """
 
     @staticmethod
-    def create(db: Session, application: Application) -> Application:
+    def create(
+        db: Session,
+        application: Application,
+        enqueue_scoring: bool = False,
+        idempotency_key: Optional[IdempotencyKey] = None
+    ) -> Application:
         """
         Create a new application in the database.
 
         Args:
             db (Session): Database session
             application (Application): Application model instance
+            enqueue_scoring (bool): Also queue a scoring job for its enrichment, in the same transaction
+            idempotency_key (Optional[IdempotencyKey]): Idempotency-Key record (key, fingerprint and
+                status code set) to store with the response, in the same transaction
 
         Returns:
             Application: Created application with generated ID
 
         Raises:
+            IntegrityError: If another request committed the same idempotency key first
             SQLAlchemyError: If database operation fails
         """
         try:
+            if idempotency_key is not None and application.id is None:
+                # Keep the application on the shard of its key, so both are written in one transaction
+                shard_count = session_shard_count(db)
+                application.id = uuid7_on_shard(shard_for(idempotency_key.key, shard_count), shard_count)
             db.add(application)
+            db.flush()
+            if enqueue_scoring:
+                ScoringJobRepository.enqueue(db, application.id)
+            changes = ApplicationChangeRepository.record(
+                db, [ApplicationChangeRepository.change_of(application, "created")]
+            )
+            if idempotency_key is not None:
+                IdempotencyKeyRepository.record(db, idempotency_key, application)
+            # Every column was just written from these values (the insert sets no
+            # server-side defaults), so keep them instead of reloading the row
+            written = _loaded_columns(application)
             db.commit()
-            db.refresh(application)
+            _restore_columns(application, written)
+            ApplicationChangeRepository.publish(changes)
             return application
         except SQLAlchemyError as e:
             db.rollback()
@@ -58,22 +265,84 @@ class ApplicationRepository:
         Returns:
             Optional[Application]: Application if found, None otherwise
         """
-        return db.query(Application).filter(Application.id == application_id).first()
+        return (
+            db.query(Application)
+            .options(undefer(Application.description))
+            .filter(Application.id == application_id)
+            .first()
+        )
 
     @staticmethod
-    def get_all(db: Session, skip: int = 0, limit: int = 100) -> List[Application]:
+    def get_all(
+        db: Session,
+        skip: int = 0,
+        limit: int = 100,
+        min_hop_count: Optional[int] = None
+    ) -> List[Application]:
         """
         Get a list of applications with pagination.
 
+        On a sharded database every shard returns its first skip + limit
+        applications by ID and the pages are merged, so deep pages cost more
+        per shard than shallow ones.
+
         Args:
             db (Session): Database session
             skip (int): Number of records to skip
             limit (int): Maximum number of records to return
+            min_hop_count (Optional[int]): Only return applications with at least this many hop words
 
         Returns:
             List[Application]: List of applications
         """
-        return db.query(Application).offset(skip).limit(limit).all()
+        if is_sharded(db):
+            pages = fan_out(db, ApplicationRepository.get_all, 0, skip + limit, min_hop_count)
+            return merge_pages(pages, skip, limit, key=attrgetter("id"))
+
+        query = db.query(Application).options(undefer(Application.description))
+        if min_hop_count is not None:
+            query = query.filter(Application.hop_count >= min_hop_count)
+        return query.order_by(Application.id).offset(skip).limit(limit).all()
+
+    @staticmethod
+    def get_summaries(
+        db: Session,
+        skip: int = 0,
+        limit: int = 100,
+        min_hop_count: Optional[int] = None
+    ) -> List[ApplicationSummary]:
+        """
+        Get a page of application summaries, in the same order as get_all.
+
+        Selects only the summary columns with a Core query, so neither the
+        description text nor ORM identity-map entries are loaded.
+
+        Args:
+            db (Session): Database session
+            skip (int): Number of records to skip
+            limit (int): Maximum number of records to return
+            min_hop_count (Optional[int]): Only return applications with at least this many hop words
+
+        Returns:
+            List[ApplicationSummary]: Summary rows
+        """
+        if is_sharded(db):
+            pages = fan_out(db, ApplicationRepository.get_summaries, 0, skip + limit, min_hop_count)
+            return merge_pages(pages, skip, limit, key=attrgetter("id"))
+
+        statement = select(
+            Application.id,
+            Application.walk_name,
+            Application.applicant_name,
+            Application.silliness_score,
+            Application.status,
+            Application.version,
+            Application.updated_at,
+        )
+        if min_hop_count is not None:
+            statement = statement.where(Application.hop_count >= min_hop_count)
+        statement = statement.order_by(Application.id).offset(skip).limit(limit)
+        return [ApplicationSummary._make(row) for row in db.execute(statement)]
 
     @staticmethod
     def update(db: Session, application: Application, updated_data: ApplicationUpdate) -> Application:
@@ -95,14 +364,257 @@ class ApplicationRepository:
             for key, value in updated_data.dict(exclude_unset=True).items():
                 setattr(application, key, value)
 
+            description = application.description
+            db.flush()
+            changes = ApplicationChangeRepository.record(
+                db, [ApplicationChangeRepository.change_of(application, "updated")]
+            )
             db.commit()
             db.refresh(application)
+            set_committed_value(application, "description", description)
+            ApplicationChangeRepository.publish(changes)
             return application
         except SQLAlchemyError as e:
             db.rollback()
             logger.error(f"Error updating application: {str(e)}")
             raise
 
+    @staticmethod
+    def update_status(
+        db: Session,
+        application_id: UUID,
+        new_status: str,
+        allowed_from: Iterable[str],
+        expected_version: Optional[int] = None
+    ) -> Optional[Application]:
+        """
+        Change the status of one application with a single conditional UPDATE.
+
+        The row is only updated if its current status is in `allowed_from` and,
+        when given, its version equals `expected_version`. No row is loaded or
+        locked beforehand.
+
+        Args:
+            db (Session): Database session
+            application_id (UUID): Application UUID
+            new_status (str): Target status
+            allowed_from (Iterable[str]): Statuses the application may currently have
+            expected_version (Optional[int]): Version the caller last saw
+
+        Returns:
+            Optional[Application]: The updated application, or None if no row matched
+
+        Raises:
+            SQLAlchemyError: If database operation fails
+        """
+        statement = (
+            update(Application)
+            .where(Application.id == application_id, Application.status.in_(list(allowed_from)))
+            .values(status=new_status, version=Application.version + 1)
+            .returning(Application)
+            .options(undefer(Application.description))
+            .execution_options(synchronize_session=False)
+        )
+        if expected_version is not None:
+            statement = statement.where(Application.version == expected_version)
+
+        try:
+            updated = db.execute(statement).scalars().first()
+            changes = []
+            returned = {}
+            if updated is not None:
+                returned = _loaded_columns(updated)
+                changes = ApplicationChangeRepository.record(
+                    db, [ApplicationChangeRepository.change_of(updated, "status_changed")]
+                )
+            db.commit()
+            if updated is not None:
+                # RETURNING gave the whole row; keep it instead of reloading it
+                _restore_columns(updated, returned)
+            ApplicationChangeRepository.publish(changes)
+            return updated
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Error updating application status: {str(e)}")
+            raise
+
+    @staticmethod
+    def bulk_update_status(
+        db: Session,
+        application_ids: List[UUID],
+        new_status: str,
+        allowed_from: Iterable[str]
+    ) -> List[UUID]:
+        """
+        Change the status of many applications with set-based UPDATEs.
+
+        Rows whose current status is not in `allowed_from` are left untouched, so
+        concurrent reviewers cannot overwrite each other's transitions. All
+        chunks run in one transaction per shard; shards commit one after the
+        other, so a failed commit can leave earlier shards updated.
+
+        Args:
+            db (Session): Database session
+            application_ids (List[UUID]): Applications to update
+            new_status (str): Target status
+            allowed_from (Iterable[str]): Statuses the applications may currently have
+
+        Returns:
+            List[UUID]: IDs of the applications that were updated
+
+        Raises:
+            SQLAlchemyError: If database operation fails
+        """
+        allowed_from = list(allowed_from)
+        updated_ids: List[UUID] = []
+        changes = []
+        try:
+            for start in range(0, len(application_ids), BULK_CHUNK_SIZE):
+                chunk = application_ids[start:start + BULK_CHUNK_SIZE]
+                result = db.execute(
+                    update(Application)
+                    .where(Application.id.in_(chunk), Application.status.in_(allowed_from))
+                    .values(status=new_status, version=Application.version + 1)
+                    .returning(Application.id, Application.version, Application.updated_at)
+                    .execution_options(synchronize_session=False)
+                )
+                rows = result.all()
+                if rows:
+                    updated_ids.extend(row.id for row in rows)
+                    changes.extend(ApplicationChangeRepository.record(db, [
+                        {
+                            "application_id": row.id,
+                            "change": "status_changed",
+                            "status": new_status,
+                            "version": row.version,
+                            "changed_at": row.updated_at,
+                        }
+                        for row in rows
+                    ]))
+            db.commit()
+            ApplicationChangeRepository.publish(changes)
+            return updated_ids
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Error bulk updating application status: {str(e)}")
+            raise
+
+    @staticmethod
+    def get_state(db: Session, application_id: UUID):
+        """
+        Get only the status, version and modification time of an application.
+
+        Args:
+            db (Session): Database session
+            application_id (UUID): Application UUID
+
+        Returns:
+            Optional[Row]: Row with status, version and updated_at if found, None otherwise
+        """
+        return (
+            db.query(Application.status, Application.version, Application.updated_at)
+            .filter(Application.id == application_id)
+            .first()
+        )
+
+    @staticmethod
+    def get_page_state(
+        db: Session,
+        skip: int = 0,
+        limit: int = 100,
+        min_hop_count: Optional[int] = None
+    ) -> list:
+        """
+        Get the ID, version and modification time of each application on a page,
+        in the same order as get_all.
+
+        Args:
+            db (Session): Database session
+            skip (int): Number of records to skip
+            limit (int): Maximum number of records to return
+            min_hop_count (Optional[int]): Only include applications with at least this many hop words
+
+        Returns:
+            list: Rows with id, version and updated_at
+        """
+        if is_sharded(db):
+            pages = fan_out(db, ApplicationRepository.get_page_state, 0, skip + limit, min_hop_count)
+            return merge_pages(pages, skip, limit, key=attrgetter("id"))
+
+        query = db.query(Application.id, Application.version, Application.updated_at)
+        if min_hop_count is not None:
+            query = query.filter(Application.hop_count >= min_hop_count)
+        return (
+            query
+            .order_by(Application.id)
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+
+    @staticmethod
+    def rescore_all(db: Session) -> int:
+        """
+        Recompute score components from the stored scoring features with one
+        set-based UPDATE, without reading descriptions.
+
+        Only rows whose score changes are updated (and get a new version). The
+        change feed is not notified; subscribers see the new scores on their
+        next read.
+
+        Args:
+            db (Session): Database session
+
+        Returns:
+            int: Number of applications updated
+
+        Raises:
+            SQLAlchemyError: If database operation fails
+        """
+        if is_sharded(db):
+            return sum(fan_out(db, ApplicationRepository.rescore_all))
+
+        components = {
+            "score_base": case(
+                (Application.description_length > scoring_rules.BASE_MIN_DESCRIPTION_LENGTH, scoring_rules.BASE_POINTS),
+                else_=0
+            ),
+            "score_briefcase": case((Application.has_briefcase, scoring_rules.BRIEFCASE_POINTS), else_=0),
+            "score_hopping": func.min(Application.hop_count * scoring_rules.HOP_POINTS, scoring_rules.HOP_POINTS_CAP),
+            "score_twirls": func.min(
+                Application.number_of_twirls * scoring_rules.TWIRL_POINTS, scoring_rules.TWIRL_POINTS_CAP
+            ),
+            "score_originality": case((Application.is_original, scoring_rules.ORIGINALITY_POINTS), else_=0),
+        }
+        if db.get_bind().dialect.name != "sqlite":
+            # Two-argument min() is SQLite's scalar minimum; elsewhere use LEAST
+            components["score_hopping"] = func.least(
+                Application.hop_count * scoring_rules.HOP_POINTS, scoring_rules.HOP_POINTS_CAP
+            )
+            components["score_twirls"] = func.least(
+                Application.number_of_twirls * scoring_rules.TWIRL_POINTS, scoring_rules.TWIRL_POINTS_CAP
+            )
+
+        # Enrichment points are kept as they are
+        total = sum(components.values()) + Application.score_enrichment
+        statement = (
+            update(Application)
+            .where(or_(
+                Application.silliness_score != total,
+                *(getattr(Application, name) != value for name, value in components.items())
+            ))
+            .values(silliness_score=total, version=Application.version + 1, **components)
+            .execution_options(synchronize_session=False)
+        )
+        try:
+            updated = db.execute(statement).rowcount
+            db.commit()
+            return updated
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Error rescoring applications: {str(e)}")
+            raise
+
     @staticmethod
     def delete(db: Session, application: Application) -> bool:
         """
@@ -119,8 +631,16 @@ class ApplicationRepository:
             SQLAlchemyError: If database operation fails
         """
         try:
+            changes = ApplicationChangeRepository.record(db, [{
+                "application_id": application.id,
+                "change": "deleted",
+                "status": None,
+                "version": None,
+                "changed_at": datetime.utcnow(),
+            }])
             db.delete(application)
             db.commit()
+            ApplicationChangeRepository.publish(changes)
             return True
         except SQLAlchemyError as e:
             db.rollback()
@@ -140,9 +660,469 @@ class ApplicationRepository:
         Returns:
             bool: True if the walk name is unique, False otherwise
         """
-        query = db.query(Application).filter(Application.walk_name == walk_name)
+        if is_sharded(db):
+            return all(fan_out(db, ApplicationRepository.is_walk_name_unique, walk_name, exclude_id))
+
+        query = db.query(Application.id).filter(Application.walk_name == walk_name)
 
         if exclude_id:
             query = query.filter(Application.id != exclude_id)
 
         return query.first() is None
+
+class ArchiveRepository:
+    """
+    Repository for the index of applications moved to archive segments.
+    """
+
+    @staticmethod
+    def get_candidates(db: Session, statuses: Iterable[str], older_than: datetime, limit: int) -> List[Application]:
+        """
+        Get applications that may be archived, oldest ID first, with their descriptions.
+
+        Args:
+            db (Session): Database session
+            statuses (Iterable[str]): Final statuses that may be archived
+            older_than (datetime): Only applications last modified before this time
+            limit (int): Maximum number of applications to return
+
+        Returns:
+            List[Application]: Applications to archive
+        """
+        return (
+            db.query(Application)
+            .options(undefer(Application.description))
+            .filter(Application.status.in_(list(statuses)), Application.updated_at < older_than)
+            .order_by(Application.id)
+            .limit(limit)
+            .all()
+        )
+
+    @staticmethod
+    def move(db: Session, applications: List[Application], segment: int) -> bool:
+        """
+        Index applications written to a segment and delete them from the
+        applications table, in one transaction.
+
+        An application is only deleted if its version is still the archived one;
+        if any of them changed in the meantime, nothing is moved.
+
+        Args:
+            db (Session): Database session
+            applications (List[Application]): Applications in segment order
+            segment (int): Segment number the applications were written to
+
+        Returns:
+            bool: True if the applications were moved, False if one of them changed
+
+        Raises:
+            SQLAlchemyError: If database operation fails
+        """
+        versions = [(application.id, application.version) for application in applications]
+        index_rows = [
+            {
+                "id": application.id,
+                "walk_name_hash": ArchivedApplication.hash_walk_name(application.walk_name),
+                "segment": segment,
+                "position": position,
+            }
+            for position, application in enumerate(applications)
+        ]
+        # Release the loaded records; their rows are deleted with a Core statement below
+        db.expunge_all()
+        try:
+            db.execute(insert(ArchivedApplication), index_rows)
+            applications_table = Application.__table__
+            deleted = db.execute(
+                delete(applications_table).where(
+                    applications_table.c.id == bindparam("archived_id"),
+                    applications_table.c.version == bindparam("archived_version"),
+                ),
+                [{"archived_id": app_id, "archived_version": version} for app_id, version in versions]
+            ).rowcount
+            if deleted != len(versions):
+                db.rollback()
+                return False
+            db.commit()
+            return True
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Error moving applications to the archive: {str(e)}")
+            raise
+
+    @staticmethod
+    def locate(db: Session, application_id: UUID):
+        """
+        Find the segment and position of an archived application.
+
+        Args:
+            db (Session): Database session
+            application_id (UUID): Application UUID
+
+        Returns:
+            Optional[Row]: Row with segment and position if archived, None otherwise
+        """
+        return db.execute(
+            select(ArchivedApplication.segment, ArchivedApplication.position)
+            .where(ArchivedApplication.id == application_id)
+        ).first()
+
+    @staticmethod
+    def locate_walk_name(db: Session, walk_name: str) -> list:
+        """
+        Find archived applications whose walk name hash matches a walk name.
+
+        Hashes can collide, so callers confirm the name from the segment.
+
+        Args:
+            db (Session): Database session
+            walk_name (str): Walk name
+
+        Returns:
+            list: Rows with segment and position
+        """
+        if is_sharded(db):
+            return [row for rows in fan_out(db, ArchiveRepository.locate_walk_name, walk_name) for row in rows]
+
+        return db.execute(
+            select(ArchivedApplication.segment, ArchivedApplication.position)
+            .where(ArchivedApplication.walk_name_hash == ArchivedApplication.hash_walk_name(walk_name))
+        ).all()
+
+    @staticmethod
+    def count(db: Session) -> int:
+        """Return the number of archived applications."""
+        if is_sharded(db):
+            return sum(fan_out(db, ArchiveRepository.count))
+        return db.execute(select(func.count()).select_from(ArchivedApplication)).scalar()
+
+class ScoringJobRepository:
+    """
+    Repository for the queue of deferred score enrichments.
+
+    Apart from enqueue(), which joins the caller's transaction, every method
+    works on a session bound to a single shard and commits on its own.
+    """
+
+    @staticmethod
+    def enqueue(db: Session, application_id: UUID) -> None:
+        """
+        Queue the enrichment of an application without committing.
+
+        Args:
+            db (Session): Database session with the pending application insert
+            application_id (UUID): Application to enrich
+        """
+        db.add(ScoringJob(application_id=application_id))
+
+    @staticmethod
+    def claim(db: Session, limit: int, lease_seconds: float) -> list:
+        """
+        Claim up to `limit` jobs that are due, oldest first.
+
+        Due jobs are queued ones whose backoff has passed, and running ones
+        whose lease expired because their worker died. The claim is a single
+        UPDATE, so concurrent dispatchers never claim the same job.
+
+        Args:
+            db (Session): Session bound to a single shard
+            limit (int): Maximum number of jobs to claim
+            lease_seconds (float): Age after which a running job may be claimed again
+
+        Returns:
+            list: Rows with id, application_id and attempts (including this one)
+
+        Raises:
+            SQLAlchemyError: If database operation fails
+        """
+        now = datetime.utcnow()
+        due = (
+            select(ScoringJob.id)
+            .where(or_(
+                and_(ScoringJob.status == "queued", ScoringJob.available_at <= now),
+                and_(ScoringJob.status == "running", ScoringJob.locked_at < now - timedelta(seconds=lease_seconds)),
+            ))
+            .order_by(ScoringJob.id)
+            .limit(limit)
+        )
+        try:
+            rows = db.execute(
+                update(ScoringJob)
+                .where(ScoringJob.id.in_(due.scalar_subquery()))
+                .values(status="running", locked_at=now, attempts=ScoringJob.attempts + 1)
+                .returning(ScoringJob.id, ScoringJob.application_id, ScoringJob.attempts)
+                .execution_options(synchronize_session=False)
+            ).all()
+            db.commit()
+            return sorted(rows, key=attrgetter("id"))
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Error claiming scoring jobs: {str(e)}")
+            raise
+
+    @staticmethod
+    def get_inputs(db: Session, application_ids: List[UUID]) -> dict:
+        """
+        Load the scoring inputs of applications, descriptions included.
+
+        Args:
+            db (Session): Session bound to a single shard
+            application_ids (List[UUID]): Applications to load
+
+        Returns:
+            dict: Application ID -> row; applications that no longer exist are missing
+        """
+        rows = db.execute(
+            select(
+                Application.id,
+                Application.walk_name,
+                Application.description,
+                Application.has_briefcase,
+                Application.involves_hopping,
+                Application.number_of_twirls,
+                Application.hop_count,
+            ).where(Application.id.in_(application_ids))
+        ).all()
+        return {row.id: row for row in rows}
+
+    @staticmethod
+    def complete(
+        db: Session,
+        job_id: int,
+        application_id: UUID,
+        points: Optional[int],
+        error: Optional[str] = None
+    ) -> None:
+        """
+        Finish a job: store the enrichment points (or the failure) and delete it.
+
+        The application's score is updated with a single UPDATE of the score
+        columns, so it never overwrites a concurrent status change; its version
+        is incremented and the change is recorded in the change feed. An
+        application that was deleted or archived meanwhile is skipped.
+
+        Args:
+            db (Session): Session bound to the job's shard
+            job_id (int): Job ID
+            application_id (UUID): Application of the job
+            points (Optional[int]): Enrichment points, or None if the job ran out of attempts
+            error (Optional[str]): Error of the last attempt, kept on a failed job
+
+        Raises:
+            SQLAlchemyError: If database operation fails
+        """
+        if points is None:
+            values = {"score_status": SCORE_ENRICHMENT_FAILED}
+        else:
+            values = {
+                "score_enrichment": points,
+                "silliness_score": (
+                    Application.score_base + Application.score_briefcase + Application.score_hopping
+                    + Application.score_twirls + Application.score_originality + points
+                ),
+                "score_status": SCORE_FINAL,
+            }
+        try:
+            updated = db.execute(
+                update(Application)
+                .where(Application.id == application_id, Application.score_status == SCORE_PROVISIONAL)
+                .values(version=Application.version + 1, **values)
+                .returning(Application.id, Application.status, Application.version, Application.updated_at)
+                .execution_options(synchronize_session=False)
+            ).first()
+            changes = []
+            if updated is not None:
+                changes = ApplicationChangeRepository.record(db, [{
+                    "application_id": updated.id,
+                    "change": "score_updated",
+                    "status": updated.status,
+                    "version": updated.version,
+                    "changed_at": updated.updated_at,
+                }])
+            if points is None:
+                db.execute(
+                    update(ScoringJob)
+                    .where(ScoringJob.id == job_id)
+                    .values(status="failed", locked_at=None, last_error=(error or "")[:500])
+                    .execution_options(synchronize_session=False)
+                )
+            else:
+                db.execute(delete(ScoringJob).where(ScoringJob.id == job_id))
+            db.commit()
+            ApplicationChangeRepository.publish(changes)
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Error completing scoring job {job_id}: {str(e)}")
+            raise
+
+    @staticmethod
+    def retry(db: Session, job_id: int, error: str, delay_seconds: float) -> None:
+        """
+        Put a failed job back in the queue after a delay.
+
+        Args:
+            db (Session): Session bound to the job's shard
+            job_id (int): Job ID
+            error (str): Error of the failed attempt
+            delay_seconds (float): Seconds before the job may be claimed again
+
+        Raises:
+            SQLAlchemyError: If database operation fails
+        """
+        try:
+            db.execute(
+                update(ScoringJob)
+                .where(ScoringJob.id == job_id)
+                .values(
+                    status="queued",
+                    available_at=datetime.utcnow() + timedelta(seconds=delay_seconds),
+                    locked_at=None,
+                    last_error=error[:500],
+                )
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Error requeueing scoring job {job_id}: {str(e)}")
+            raise
+
+    @staticmethod
+    def requeue_failed(db: Session) -> int:
+        """
+        Queue failed jobs again with fresh attempts, and mark their applications provisional.
+
+        Args:
+            db (Session): Session bound to a single shard
+
+        Returns:
+            int: Number of jobs requeued
+
+        Raises:
+            SQLAlchemyError: If database operation fails
+        """
+        failed = select(ScoringJob.application_id).where(ScoringJob.status == "failed")
+        try:
+            db.execute(
+                update(Application)
+                .where(Application.id.in_(failed.scalar_subquery()), Application.score_status == SCORE_ENRICHMENT_FAILED)
+                .values(score_status=SCORE_PROVISIONAL, version=Application.version + 1)
+                .execution_options(synchronize_session=False)
+            )
+            requeued = db.execute(
+                update(ScoringJob)
+                .where(ScoringJob.status == "failed")
+                .values(status="queued", attempts=0, available_at=datetime.utcnow(), locked_at=None)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            db.commit()
+            return requeued
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Error requeueing failed scoring jobs: {str(e)}")
+            raise
+
+    @staticmethod
+    def queue_stats(db: Session) -> dict:
+        """
+        Count jobs by status and find the oldest due job.
+
+        Args:
+            db (Session): Session bound to a single shard
+
+        Returns:
+            dict: queued, running and failed counts, and oldest_queued (datetime or None)
+        """
+        counts = dict(db.execute(select(ScoringJob.status, func.count()).group_by(ScoringJob.status)).all())
+        oldest = db.execute(select(func.min(ScoringJob.created_at)).where(ScoringJob.status == "queued")).scalar()
+        return {
+            "queued": counts.get("queued", 0),
+            "running": counts.get("running", 0),
+            "failed": counts.get("failed", 0),
+            "oldest_queued": oldest,
+        }
+
+class IdempotencyKeyRepository:
+    """
+    Repository for the Idempotency-Key records of POST /applications.
+
+    Records are written by ApplicationRepository.create(), in the transaction
+    that inserts their application. purge_expired() works on a session bound
+    to a single shard and commits on its own.
+    """
+
+    @staticmethod
+    def get(db: Session, key: UUID) -> Optional[IdempotencyKey]:
+        """
+        Get the record of a key.
+
+        Args:
+            db (Session): Database session
+            key (UUID): Key from IdempotencyService.make_key
+
+        Returns:
+            Optional[IdempotencyKey]: The committed record, or None
+        """
+        return db.get(IdempotencyKey, key)
+
+    @staticmethod
+    def record(db: Session, idempotency_key: IdempotencyKey, application: Application) -> None:
+        """
+        Store the response for a just-flushed application without committing.
+
+        Args:
+            db (Session): Database session with the pending application insert
+            idempotency_key (IdempotencyKey): Record with key, fingerprint and status code set
+            application (Application): The application the request created
+        """
+        idempotency_key.application_id = application.id
+        idempotency_key.response_body = ApplicationResponse.from_orm(application).json().encode("utf-8")
+        db.add(idempotency_key)
+
+    @staticmethod
+    def delete_expired(db: Session, idempotency_key: IdempotencyKey, older_than: datetime) -> None:
+        """
+        Delete an expired record without committing, so its key can be used again.
+
+        If another request has replaced the record meanwhile, the fresh one is
+        kept and the caller's insert conflicts with it instead.
+
+        Args:
+            db (Session): Database session
+            idempotency_key (IdempotencyKey): Expired record returned by get()
+            older_than (datetime): Expiry cutoff the record was found to be older than
+        """
+        db.expunge(idempotency_key)
+        db.execute(
+            delete(IdempotencyKey)
+            .where(IdempotencyKey.key == idempotency_key.key, IdempotencyKey.created_at < older_than)
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def purge_expired(db: Session, older_than: datetime) -> int:
+        """
+        Delete records created before a cutoff.
+
+        Args:
+            db (Session): Session bound to a single shard
+            older_than (datetime): Records created before this are deleted
+
+        Returns:
+            int: Number of records deleted
+
+        Raises:
+            SQLAlchemyError: If database operation fails
+        """
+        try:
+            purged = db.execute(
+                delete(IdempotencyKey)
+                .where(IdempotencyKey.created_at < older_than)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            db.commit()
+            return purged
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Error purging expired idempotency keys: {str(e)}")
+            raise
@@ -0,0 +1,216 @@
+"""
+Routing of applications to database shards.
+
+This module maps application IDs to shards with jump consistent hashing
+(Lamping & Veach), so changing the number of shards only moves the rows that
+have to move (about 1/N of them when adding the N-th shard). It also provides
+the chooser functions SQLAlchemy's ShardedSession uses to send each statement
+to the right shard(s):
+
+- rows of applications and archived_applications live on the shard of their ID
+- changelog rows and scoring jobs live on the shard of the application they
+  describe
+- Idempotency-Key records live on the shard of their key (a UUID-shaped
+  digest), and the application a keyed request creates is given an ID on that
+  same shard, so both are written in one transaction
+- statements that compare one of those keys with = or IN go only to the shards
+  of the compared IDs; other reads go to every shard
+
+Inserts issued as statements (rather than through session.add) cannot be
+routed from their criteria and must pass bind_arguments={"shard_id": ...}.
+"""
+import heapq
+import uuid
+from itertools import islice
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+from sqlalchemy.sql import operators, visitors
+from sqlalchemy.sql.dml import Insert
+from sqlalchemy.sql.elements import BinaryExpression, BindParameter
+from app.utils.ids import uuid7
+
+# (table, column) pairs whose value decides the shard of a row
+SHARD_KEYS = {
+    ("applications", "id"),
+    ("archived_applications", "id"),
+    ("application_changes", "application_id"),
+    ("scoring_jobs", "application_id"),
+    ("idempotency_keys", "key"),
+}
+
+_MASK_64 = (1 << 64) - 1
+
+class ShardRoutingError(Exception):
+    """A statement cannot be routed to a shard."""
+
+def jump_hash(key: int, buckets: int) -> int:
+    """
+    Jump consistent hash of a 64-bit key.
+
+    Args:
+        key (int): Non-negative 64-bit key
+        buckets (int): Number of buckets (at least 1)
+
+    Returns:
+        int: Bucket in range(buckets)
+    """
+    b, j = -1, 0
+    while j < buckets:
+        b = j
+        key = (key * 2862933555777941757 + 1) & _MASK_64
+        j = int((b + 1) * (float(1 << 31) / float((key >> 33) + 1)))
+    return b
+
+def shard_for(application_id: uuid.UUID, shard_count: int) -> int:
+    """
+    Return the shard an application belongs to.
+
+    Uses the low 64 bits of the UUID, which are random in both UUIDv4 and the
+    time-ordered UUIDv7 keys, so consecutive submissions spread evenly.
+
+    Args:
+        application_id (uuid.UUID): Application ID
+        shard_count (int): Number of shards
+
+    Returns:
+        int: Shard number
+    """
+    if shard_count == 1:
+        return 0
+    if not isinstance(application_id, uuid.UUID):
+        application_id = uuid.UUID(str(application_id))
+    return jump_hash(application_id.int & _MASK_64, shard_count)
+
+def uuid7_on_shard(shard: int, shard_count: int) -> uuid.UUID:
+    """
+    Draw UUIDv7 IDs until one belongs to `shard` (about shard_count tries).
+
+    Args:
+        shard (int): Shard the ID must map to
+        shard_count (int): Number of shards
+
+    Returns:
+        uuid.UUID: A new ID on that shard
+    """
+    while True:
+        candidate = uuid7()
+        if shard_for(candidate, shard_count) == shard:
+            return candidate
+
+def _is_shard_key(column) -> bool:
+    """Whether a column expression is one of SHARD_KEYS."""
+    table = getattr(column, "table", None)
+    return table is not None and (getattr(table, "name", None), getattr(column, "name", None)) in SHARD_KEYS
+
+def shard_key_values(clause, parameters: Optional[dict] = None) -> Optional[List]:
+    """
+    Collect the shard key values a statement's criteria compare with = or IN.
+
+    Args:
+        clause: WHERE clause (or None)
+        parameters (Optional[dict]): Parameters passed with the statement, for
+            bind parameters without a value of their own (e.g. primary key loads)
+
+    Returns:
+        Optional[List]: The compared values (None for values that are not known),
+        or None if the criteria do not restrict any shard key
+    """
+    if clause is None:
+        return None
+    values: List = []
+    found = False
+
+    def visit_binary(binary: BinaryExpression) -> None:
+        nonlocal found
+        column, parameter = binary.left, binary.right
+        if not _is_shard_key(column) or not isinstance(parameter, BindParameter):
+            return
+        value = parameter.effective_value
+        if value is None and parameters:
+            value = parameters.get(parameter.key)
+        if binary.operator == operators.eq:
+            values.append(value)
+            found = True
+        elif binary.operator == operators.in_op:
+            values.extend(value if value is not None else [None])
+            found = True
+
+    visitors.traverse(clause, {}, {"binary": visit_binary})
+    return values if found else None
+
+def merge_pages(pages: Sequence[list], skip: int, limit: int, key: Callable) -> list:
+    """
+    Merge per-shard pages into one page.
+
+    Each shard page must be sorted by `key` and hold that shard's first
+    skip + limit rows, so the merged result equals the page a single database
+    would return.
+
+    Args:
+        pages (Sequence[list]): Sorted rows per shard
+        skip (int): Number of merged rows to skip
+        limit (int): Maximum number of rows to return
+        key (Callable): Sort key of a row
+
+    Returns:
+        list: Rows skip .. skip + limit of the merged order
+    """
+    return list(islice(heapq.merge(*pages, key=key), skip, skip + limit))
+
+def make_choosers(shard_count: int) -> Dict[str, Callable]:
+    """
+    Build the chooser functions for a ShardedSession over `shard_count` shards.
+
+    Args:
+        shard_count (int): Number of shards, identified as 0..shard_count - 1
+
+    Returns:
+        Dict[str, Callable]: shard_chooser, identity_chooser and execute_chooser
+    """
+    all_shards = list(range(shard_count))
+
+    def shards_of(values: Optional[Iterable]) -> List[int]:
+        """Shards holding the given keys; all shards if the keys are unknown."""
+        if values is None or any(value is None for value in values):
+            return all_shards
+        return sorted({shard_for(value, shard_count) for value in values})
+
+    def shard_chooser(mapper, instance, clause=None, **kw) -> int:
+        """Shard for flushing an instance, or for a Core statement's criteria."""
+        if instance is not None:
+            table_name = mapper.local_table.name
+            if table_name in ("application_changes", "scoring_jobs"):
+                return shard_for(instance.application_id, shard_count)
+            if table_name == "idempotency_keys":
+                return shard_for(instance.key, shard_count)
+            if instance.id is None:
+                # The shard depends on the ID, so it cannot wait for the INSERT default
+                instance.id = uuid7()
+            return shard_for(instance.id, shard_count)
+
+        shards = shards_of(shard_key_values(getattr(clause, "whereclause", None)))
+        if len(shards) == 1:
+            return shards[0]
+        raise ShardRoutingError("Statement spans several shards; execute it once per shard with a shard_id")
+
+    def identity_chooser(mapper, primary_key, **kw) -> List[int]:
+        """Shards that may hold the row with a given primary key."""
+        if mapper.local_table.name in ("applications", "archived_applications", "idempotency_keys"):
+            return [shard_for(primary_key[0], shard_count)]
+        return all_shards
+
+    def execute_chooser(orm_context) -> List[int]:
+        """Shards an ORM statement without an explicit shard_id runs on."""
+        statement = orm_context.statement
+        if isinstance(statement, Insert):
+            raise ShardRoutingError("INSERT statements need an explicit shard_id bind argument")
+        parameters = orm_context.parameters
+        if isinstance(parameters, list):
+            # executemany: the criteria cannot be resolved per row here
+            return all_shards
+        return shards_of(shard_key_values(getattr(statement, "whereclause", None), parameters))
+
+    return {
+        "shard_chooser": shard_chooser,
+        "identity_chooser": identity_chooser,
+        "execute_chooser": execute_chooser,
+    }
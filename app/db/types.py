@@ -0,0 +1,71 @@
+"""
+Custom SQLAlchemy column types.
+
+This module defines storage formats used by the models that SQLAlchemy does not
+provide out of the box.
+"""
+import uuid
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.types import LargeBinary, Text, TypeDecorator
+
+class BinaryUUID(TypeDecorator):
+    """
+    UUID stored as 16 raw bytes (native UUID on PostgreSQL).
+
+    Half the size of the 32-character hex string SQLAlchemy's generic Uuid type
+    uses on SQLite, which keeps primary-key and foreign-key indexes small.
+    Values previously stored as hex strings are still read correctly; see
+    app/db/migrations.py for converting them.
+    """
+
+    impl = LargeBinary(16)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(postgresql.UUID(as_uuid=True))
+        return dialect.type_descriptor(LargeBinary(16))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if not isinstance(value, uuid.UUID):
+            value = uuid.UUID(str(value))
+        if dialect.name == "postgresql":
+            return value
+        return value.bytes
+
+    def process_result_value(self, value, dialect):
+        if value is None or isinstance(value, uuid.UUID):
+            return value
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return uuid.UUID(bytes=bytes(value))
+        # Legacy rows stored as hex/canonical strings
+        return uuid.UUID(value)
+
+class CompressedText(TypeDecorator):
+    """
+    Text column whose large values are stored compressed (SQLite only).
+
+    Compression is delegated to a TextCodec (app/utils/text_codec.py); values
+    it leaves uncompressed are stored as ordinary TEXT, so enabling or
+    disabling compression needs no migration. On other databases values are
+    stored as plain text.
+    """
+
+    impl = Text
+    cache_ok = True
+
+    def __init__(self, codec, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.codec = codec
+
+    def process_bind_param(self, value, dialect):
+        if value is None or dialect.name != "sqlite":
+            return value
+        return self.codec.encode(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return self.codec.decode(value)
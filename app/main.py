@@ -4,25 +4,29 @@ Main entry point for the Silly Walk Grant Application Orchestrator API.
 This module initializes the FastAPI application, configures middleware,
 registers routers, and sets up exception handlers.
 """
-import os
-from fastapi import FastAPI, Request, status
+import json
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from fastapi.openapi.docs import get_swagger_ui_html, get_redoc_html
+from fastapi.openapi.docs import get_redoc_html, get_swagger_ui_html
 from fastapi.openapi.utils import get_openapi
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
+from app.config import get_settings
 
 # Import routers
-from app.routes import application_routes
+from app.routes import admin_routes, application_routes, health_routes
 from app.db.database import create_tables
+from app.services.health_service import HealthService
+from app.services.scoring_job_service import scoring_dispatcher
+from app.utils.broadcast import change_feed_hub
+from app.utils.compression import CompressionMiddleware
 from app.utils.error_handlers import setup_exception_handlers
+from app.utils.profiling import ProfilingMiddleware, profile_store
+from app.utils.traffic_capture import TrafficCaptureMiddleware, traffic_log
+
+settings = get_settings()
 
 # Create FastAPI app
 app = FastAPI(
-    title="Silly Walk Grant Application Orchestrator",
+    title=settings.app_name,
     description="A secure backend API service for managing silly walk grant applications.",
     version="1.0.0",
     docs_url=None,  # Disable default docs URL to customize it
@@ -49,22 +53,47 @@ async def add_security_headers(request: Request, call_next):
     # Strict-Transport-Security: max-age=31536000; includeSubDomains
     return response
 
+# Time SQL per request and profile sampled, debug-flagged and slow requests (inside compression)
+app.add_middleware(
+    ProfilingMiddleware,
+    store=profile_store,
+    sample_rate=settings.profiling_sample_rate,
+    debug_key=settings.profiling_debug_key,
+    slow_request_ms=settings.profiling_slow_request_ms
+)
+
+# Record sanitised requests for benchmarks/replay.py (inside compression, to fingerprint plain bodies)
+if settings.traffic_capture_enabled:
+    app.add_middleware(
+        TrafficCaptureMiddleware,
+        log=traffic_log,
+        sample_rate=settings.traffic_capture_sample_rate,
+        max_body_bytes=settings.traffic_capture_max_body_bytes
+    )
+    HealthService.register_component("traffic_capture", traffic_log.stats)
+
+# Compress responses for clients that accept gzip/brotli (outermost, so it sees final bodies)
+if settings.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_min_size,
+        gzip_level=settings.compression_gzip_level,
+        brotli_quality=settings.compression_brotli_quality
+    )
+
 # Set up custom exception handlers
 setup_exception_handlers(app)
 
 # Include routers
 app.include_router(application_routes.router, prefix="/api/v1", tags=["applications"])
+app.include_router(health_routes.router, tags=["health"])
+app.include_router(admin_routes.router, prefix="/api/v1", tags=["admin"])
 
-# Health check endpoint
-@app.get("/health", status_code=status.HTTP_200_OK, tags=["health"])
-async def health_check():
-    """
-    Health check endpoint to verify API is running.
-
-    Returns:
-        dict: Status message indicating the API is operational
-    """
-    return {"status": "healthy", "message": "The Silly Walk Grant Application Orchestrator API is running"}
+# Report whether the OpenAPI schema has been built yet (informational, never blocks readiness)
+HealthService.register_component("openapi_cache", lambda: {"warm": app.openapi_schema is not None})
+HealthService.register_component("change_feed", change_feed_hub.stats)
+if scoring_dispatcher.enabled:
+    HealthService.register_component("scoring_jobs", scoring_dispatcher.stats)
 
 # Custom OpenAPI documentation endpoints
 @app.get("/docs", include_in_schema=False)
@@ -91,11 +120,29 @@ async def redoc_html():
         redoc_js_url="https://cdn.jsdelivr.net/npm/redoc@next/bundles/redoc.standalone.js",
     )
 
+def load_prebuilt_openapi(path: str) -> dict:
+    """
+    Load an OpenAPI schema generated at build time by scripts/build_openapi.py.
+
+    Args:
+        path (str): Path to the JSON schema file
+
+    Returns:
+        dict: The OpenAPI schema
+    """
+    with open(path, "r", encoding="utf-8") as schema_file:
+        return json.load(schema_file)
+
 # Custom OpenAPI schema to add security scheme
 def custom_openapi():
     if app.openapi_schema:
         return app.openapi_schema
 
+    # Prefer the pre-built schema so workers never walk the routes at runtime
+    if settings.openapi_schema_file:
+        app.openapi_schema = load_prebuilt_openapi(settings.openapi_schema_file)
+        return app.openapi_schema
+
     openapi_schema = get_openapi(
         title=app.title,
         version=app.version,
@@ -127,6 +174,20 @@ async def startup_event():
     # Create database tables
     create_tables()
 
+    # Run deferred score enrichment in this process unless a separate dispatcher does
+    if scoring_dispatcher.enabled and settings.scoring_dispatcher_enabled:
+        scoring_dispatcher.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """
+    Execute actions on application shutdown.
+    """
+    await scoring_dispatcher.stop()
+
+    # Finish the traffic capture stream (records already written stay readable without this)
+    traffic_log.close()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
@@ -3,11 +3,22 @@ SQLAlchemy models for the application.
 
 This module defines the database models using SQLAlchemy ORM.
 """
-import uuid
+import hashlib
 from datetime import datetime
-from sqlalchemy import Column, String, Boolean, Integer, DateTime, Text
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Boolean, Integer, DateTime, Index, LargeBinary
+from sqlalchemy.orm import deferred, validates
 from app.db.database import Base
+from app.db.types import BinaryUUID, CompressedText
+from app.utils.ids import uuid7
+from app.utils.scoring_rules import ScoreBreakdown, count_hops, score_breakdown
+from app.utils.text_codec import description_codec
+
+# Score statuses: "final" scores are complete, "provisional" ones wait for a
+# scoring job to add the enrichment points, and "enrichment_failed" ones keep
+# their provisional score because the job ran out of attempts
+SCORE_FINAL = "final"
+SCORE_PROVISIONAL = "provisional"
+SCORE_ENRICHMENT_FAILED = "enrichment_failed"
 
 class Application(Base):
     """
@@ -15,13 +26,17 @@ class Application(Base):
     """
     __tablename__ = "applications"
 
-    # Use UUID for primary key to prevent sequential ID enumeration
-    id = Column(UUID(as_uuid=True), primary_key=True, index=True, default=uuid.uuid4)
+    # Time-ordered UUIDv7 primary key: inserts append to the index, while the
+    # random bits still prevent ID enumeration. Stored as 16 bytes.
+    id = Column(BinaryUUID, primary_key=True, default=uuid7)
 
     # Application details
     applicant_name = Column(String(100), nullable=False)
     walk_name = Column(String(100), nullable=False, index=True)
-    description = Column(Text, nullable=False)
+    # Possibly compressed at rest (DESCRIPTION_COMPRESSION). Deferred so that
+    # queries which do not need it never load or decompress it; use
+    # undefer(Application.description) where the full record is returned.
+    description = deferred(Column(CompressedText(description_codec), nullable=False))
     has_briefcase = Column(Boolean, nullable=False, default=False)
     involves_hopping = Column(Boolean, nullable=False, default=False)
     number_of_twirls = Column(Integer, nullable=False, default=0)
@@ -29,9 +44,168 @@ class Application(Base):
     # Calculated fields
     silliness_score = Column(Integer, nullable=False, default=0)
 
+    # Scoring features, derived when the inputs are set (see the validators below)
+    # so filters and rescoring never re-read the description text
+    description_length = Column(Integer, nullable=False, default=0, server_default="0")
+    hop_count = Column(Integer, nullable=False, default=0, server_default="0", index=True)
+    is_original = Column(Boolean, nullable=False, default=False, server_default="0")
+
+    # Points per scoring rule; silliness_score is their sum
+    score_base = Column(Integer, nullable=False, default=0, server_default="0")
+    score_briefcase = Column(Integer, nullable=False, default=0, server_default="0")
+    score_hopping = Column(Integer, nullable=False, default=0, server_default="0")
+    score_twirls = Column(Integer, nullable=False, default=0, server_default="0")
+    score_originality = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # Points from the deferred enrichers (app/utils/score_enrichment.py), also part of
+    # silliness_score, and whether they have been added yet
+    score_enrichment = Column(Integer, nullable=False, default=0, server_default="0")
+    score_status = Column(String(20), nullable=False, default=SCORE_FINAL, server_default=SCORE_FINAL)
+
     # Status and timestamps
     status = Column(String(50), nullable=False, default="PendingReview")
     submission_timestamp = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Row version for optimistic concurrency; incremented by every update
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+    __mapper_args__ = {"version_id_col": version}
+
+    @validates("description")
+    def _derive_description_features(self, key, description):
+        """Keep the description features in step with the text."""
+        self.description_length = len(description) if description is not None else 0
+        self.hop_count = count_hops(description) if description is not None else 0
+        self._rescore(description_length=self.description_length, hop_count=self.hop_count)
+        return description
+
+    @validates("has_briefcase", "number_of_twirls", "is_original")
+    def _derive_score(self, key, value):
+        """Rescore when a scoring input changes."""
+        self._rescore(**{key: value})
+        return value
+
+    def _rescore(self, **changed) -> None:
+        """Recompute the score components from the features (unset ones count as zero)."""
+        features = {
+            "description_length": self.description_length or 0,
+            "hop_count": self.hop_count or 0,
+            "has_briefcase": bool(self.has_briefcase),
+            "number_of_twirls": self.number_of_twirls or 0,
+            "is_original": bool(self.is_original),
+        }
+        features.update({key: value or 0 for key, value in changed.items()})
+        breakdown = score_breakdown(**features)
+        self.score_base, self.score_briefcase, self.score_hopping, self.score_twirls, self.score_originality = breakdown
+        self.silliness_score = breakdown.total + (self.score_enrichment or 0)
+
+    @property
+    def score_breakdown(self) -> ScoreBreakdown:
+        """Points awarded by each scoring rule."""
+        return ScoreBreakdown(
+            base=self.score_base or 0,
+            briefcase=self.score_briefcase or 0,
+            hopping=self.score_hopping or 0,
+            twirls=self.score_twirls or 0,
+            originality=self.score_originality or 0,
+        )
 
     def __repr__(self):
         return f"<Application {self.id}: {self.walk_name} by {self.applicant_name}>"
+
+class ApplicationChange(Base):
+    """
+    SQLAlchemy model for the changelog behind the change feed.
+
+    Each created or updated application appends one row. The sequence number is
+    the SSE event ID that clients send back in Last-Event-ID to resume.
+    """
+    __tablename__ = "application_changes"
+    # AUTOINCREMENT keeps sequence numbers increasing even after old rows are pruned
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    application_id = Column(BinaryUUID, nullable=False)
+    change = Column(String(20), nullable=False)
+    status = Column(String(50), nullable=True)
+    version = Column(Integer, nullable=True)
+    changed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<ApplicationChange {self.seq}: {self.change} {self.application_id}>"
+
+class ArchivedApplication(Base):
+    """
+    SQLAlchemy model for the index of archived applications.
+
+    Archived applications are stored in segment files (app/db/archive.py); this
+    table maps each ID to its segment and position, and keeps a hash of the walk
+    name so the originality check still sees archived names. WITHOUT ROWID keeps
+    it a single compact B-tree keyed by ID.
+    """
+    __tablename__ = "archived_applications"
+    __table_args__ = {"sqlite_with_rowid": False}
+
+    id = Column(BinaryUUID, primary_key=True)
+    walk_name_hash = Column(Integer, nullable=False, index=True)
+    segment = Column(Integer, nullable=False)
+    position = Column(Integer, nullable=False)
+
+    @staticmethod
+    def hash_walk_name(walk_name: str) -> int:
+        """Return the signed 64-bit hash of a walk name stored in walk_name_hash."""
+        digest = hashlib.blake2b(walk_name.encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "big", signed=True)
+
+    def __repr__(self):
+        return f"<ArchivedApplication {self.id}: segment {self.segment} position {self.position}>"
+
+class ScoringJob(Base):
+    """
+    SQLAlchemy model for the queue of deferred score enrichments.
+
+    A job is queued in the same transaction as its application and lives on the
+    application's shard. The dispatcher claims jobs by setting them "running";
+    jobs whose worker died are claimed again once their lease has expired.
+    Completed jobs are deleted; jobs that ran out of attempts stay "failed".
+    """
+    __tablename__ = "scoring_jobs"
+    __table_args__ = (Index("ix_scoring_jobs_status_available_at", "status", "available_at"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    application_id = Column(BinaryUUID, nullable=False, index=True)
+    status = Column(String(20), nullable=False, default="queued")
+    attempts = Column(Integer, nullable=False, default=0)
+    # Not claimed before this time (retries back off)
+    available_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    locked_at = Column(DateTime, nullable=True)
+    last_error = Column(String(500), nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<ScoringJob {self.id}: {self.status} {self.application_id}>"
+
+class IdempotencyKey(Base):
+    """
+    SQLAlchemy model for the Idempotency-Key records of POST /applications.
+
+    A record is inserted in the same transaction as the application it created
+    and keeps the response sent for it, so a retry replays that response. While
+    the first request is still in flight, a duplicate waits on (or conflicts
+    with) the uncommitted key. The key is a digest of the caller and the
+    client's key, shaped as a UUID so it shards like an application ID; the
+    application is created on the shard of its key.
+    """
+    __tablename__ = "idempotency_keys"
+
+    key = Column(BinaryUUID, primary_key=True)
+    # Digest of the request payload, to reject a reused key with different data
+    fingerprint = Column(LargeBinary(16), nullable=False)
+    application_id = Column(BinaryUUID, nullable=False)
+    status_code = Column(Integer, nullable=False)
+    response_body = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f"<IdempotencyKey {self.key}: application {self.application_id}>"
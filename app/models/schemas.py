@@ -4,9 +4,10 @@ Pydantic models for request/response validation and serialization.
 This module defines the schemas used for validating API requests and formatting responses.
 """
 from pydantic import BaseModel, Field, validator
-from typing import Optional
+from typing import Iterable, List, NamedTuple, Optional
 from uuid import UUID
 from datetime import datetime
+import json
 import re
 
 class ApplicationBase(BaseModel):
@@ -111,6 +112,52 @@ class ApplicationStatus(BaseModel):
             raise ValueError(f"Status must be one of: {', '.join(allowed_statuses)}")
         return v
 
+class ApplicationStatusUpdate(ApplicationStatus):
+    """
+    Schema for changing the status of a single application.
+    """
+    version: Optional[int] = Field(
+        None,
+        description="Version the client last saw; the update is rejected if the application has changed since",
+        ge=1,
+        example=1
+    )
+
+class BulkStatusTransition(BaseModel):
+    """
+    Schema for moving many applications to a new status at once.
+    """
+    application_ids: List[UUID] = Field(
+        ...,
+        description="IDs of the applications to transition",
+        min_items=1,
+        max_items=10000
+    )
+    status: str = Field(
+        ...,
+        description="Target status",
+        example="UnderSillyCouncilReview"
+    )
+    from_status: Optional[str] = Field(
+        None,
+        description="Only transition applications currently in this status",
+        example="PendingReview"
+    )
+
+    _validate_status = validator('status', 'from_status', allow_reuse=True)(ApplicationStatus.validate_status)
+
+class BulkStatusTransitionResult(BaseModel):
+    """
+    Schema for the outcome of a bulk status transition.
+    """
+    requested: int = Field(..., description="Number of distinct application IDs in the request")
+    updated: int = Field(..., description="Number of applications whose status was changed")
+    updated_ids: List[UUID] = Field(..., description="Applications that were transitioned")
+    skipped_ids: List[UUID] = Field(
+        ...,
+        description="Applications that were not found, not in an allowed source status, or changed concurrently"
+    )
+
 class ApplicationUpdate(BaseModel):
     """
     Schema for updating an application.
@@ -156,6 +203,19 @@ class ApplicationUpdate(BaseModel):
     _validate_twirls = validator('number_of_twirls', allow_reuse=True)(ApplicationBase.validate_twirls)
     _validate_status = validator('status', allow_reuse=True)(ApplicationStatus.validate_status)
 
+class ScoreBreakdownResponse(BaseModel):
+    """
+    Schema for the points awarded by each scoring rule.
+    """
+    base: int = Field(..., description="Points for a description longer than 20 characters")
+    briefcase: int = Field(..., description="Points for involving a briefcase")
+    hopping: int = Field(..., description="Points for mentions of hop/hopping")
+    twirls: int = Field(..., description="Points for twirls")
+    originality: int = Field(..., description="Points for a walk name that was unique when submitted")
+
+    class Config:
+        orm_mode = True
+
 class ApplicationResponse(ApplicationBase):
     """
     Schema for application response.
@@ -164,6 +224,16 @@ class ApplicationResponse(ApplicationBase):
     silliness_score: int = Field(..., description="Calculated silliness score")
     status: str = Field(..., description="Status of the application")
     submission_timestamp: datetime = Field(..., description="When the application was submitted")
+    version: int = Field(..., description="Row version, incremented on every change")
+    updated_at: datetime = Field(..., description="When the application was last changed")
+    description_length: int = Field(..., description="Number of characters in the description")
+    hop_count: int = Field(..., description="Mentions of hop/hopping in the description")
+    score_breakdown: ScoreBreakdownResponse = Field(..., description="Points awarded by each scoring rule")
+    score_enrichment: int = Field(0, description="Points awarded by the deferred enrichers")
+    score_status: str = Field(
+        "final",
+        description="final, provisional (enrichment pending) or enrichment_failed (provisional score kept)"
+    )
 
     class Config:
         orm_mode = True
@@ -176,8 +246,85 @@ class ApplicationResponse(ApplicationBase):
                 "has_briefcase": True,
                 "involves_hopping": True,
                 "number_of_twirls": 3,
-                "silliness_score": 35,
+                "silliness_score": 31,
                 "status": "PendingReview",
-                "submission_timestamp": "2023-07-14T12:34:56.789Z"
+                "submission_timestamp": "2023-07-14T12:34:56.789Z",
+                "version": 1,
+                "updated_at": "2023-07-14T12:34:56.789Z",
+                "description_length": 54,
+                "hop_count": 1,
+                "score_breakdown": {
+                    "base": 10,
+                    "briefcase": 5,
+                    "hopping": 3,
+                    "twirls": 6,
+                    "originality": 7
+                },
+                "score_enrichment": 0,
+                "score_status": "final"
             }
         }
+
+class ApplicationSummaryResponse(BaseModel):
+    """
+    Schema for an application in list views (`view=summary`).
+
+    Documents the shape written by dump_summaries; summaries are not validated
+    through this model at runtime.
+    """
+    id: UUID = Field(..., description="Unique identifier for the application")
+    walk_name: str = Field(..., description="Name of the silly walk")
+    applicant_name: str = Field(..., description="Name of the applicant")
+    silliness_score: int = Field(..., description="Calculated silliness score")
+    status: str = Field(..., description="Status of the application")
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "id": "123e4567-e89b-12d3-a456-426614174000",
+                "walk_name": "The Ministry Walk",
+                "applicant_name": "John Cleese",
+                "silliness_score": 31,
+                "status": "PendingReview"
+            }
+        }
+
+class ApplicationSummary(NamedTuple):
+    """
+    Lightweight read model for list views, built straight from a column projection.
+
+    version and updated_at are used for cache validators and are not serialised.
+    """
+    id: UUID
+    walk_name: str
+    applicant_name: str
+    silliness_score: int
+    status: str
+    version: int
+    updated_at: datetime
+
+def dump_summaries(summaries: Iterable[ApplicationSummary]) -> bytes:
+    """
+    Serialise application summaries to a JSON array.
+
+    Args:
+        summaries (Iterable[ApplicationSummary]): Summaries to serialise
+
+    Returns:
+        bytes: UTF-8 JSON array of objects with id, walk_name, applicant_name,
+        silliness_score and status
+    """
+    return json.dumps(
+        [
+            {
+                "id": str(summary.id),
+                "walk_name": summary.walk_name,
+                "applicant_name": summary.applicant_name,
+                "silliness_score": summary.silliness_score,
+                "status": summary.status,
+            }
+            for summary in summaries
+        ],
+        separators=(",", ":"),
+        ensure_ascii=False
+    ).encode("utf-8")
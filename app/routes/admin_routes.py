@@ -0,0 +1,111 @@
+"""
+API routes for operators.
+
+This module exposes the request captures recorded by the profiling middleware
+(app/utils/profiling.py): sampled and debug-profiled requests with their
+call-stack profile, and slow requests with their SQL timings.
+"""
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+from starlette.concurrency import run_in_threadpool
+from app.auth.api_key_auth import get_api_key
+from app.utils.profiling import profile_store
+
+# Create router
+router = APIRouter()
+
+@router.get(
+    "/admin/profiles",
+    summary="List request captures",
+    description="""
+    List the stored request captures, newest first. Requests are captured when
+    they are sampled (PROFILING_SAMPLE_RATE), carry a valid `X-Debug-Profile`
+    header, or take longer than PROFILING_SLOW_REQUEST_MS. Only the most recent
+    PROFILING_MAX_ENTRIES captures are kept.
+    """,
+    responses={
+        200: {"description": "Capture summaries"},
+        401: {"description": "Missing API key"},
+        403: {"description": "Invalid API key"}
+    }
+)
+async def list_profiles(api_key: str = Depends(get_api_key)) -> List[dict]:
+    """
+    List stored request captures.
+
+    Args:
+        api_key (str): API key for authentication
+
+    Returns:
+        List[dict]: Capture summaries, newest first
+    """
+    return await run_in_threadpool(profile_store.list_captures)
+
+@router.get(
+    "/admin/profiles/{capture_id}",
+    summary="Retrieve a request capture",
+    description="""
+    Retrieve one capture: request line, status and duration, the time of each
+    SQL statement (without parameters) and, for profiled requests, the functions
+    with the highest cumulative time.
+    """,
+    responses={
+        200: {"description": "Capture found"},
+        401: {"description": "Missing API key"},
+        403: {"description": "Invalid API key"},
+        404: {"description": "Capture not found or already evicted"}
+    }
+)
+async def get_profile(capture_id: str, api_key: str = Depends(get_api_key)) -> dict:
+    """
+    Retrieve a request capture.
+
+    Args:
+        capture_id (str): Capture ID (also sent in the X-Profile-Id response header)
+        api_key (str): API key for authentication
+
+    Returns:
+        dict: The capture
+
+    Raises:
+        HTTPException: 404 if the capture does not exist
+    """
+    record = await run_in_threadpool(profile_store.get, capture_id)
+    if record is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Capture not found")
+    return record
+
+@router.get(
+    "/admin/profiles/{capture_id}/pstats",
+    summary="Download the raw profile of a capture",
+    description="""
+    Download the cProfile data of a profiled request, for `python -m pstats` or
+    visualisers such as snakeviz. Slow-request captures have no profile.
+    """,
+    response_class=FileResponse,
+    responses={
+        200: {"description": "Raw cProfile data", "content": {"application/octet-stream": {}}},
+        401: {"description": "Missing API key"},
+        403: {"description": "Invalid API key"},
+        404: {"description": "Capture not found, or captured without profiling"}
+    }
+)
+async def get_profile_stats(capture_id: str, api_key: str = Depends(get_api_key)):
+    """
+    Download the raw cProfile data of a capture.
+
+    Args:
+        capture_id (str): Capture ID
+        api_key (str): API key for authentication
+
+    Returns:
+        FileResponse: The .prof file
+
+    Raises:
+        HTTPException: 404 if there is no profile for this capture
+    """
+    path = profile_store.raw_profile_path(capture_id)
+    if path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return FileResponse(path, media_type="application/octet-stream", filename=f"{capture_id}.prof")
@@ -3,16 +3,35 @@ API routes for silly walk grant applications.
 
 This module defines the HTTP endpoints for the application API.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Literal, Optional, Union
 from uuid import UUID
 
-from app.db.database import get_db
+from app.config import get_settings
+from app.db.database import get_db, shard_sessions
 from app.auth.api_key_auth import get_api_key
-from app.models.schemas import ApplicationCreate, ApplicationResponse
-from app.services.application_service import ApplicationService
+from app.models.schemas import (
+    ApplicationCreate,
+    ApplicationResponse,
+    ApplicationStatusUpdate,
+    ApplicationSummaryResponse,
+    BulkStatusTransition,
+    BulkStatusTransitionResult,
+    dump_summaries,
+)
+from app.services.application_service import ApplicationService, StatusConflictError
+from app.services.change_feed_service import ChangeFeedService
+from app.services.idempotency_service import IdempotencyConflictError, IdempotencyService, StoredResponse
+from app.utils.broadcast import SubscriberLimitError, change_feed_hub
+from app.utils.http_cache import (
+    application_etag,
+    cache_headers,
+    collection_etag,
+    has_conditional_headers,
+    is_not_modified,
+)
 from app.utils.security import sanitize_log_data
 
 import logging
@@ -41,19 +60,32 @@ router = APIRouter()
     - Originality bonus: +7 points if the walk name is unique
 
     The application status will be set to "PendingReview" initially.
+
+    Clients may send an `Idempotency-Key` header (1-255 printable ASCII characters)
+    to retry safely: a repeated key with the same payload returns the original
+    response (marked with `Idempotent-Replayed: true`) without creating a new
+    application. Reusing a key with a different payload is rejected with 422.
+    A retry sent while the original request is still being processed waits for
+    it and then returns its response.
     """,
     responses={
         201: {"description": "Application successfully created"},
         400: {"description": "Invalid input data"},
         401: {"description": "Missing API key"},
         403: {"description": "Invalid API key"},
+        422: {"description": "Idempotency-Key was already used with a different payload"},
         500: {"description": "Internal server error"}
     }
 )
-async def create_application(
+def create_application(
     application: ApplicationCreate,
     db: Session = Depends(get_db),
-    api_key: str = Depends(get_api_key)  # This dependency handles API key validation
+    api_key: str = Depends(get_api_key),  # This dependency handles API key validation
+    idempotency_key: Optional[str] = Header(
+        None,
+        alias="Idempotency-Key",
+        description="Client-generated key that makes retries of this request safe"
+    )
 ):
     """
     Create a new silly walk grant application.
@@ -62,10 +94,49 @@ async def create_application(
         application (ApplicationCreate): Application data
         db (Session): Database session
         api_key (str): API key for authentication
+        idempotency_key (Optional[str]): Optional Idempotency-Key header value
 
     Returns:
         ApplicationResponse: Created application with generated ID, score, and status
 
+    Raises:
+        HTTPException: For validation errors or server errors
+    """
+    if idempotency_key is None:
+        return _create_application(db, application)
+
+    if not 1 <= len(idempotency_key) <= 255 or not idempotency_key.isascii() or not idempotency_key.isprintable():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Idempotency-Key must be 1-255 printable ASCII characters"
+        )
+
+    key = IdempotencyService.make_key(api_key, idempotency_key)
+    stored = _create_application(db, application, key)
+    return Response(
+        content=stored.body,
+        status_code=stored.status_code,
+        media_type="application/json",
+        headers={"Idempotent-Replayed": "true"} if stored.replayed else None
+    )
+
+def _create_application(
+    db: Session,
+    application: ApplicationCreate,
+    idempotency_key: Optional[UUID] = None
+) -> Union[ApplicationResponse, StoredResponse]:
+    """
+    Create the application and map errors to HTTP responses.
+
+    Args:
+        db (Session): Database session
+        application (ApplicationCreate): Application data
+        idempotency_key (Optional[UUID]): Key from IdempotencyService.make_key, if the client sent one
+
+    Returns:
+        Union[ApplicationResponse, StoredResponse]: Created application, or the
+        response to send for a keyed request
+
     Raises:
         HTTPException: For validation errors or server errors
     """
@@ -75,11 +146,17 @@ async def create_application(
         logger.info(f"Processing application submission: {sanitized_data}")
 
         # Use application service to handle business logic
+        if idempotency_key is not None:
+            return IdempotencyService.create_application(
+                db, application, idempotency_key, IdempotencyService.fingerprint(application.dict())
+            )
         created_application = ApplicationService.create_application(db, application)
 
         # Return success response with created application
         return created_application
 
+    except IdempotencyConflictError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
     except ValueError as ve:
         # Handle validation errors
         logger.warning(f"Validation error in application submission: {str(ve)}")
@@ -94,3 +171,383 @@ async def create_application(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An error occurred while processing the application"
         )
+
+@router.get(
+    "/applications/changes",
+    summary="Stream application changes",
+    description="""
+    Stream created, updated and deleted applications as Server-Sent Events
+    instead of polling the list endpoint.
+
+    Each event's `id` is a changelog sequence number (with several database
+    shards, one number per shard joined by dots). Reconnecting clients send
+    the last one they received in the `Last-Event-ID` header (or the
+    `last_event_id` query parameter) to resume without gaps. If that part of
+    the changelog has been pruned, a `resync` event is sent first and the client
+    should reload the list. Without an ID the stream starts with new changes.
+
+    Comment lines are sent as heartbeats while the stream is idle.
+    """,
+    response_class=StreamingResponse,
+    responses={
+        200: {"description": "Event stream", "content": {"text/event-stream": {}}},
+        400: {"description": "Invalid Last-Event-ID"},
+        503: {"description": "Too many open change feed streams"}
+    }
+)
+async def stream_application_changes(
+    last_event_id_header: Optional[str] = Header(
+        None,
+        alias="Last-Event-ID",
+        description="ID of the last event received, sent by EventSource on reconnect"
+    ),
+    last_event_id: Optional[str] = Query(
+        None,
+        description="ID of the last event received (for clients that cannot set headers)"
+    )
+):
+    """
+    Stream application changes as Server-Sent Events.
+
+    Args:
+        last_event_id_header (Optional[str]): Last-Event-ID header value
+        last_event_id (Optional[str]): Query parameter alternative to the header
+
+    Returns:
+        StreamingResponse: The text/event-stream response
+
+    Raises:
+        HTTPException: 400 for an invalid event ID, 503 if the stream limit is reached
+    """
+    if last_event_id_header is not None:
+        last_event_id = last_event_id_header
+    cursor = None
+    if last_event_id is not None:
+        cursor = ChangeFeedService.parse_event_id(last_event_id)
+        if cursor is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Last-Event-ID must be an event ID received from this stream"
+            )
+
+    try:
+        # Subscribe before reading the changelog so no change falls in between
+        subscription = change_feed_hub.subscribe()
+    except SubscriberLimitError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e), headers={"Retry-After": "30"})
+
+    try:
+        cursor, resync = await ChangeFeedService.resolve_start(shard_sessions, cursor)
+    except Exception as e:
+        subscription.close()
+        logger.error(f"Error opening change feed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An error occurred while opening the change feed"
+        )
+
+    return StreamingResponse(
+        ChangeFeedService.stream(
+            subscription,
+            shard_sessions,
+            cursor,
+            resync,
+            get_settings().change_feed_heartbeat_seconds
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get(
+    "/applications/{application_id}",
+    response_model=ApplicationResponse,
+    summary="Retrieve a silly walk application",
+    description="""
+    Retrieve a single application, including its silliness score and status, by its ID.
+
+    Decided applications that have been archived are returned as they were when
+    archived; they can no longer be changed.
+
+    Responses carry `ETag` and `Last-Modified` validators. Send them back in
+    `If-None-Match` / `If-Modified-Since` to get `304 Not Modified` when the
+    application has not changed.
+    """,
+    responses={
+        200: {"description": "Application found"},
+        304: {"description": "Application unchanged since the validators sent by the client"},
+        404: {"description": "Application not found"},
+        500: {"description": "Internal server error"}
+    }
+)
+async def get_application(
+    application_id: UUID,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db)
+):
+    """
+    Retrieve a silly walk grant application by ID.
+
+    Args:
+        application_id (UUID): Application ID
+        request (Request): Incoming request (for conditional headers)
+        response (Response): Outgoing response (for validator headers)
+        db (Session): Database session
+
+    Returns:
+        ApplicationResponse: The requested application, or an empty 304 response
+
+    Raises:
+        HTTPException: 404 if the application does not exist, 500 for server errors
+    """
+    try:
+        if has_conditional_headers(request.headers):
+            # Check the validators with a narrow query before loading the record
+            state = ApplicationService.get_application_state(db, application_id)
+            if state is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Application not found"
+                )
+            etag = application_etag(state.version)
+            if is_not_modified(request.headers, etag, state.updated_at):
+                return Response(
+                    status_code=status.HTTP_304_NOT_MODIFIED,
+                    headers=cache_headers(etag, state.updated_at)
+                )
+
+        application = ApplicationService.get_application_by_id(db, application_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error retrieving application: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An error occurred while retrieving the application"
+        )
+
+    if application is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Application not found"
+        )
+
+    response.headers.update(cache_headers(application_etag(application.version), application.updated_at))
+    return application
+
+@router.get(
+    "/applications",
+    response_model=Union[List[ApplicationResponse], List[ApplicationSummaryResponse]],
+    summary="List silly walk applications",
+    description="""
+    List submitted applications with offset pagination, optionally only those
+    mentioning hop/hopping at least `min_hop_count` times (an indexed filter).
+    Decided applications that have been archived are not listed; they remain
+    retrievable by ID.
+
+    With `view=summary` each item only has `id`, `walk_name`, `applicant_name`,
+    `silliness_score` and `status`; this is much cheaper for list views because
+    descriptions are never loaded.
+
+    Pages carry `ETag` and `Last-Modified` validators derived from the versions
+    of the applications on the page; send them back to get `304 Not Modified`
+    when nothing on the page has changed.
+    """,
+    responses={
+        200: {"description": "A page of applications (summaries with view=summary)"},
+        304: {"description": "Page unchanged since the validators sent by the client"},
+        400: {"description": "Invalid pagination parameters"},
+        500: {"description": "Internal server error"}
+    }
+)
+async def list_applications(
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0, description="Number of applications to skip"),
+    limit: int = Query(100, ge=1, le=100, description="Maximum number of applications to return"),
+    min_hop_count: Optional[int] = Query(
+        None,
+        ge=0,
+        description="Only return applications whose description mentions hop/hopping at least this often"
+    ),
+    view: Literal["full", "summary"] = Query(
+        "full",
+        description="`summary` returns only ID, walk name, applicant, score and status"
+    ),
+    db: Session = Depends(get_db)
+):
+    """
+    List silly walk grant applications with pagination.
+
+    Args:
+        request (Request): Incoming request (for conditional headers)
+        response (Response): Outgoing response (for validator headers)
+        skip (int): Number of records to skip
+        limit (int): Maximum number of records to return
+        min_hop_count (Optional[int]): Minimum number of hop words
+        view (str): "full" or "summary"
+        db (Session): Database session
+
+    Returns:
+        Union[List[ApplicationResponse], List[ApplicationSummaryResponse]]: A page of
+        applications (or summaries), or an empty 304 response
+
+    Raises:
+        HTTPException: For server errors
+    """
+    try:
+        if has_conditional_headers(request.headers):
+            # Validate against (id, version) of the page before loading full records
+            page_state = ApplicationService.get_page_state(db, skip, limit, min_hop_count)
+            etag = collection_etag(((row.id, row.version) for row in page_state), skip, limit, min_hop_count, view)
+            last_modified = max((row.updated_at for row in page_state), default=None)
+            if is_not_modified(request.headers, etag, last_modified):
+                return Response(
+                    status_code=status.HTTP_304_NOT_MODIFIED,
+                    headers=cache_headers(etag, last_modified)
+                )
+
+        if view == "summary":
+            # Column projection serialised directly, skipping ORM objects and Pydantic
+            summaries = ApplicationService.get_application_summaries(db, skip, limit, min_hop_count)
+            etag = collection_etag(((row.id, row.version) for row in summaries), skip, limit, min_hop_count, view)
+            last_modified = max((row.updated_at for row in summaries), default=None)
+            return Response(
+                content=dump_summaries(summaries),
+                media_type="application/json",
+                headers=cache_headers(etag, last_modified)
+            )
+
+        applications = ApplicationService.get_all_applications(db, skip, limit, min_hop_count)
+        etag = collection_etag(((app.id, app.version) for app in applications), skip, limit, min_hop_count, view)
+        last_modified = max((app.updated_at for app in applications), default=None)
+        response.headers.update(cache_headers(etag, last_modified))
+        return applications
+    except Exception as e:
+        logger.error(f"Error listing applications: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An error occurred while retrieving applications"
+        )
+
+@router.put(
+    "/applications/{application_id}/status",
+    response_model=ApplicationResponse,
+    summary="Change the status of an application",
+    description="""
+    Move an application through the review workflow.
+
+    This endpoint requires API key authentication via the X-API-Key header.
+
+    Allowed transitions:
+    - PendingReview → UnderSillyCouncilReview
+    - UnderSillyCouncilReview → PendingReview, ApprovedForFunding or RegrettablyNotSillyEnough
+
+    Send the `version` you last read to make the change conditional: if the
+    application has been modified since, the request fails with 409 instead of
+    overwriting the other change.
+
+    Archived applications can still be read but no longer changed; changing
+    their status fails with 409.
+    """,
+    responses={
+        200: {"description": "Status changed"},
+        400: {"description": "Invalid input data"},
+        401: {"description": "Missing API key"},
+        403: {"description": "Invalid API key"},
+        404: {"description": "Application not found"},
+        409: {"description": "Transition not allowed, the application was modified concurrently, or it is archived"},
+        500: {"description": "Internal server error"}
+    }
+)
+async def update_application_status(
+    application_id: UUID,
+    status_update: ApplicationStatusUpdate,
+    db: Session = Depends(get_db),
+    api_key: str = Depends(get_api_key)
+):
+    """
+    Change the status of a single application.
+
+    Args:
+        application_id (UUID): Application ID
+        status_update (ApplicationStatusUpdate): Target status and optional expected version
+        db (Session): Database session
+        api_key (str): API key for authentication
+
+    Returns:
+        ApplicationResponse: The updated application
+
+    Raises:
+        HTTPException: 404 if not found, 409 on conflicts or if archived, 500 for server errors
+    """
+    try:
+        application = ApplicationService.update_status(
+            db, application_id, status_update.status, status_update.version
+        )
+    except StatusConflictError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error updating application status: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An error occurred while updating the application status"
+        )
+
+    if application is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Application not found"
+        )
+
+    return application
+
+@router.post(
+    "/applications/status-transitions",
+    response_model=BulkStatusTransitionResult,
+    summary="Change the status of many applications",
+    description="""
+    Move up to 10,000 applications to a new status in one request.
+
+    This endpoint requires API key authentication via the X-API-Key header.
+
+    The change runs as set-based conditional updates: only applications currently
+    in an allowed source status (and in `from_status`, when given) are changed.
+    Applications that are missing, in another status, or changed concurrently by
+    another reviewer are reported in `skipped_ids`.
+    """,
+    responses={
+        200: {"description": "Transition applied; see updated_ids and skipped_ids"},
+        400: {"description": "Invalid input data"},
+        401: {"description": "Missing API key"},
+        403: {"description": "Invalid API key"},
+        500: {"description": "Internal server error"}
+    }
+)
+async def bulk_update_application_status(
+    transition: BulkStatusTransition,
+    db: Session = Depends(get_db),
+    api_key: str = Depends(get_api_key)
+):
+    """
+    Change the status of many applications at once.
+
+    Args:
+        transition (BulkStatusTransition): IDs, target status and optional source status
+        db (Session): Database session
+        api_key (str): API key for authentication
+
+    Returns:
+        BulkStatusTransitionResult: Updated and skipped application IDs
+
+    Raises:
+        HTTPException: For server errors
+    """
+    try:
+        return ApplicationService.bulk_update_status(db, transition)
+    except Exception as e:
+        logger.error(f"Error in bulk status transition: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An error occurred while updating application statuses"
+        )
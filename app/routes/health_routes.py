@@ -0,0 +1,67 @@
+"""
+API routes for health checks.
+
+This module defines the liveness and readiness endpoints used by load balancers
+and orchestrators.
+"""
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+
+from app.services.health_service import HealthService
+
+# Create router
+router = APIRouter()
+
+@router.get("/health", status_code=status.HTTP_200_OK)
+async def health_check():
+    """
+    Health check endpoint to verify API is running.
+
+    Returns:
+        dict: Status message indicating the API is operational
+    """
+    return {"status": "healthy", "message": "The Silly Walk Grant Application Orchestrator API is running"}
+
+@router.get(
+    "/health/live",
+    status_code=status.HTTP_200_OK,
+    summary="Liveness probe",
+    description="Reports that the process is running. Does not touch the database."
+)
+async def liveness():
+    """
+    Liveness endpoint for process supervisors.
+
+    Returns:
+        dict: Liveness status
+    """
+    return HealthService.liveness()
+
+@router.get(
+    "/health/ready",
+    summary="Readiness probe",
+    description="""
+    Reports whether this worker should receive traffic.
+
+    Checks database latency, connection pool saturation, thread pool queue depth
+    and the warm-state of registered caches. With several database shards every
+    shard is probed and the worst one is reported, with details per shard. Results are cached for a short time
+    (HEALTH_PROBE_CACHE_SECONDS) so health checks do not load the database.
+    """,
+    responses={
+        200: {"description": "Worker is ready to receive traffic"},
+        503: {"description": "Worker is not ready"}
+    }
+)
+async def readiness():
+    """
+    Readiness endpoint for load balancers.
+
+    Returns:
+        JSONResponse: Readiness report with status 200 (ready) or 503 (not ready)
+    """
+    report = await HealthService.readiness()
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if report["ready"] else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content=report
+    )
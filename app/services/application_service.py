@@ -9,46 +9,100 @@ from typing import List, Optional
 from uuid import UUID
 from datetime import datetime
 from sqlalchemy.orm import Session
-from app.models.schemas import ApplicationCreate, ApplicationUpdate, ApplicationResponse
-from app.models.application import Application
-from app.db.repository import ApplicationRepository
+from app.models.schemas import (
+    ApplicationCreate,
+    ApplicationUpdate,
+    ApplicationResponse,
+    ApplicationSummary,
+    BulkStatusTransition,
+    BulkStatusTransitionResult,
+)
+from app.models.application import SCORE_FINAL, SCORE_PROVISIONAL, Application, IdempotencyKey
+from app.db.repository import ApplicationRepository, ArchiveRepository
+from app.services.archive_service import ArchiveService
+from app.services.scoring_job_service import scoring_dispatcher
 from app.services.scoring_service import ScoringService
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Status workflow: current status -> statuses it may move to. Decisions are final.
+STATUS_TRANSITIONS = {
+    "PendingReview": {"UnderSillyCouncilReview"},
+    "UnderSillyCouncilReview": {"PendingReview", "ApprovedForFunding", "RegrettablyNotSillyEnough"},
+    "ApprovedForFunding": set(),
+    "RegrettablyNotSillyEnough": set(),
+}
+
+class StatusConflictError(Exception):
+    """
+    Raised when a status change conflicts with the application's current state:
+    the transition is not allowed, or the application changed concurrently.
+    """
+
+class ApplicationArchivedError(StatusConflictError):
+    """
+    Raised when a change targets an archived application, which is still
+    readable but can no longer be changed.
+    """
+
+def allowed_source_statuses(new_status: str) -> List[str]:
+    """
+    Return the statuses from which an application may move to `new_status`.
+
+    Args:
+        new_status (str): Target status
+
+    Returns:
+        List[str]: Allowed current statuses
+    """
+    return [current for current, targets in STATUS_TRANSITIONS.items() if new_status in targets]
+
 class ApplicationService:
     """
     Service for handling business logic related to walk applications.
     """
 
     @staticmethod
-    def create_application(db: Session, application_data: ApplicationCreate) -> ApplicationResponse:
+    def create_application(
+        db: Session,
+        application_data: ApplicationCreate,
+        idempotency_key: Optional[IdempotencyKey] = None
+    ) -> ApplicationResponse:
         """
         Create a new walk application with calculated silliness score.
 
         This method:
-        1. Calculates the silliness score
-        2. Creates a new Application ORM model
-        3. Persists it to the database
+        1. Checks the walk name for the originality bonus
+        2. Creates a new Application ORM model, which calculates the silliness score
+        3. Persists it to the database, with a scoring job if enrichers are configured
         4. Returns a formatted response
 
+        With enrichers configured the returned score is provisional; the
+        scoring dispatcher adds the enrichment points later.
+
         Args:
             db (Session): Database session
             application_data (ApplicationCreate): Validated application data
+            idempotency_key (Optional[IdempotencyKey]): Idempotency-Key record to store
+                with the response, in the same transaction (see IdempotencyService)
 
         Returns:
             ApplicationResponse: Created application with generated ID, score, and timestamp
 
         Raises:
+            IntegrityError: If another request committed the same idempotency key first
             ValueError: If validation fails
             Exception: For other unexpected errors
         """
         try:
-            # Calculate silliness score
-            silliness_score = ScoringService.calculate_score(application_data, db)
+            # Originality is the only scoring input that needs the database
+            is_original = ScoringService.is_original(db, application_data.walk_name)
+            now = datetime.utcnow()
+            defer_enrichment = scoring_dispatcher.enabled
 
-            # Create Application ORM model
+            # Create Application ORM model; the model derives the scoring
+            # features and the silliness score from the inputs
             new_application = Application(
                 applicant_name=application_data.applicant_name,
                 walk_name=application_data.walk_name,
@@ -56,13 +110,19 @@ class ApplicationService:
                 has_briefcase=application_data.has_briefcase,
                 involves_hopping=application_data.involves_hopping,
                 number_of_twirls=application_data.number_of_twirls,
-                silliness_score=silliness_score,
+                is_original=is_original,
                 status="PendingReview",
-                submission_timestamp=datetime.utcnow()
+                score_status=SCORE_PROVISIONAL if defer_enrichment else SCORE_FINAL,
+                submission_timestamp=now,
+                updated_at=now
             )
 
             # Save to database
-            created_application = ApplicationRepository.create(db, new_application)
+            created_application = ApplicationRepository.create(
+                db, new_application, enqueue_scoring=defer_enrichment, idempotency_key=idempotency_key
+            )
+            if defer_enrichment:
+                scoring_dispatcher.notify()
 
             # Log successful creation (without sensitive data)
             logger.info(f"New application created with ID: {created_application.id}")
@@ -80,7 +140,7 @@ class ApplicationService:
     @staticmethod
     def get_application_by_id(db: Session, application_id: UUID) -> Optional[ApplicationResponse]:
         """
-        Retrieve an application by its ID.
+        Retrieve an application by its ID, from the archive if it has been archived.
 
         Args:
             db (Session): Database session
@@ -94,6 +154,9 @@ class ApplicationService:
         """
         try:
             application = ApplicationRepository.get_by_id(db, application_id)
+            if application is None:
+                # Decided applications may have moved to the archive
+                application = ArchiveService.get_archived(db, application_id)
             if application:
                 return ApplicationResponse.from_orm(application)
             return None
@@ -102,7 +165,67 @@ class ApplicationService:
             raise
 
     @staticmethod
-    def get_all_applications(db: Session, skip: int = 0, limit: int = 100) -> List[ApplicationResponse]:
+    def get_application_state(db: Session, application_id: UUID):
+        """
+        Retrieve only the status, version and modification time of an application,
+        e.g. to answer conditional requests without loading the full record.
+
+        Args:
+            db (Session): Database session
+            application_id (UUID): Application UUID
+
+        Returns:
+            Optional[Row]: Row (or archived Application) with status, version and updated_at,
+            or None if not found
+
+        Raises:
+            Exception: For unexpected errors
+        """
+        try:
+            state = ApplicationRepository.get_state(db, application_id)
+            if state is None:
+                # Archived applications are read whole; the segment row group is cached
+                state = ArchiveService.get_archived(db, application_id)
+            return state
+        except Exception as e:
+            logger.error(f"Error retrieving state of application {application_id}: {str(e)}")
+            raise
+
+    @staticmethod
+    def get_page_state(
+        db: Session,
+        skip: int = 0,
+        limit: int = 100,
+        min_hop_count: Optional[int] = None
+    ) -> list:
+        """
+        Retrieve the ID, version and modification time of each application on a page.
+
+        Args:
+            db (Session): Database session
+            skip (int): Number of records to skip
+            limit (int): Maximum number of records to return
+            min_hop_count (Optional[int]): Only include applications with at least this many hop words
+
+        Returns:
+            list: Rows with id, version and updated_at, in list order
+
+        Raises:
+            Exception: For unexpected errors
+        """
+        try:
+            return ApplicationRepository.get_page_state(db, skip, limit, min_hop_count)
+        except Exception as e:
+            logger.error(f"Error retrieving application page state: {str(e)}")
+            raise
+
+    @staticmethod
+    def get_all_applications(
+        db: Session,
+        skip: int = 0,
+        limit: int = 100,
+        min_hop_count: Optional[int] = None
+    ) -> List[ApplicationResponse]:
         """
         Retrieve a list of applications with pagination.
 
@@ -110,6 +233,7 @@ class ApplicationService:
             db (Session): Database session
             skip (int): Number of records to skip
             limit (int): Maximum number of records to return
+            min_hop_count (Optional[int]): Only return applications with at least this many hop words
 
         Returns:
             List[ApplicationResponse]: List of applications
@@ -118,8 +242,126 @@ class ApplicationService:
             Exception: For unexpected errors
         """
         try:
-            applications = ApplicationRepository.get_all(db, skip, limit)
+            applications = ApplicationRepository.get_all(db, skip, limit, min_hop_count)
             return [ApplicationResponse.from_orm(app) for app in applications]
         except Exception as e:
             logger.error(f"Error retrieving applications: {str(e)}")
             raise
+
+    @staticmethod
+    def get_application_summaries(
+        db: Session,
+        skip: int = 0,
+        limit: int = 100,
+        min_hop_count: Optional[int] = None
+    ) -> List[ApplicationSummary]:
+        """
+        Retrieve a page of lightweight application summaries for list views.
+
+        Args:
+            db (Session): Database session
+            skip (int): Number of records to skip
+            limit (int): Maximum number of records to return
+            min_hop_count (Optional[int]): Only return applications with at least this many hop words
+
+        Returns:
+            List[ApplicationSummary]: Summary rows, in list order
+
+        Raises:
+            Exception: For unexpected errors
+        """
+        try:
+            return ApplicationRepository.get_summaries(db, skip, limit, min_hop_count)
+        except Exception as e:
+            logger.error(f"Error retrieving application summaries: {str(e)}")
+            raise
+
+    @staticmethod
+    def update_status(
+        db: Session,
+        application_id: UUID,
+        new_status: str,
+        expected_version: Optional[int] = None
+    ) -> Optional[ApplicationResponse]:
+        """
+        Move one application to a new status.
+
+        Args:
+            db (Session): Database session
+            application_id (UUID): Application UUID
+            new_status (str): Target status
+            expected_version (Optional[int]): Version the client last saw
+
+        Returns:
+            Optional[ApplicationResponse]: Updated application, or None if it does not exist
+
+        Raises:
+            ApplicationArchivedError: If the application has been archived
+            StatusConflictError: If the transition is not allowed or the version does not match
+            Exception: For unexpected errors
+        """
+        try:
+            updated = ApplicationRepository.update_status(
+                db, application_id, new_status, allowed_source_statuses(new_status), expected_version
+            )
+            if updated is not None:
+                logger.info(f"Application {application_id} moved to {new_status}")
+                return ApplicationResponse.from_orm(updated)
+
+            # The conditional update matched nothing; find out why
+            current = ApplicationRepository.get_state(db, application_id)
+            if current is None:
+                if ArchiveRepository.locate(db, application_id) is not None:
+                    raise ApplicationArchivedError("Application is archived and can no longer be changed")
+                return None
+            if expected_version is not None and current.version != expected_version:
+                raise StatusConflictError("Application was modified by another request; reload and retry")
+            raise StatusConflictError(f"Cannot change status from {current.status} to {new_status}")
+        except StatusConflictError:
+            raise
+        except Exception as e:
+            logger.error(f"Error updating status of application {application_id}: {str(e)}")
+            raise
+
+    @staticmethod
+    def bulk_update_status(db: Session, transition: BulkStatusTransition) -> BulkStatusTransitionResult:
+        """
+        Move many applications to a new status with set-based updates.
+
+        Applications not in an allowed source status (or not in `from_status`,
+        when given) are skipped rather than failing the whole request.
+
+        Args:
+            db (Session): Database session
+            transition (BulkStatusTransition): IDs, target status and optional source status
+
+        Returns:
+            BulkStatusTransitionResult: Which applications were updated or skipped
+
+        Raises:
+            Exception: For unexpected errors
+        """
+        # De-duplicate while keeping request order
+        application_ids = list(dict.fromkeys(transition.application_ids))
+
+        allowed_from = allowed_source_statuses(transition.status)
+        if transition.from_status is not None:
+            allowed_from = [status for status in allowed_from if status == transition.from_status]
+
+        try:
+            updated_ids = []
+            if allowed_from:
+                updated_ids = ApplicationRepository.bulk_update_status(
+                    db, application_ids, transition.status, allowed_from
+                )
+            updated_set = set(updated_ids)
+            logger.info(f"Bulk status transition to {transition.status}: {len(updated_ids)} of {len(application_ids)} updated")
+            return BulkStatusTransitionResult(
+                requested=len(application_ids),
+                updated=len(updated_ids),
+                updated_ids=[app_id for app_id in application_ids if app_id in updated_set],
+                skipped_ids=[app_id for app_id in application_ids if app_id not in updated_set]
+            )
+        except Exception as e:
+            logger.error(f"Error in bulk status transition: {str(e)}")
+            raise
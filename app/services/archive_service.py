@@ -0,0 +1,165 @@
+"""
+Archive service for decided silly walk grant applications.
+
+This module moves applications whose decision is final out of the hot
+applications table into append-only columnar segment files, and reads them back
+by ID. Archived applications are read-only snapshots: they no longer appear in
+lists or the change feed and are not rescored.
+"""
+import logging
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+from sqlalchemy import DateTime
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from app.db.archive import KIND_DATETIME, KIND_UUID, KIND_VALUE, SegmentStore, archive_store
+from app.db.database import fan_out, is_sharded
+from app.db.repository import ArchiveRepository
+from app.db.types import BinaryUUID
+from app.models.application import Application
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Statuses that can no longer change, and so may be archived
+ARCHIVABLE_STATUSES = ("ApprovedForFunding", "RegrettablyNotSillyEnough")
+
+def _column_kinds() -> dict:
+    """Map each applications column to its segment column kind."""
+    kinds = {}
+    for column in Application.__table__.columns:
+        if isinstance(column.type, BinaryUUID):
+            kinds[column.name] = KIND_UUID
+        elif isinstance(column.type, DateTime):
+            kinds[column.name] = KIND_DATETIME
+        else:
+            kinds[column.name] = KIND_VALUE
+    return kinds
+
+class ArchiveService:
+    """
+    Service for archiving decided applications and reading them back.
+    """
+
+    @staticmethod
+    def archive_decided(
+        db: Session,
+        older_than: datetime,
+        segment_rows: int,
+        store: SegmentStore = archive_store
+    ) -> int:
+        """
+        Move decided applications last modified before a cutoff to new segments.
+
+        Each batch of up to `segment_rows` applications is written to its own
+        segment first, then indexed and deleted from the applications table in
+        one transaction. If that transaction fails, or an application changed
+        after it was read, the segment is discarded and archiving stops; the
+        remaining applications are picked up by the next run. On a sharded
+        database every shard archives its own applications concurrently, into
+        segments of the shared store.
+
+        Args:
+            db (Session): Database session
+            older_than (datetime): Only archive applications last modified before this time
+            segment_rows (int): Maximum number of applications per segment
+            store (SegmentStore): Segment store to write to
+
+        Returns:
+            int: Number of applications archived
+
+        Raises:
+            Exception: For unexpected errors
+        """
+        if is_sharded(db):
+            return sum(fan_out(db, ArchiveService.archive_decided, older_than, segment_rows, store))
+
+        kinds = _column_kinds()
+        archived = 0
+        try:
+            while True:
+                applications = ArchiveRepository.get_candidates(db, ARCHIVABLE_STATUSES, older_than, segment_rows)
+                if not applications:
+                    break
+
+                rows = [{name: getattr(application, name) for name in kinds} for application in applications]
+                segment = store.write(kinds, rows)
+                try:
+                    moved = ArchiveRepository.move(db, applications, segment)
+                except Exception:
+                    store.discard(segment)
+                    raise
+                if not moved:
+                    store.discard(segment)
+                    logger.warning("Applications changed while being archived; stopping until the next run")
+                    break
+
+                archived += len(rows)
+                logger.info(f"Archived {len(rows)} applications to segment {segment}")
+            return archived
+        except Exception as e:
+            logger.error(f"Error archiving applications: {str(e)}")
+            raise
+
+    @staticmethod
+    def get_archived(
+        db: Session,
+        application_id: UUID,
+        store: SegmentStore = archive_store
+    ) -> Optional[Application]:
+        """
+        Read an archived application.
+
+        Args:
+            db (Session): Database session
+            application_id (UUID): Application UUID
+            store (SegmentStore): Segment store to read from
+
+        Returns:
+            Optional[Application]: Detached, read-only application if archived, None otherwise
+
+        Raises:
+            Exception: For unexpected errors
+        """
+        try:
+            location = ArchiveRepository.locate(db, application_id)
+            if location is None:
+                return None
+            return ArchiveService._to_application(store.read(location.segment, location.position))
+        except Exception as e:
+            logger.error(f"Error reading archived application {application_id}: {str(e)}")
+            raise
+
+    @staticmethod
+    def is_walk_name_archived(db: Session, walk_name: str, store: SegmentStore = archive_store) -> bool:
+        """
+        Check whether an archived application uses a walk name.
+
+        Args:
+            db (Session): Database session
+            walk_name (str): Walk name to check
+            store (SegmentStore): Segment store to read from
+
+        Returns:
+            bool: True if an archived application has this walk name
+        """
+        return any(
+            store.read(location.segment, location.position)["walk_name"] == walk_name
+            for location in ArchiveRepository.locate_walk_name(db, walk_name)
+        )
+
+    @staticmethod
+    def _to_application(record: dict) -> Application:
+        """
+        Build a transient Application from a segment record.
+
+        Values are set as committed state, so the scoring validators do not run
+        and the archived scores are kept as they were. Columns added after a
+        segment was written take their default.
+        """
+        application = Application()
+        for column in Application.__table__.columns:
+            default = column.default.arg if column.default is not None and column.default.is_scalar else None
+            set_committed_value(application, column.name, record.get(column.name, default))
+        return application
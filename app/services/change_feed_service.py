@@ -0,0 +1,210 @@
+"""
+Change feed service for streaming application changes.
+
+This module turns the changelog into a Server-Sent Events stream. A stream
+first replays changes after the client's Last-Event-ID from the changelog
+table, then follows live changes from the in-process broadcast hub. Streams
+that fall behind, or notice a gap in sequence numbers (e.g. changes written by
+another worker), catch up from the table again, so no change is skipped.
+
+Every shard has its own changelog, so the stream position is a cursor of one
+sequence number per shard. Event IDs are that cursor joined with dots
+("12.40.7"); with a single database they are plain sequence numbers. Changes of
+one application are always in order; changes of different shards are
+interleaved by time.
+"""
+import asyncio
+import heapq
+import json
+import logging
+from operator import attrgetter
+from typing import AsyncIterator, Callable, List, Optional, Sequence, Tuple
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.db.repository import ApplicationChangeRepository
+from app.utils.broadcast import Subscription
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Changes read from the changelog per query while catching up
+CATCH_UP_BATCH_SIZE = 500
+
+# Reconnection delay suggested to EventSource clients, in milliseconds
+RETRY_MS = 3000
+
+class ChangeFeedService:
+    """
+    Service for reading and streaming the application changelog.
+    """
+
+    @staticmethod
+    def parse_event_id(value: str) -> Optional[List[int]]:
+        """
+        Parse an event ID sent back by a client.
+
+        Args:
+            value (str): Event ID
+
+        Returns:
+            Optional[List[int]]: Sequence number per shard, or None if the ID is malformed
+        """
+        parts = value.split(".")
+        if not all(part.isdigit() for part in parts):
+            return None
+        return [int(part) for part in parts]
+
+    @staticmethod
+    def event_id(cursor: Sequence[int]) -> str:
+        """Format a cursor as an event ID."""
+        return ".".join(str(seq) for seq in cursor)
+
+    @staticmethod
+    def format_event(change, event_id: str) -> str:
+        """
+        Serialize a changelog row as an SSE event.
+
+        Args:
+            change: Changelog row (shard, seq, application_id, change, status, version, changed_at)
+            event_id (str): Event ID of the stream position after this change
+
+        Returns:
+            str: SSE event
+        """
+        data = json.dumps({
+            "application_id": str(change.application_id),
+            "change": change.change,
+            "status": change.status,
+            "version": change.version,
+            "changed_at": change.changed_at.isoformat(),
+        }, separators=(",", ":"))
+        return f"id: {event_id}\nevent: {change.change}\ndata: {data}\n\n"
+
+    @staticmethod
+    def _read(session_factory: Callable[[], Session], reader, *args):
+        """Run a changelog query on a short-lived session."""
+        db = session_factory()
+        try:
+            return reader(db, *args)
+        finally:
+            db.close()
+
+    @staticmethod
+    async def _read_shards(
+        session_factories: Sequence[Callable[[], Session]],
+        reader,
+        args_per_shard: Optional[Sequence[Sequence]] = None
+    ) -> list:
+        """Run a changelog query on every shard concurrently, with optional arguments per shard."""
+        if args_per_shard is None:
+            args_per_shard = [()] * len(session_factories)
+        return await asyncio.gather(*(
+            run_in_threadpool(ChangeFeedService._read, session_factory, reader, *args)
+            for session_factory, args in zip(session_factories, args_per_shard)
+        ))
+
+    @staticmethod
+    async def resolve_start(
+        session_factories: Sequence[Callable[[], Session]],
+        last_event_id: Optional[List[int]]
+    ) -> Tuple[List[int], bool]:
+        """
+        Decide where a new stream starts.
+
+        Args:
+            session_factories (Sequence[Callable[[], Session]]): Session factory per shard
+            last_event_id (Optional[List[int]]): Parsed last event ID the client has seen, if resuming
+
+        Returns:
+            Tuple[List[int], bool]: Sequence number per shard to stream after, and
+            whether the client must resynchronise because the requested history
+            is no longer available
+        """
+        all_bounds = await ChangeFeedService._read_shards(session_factories, ApplicationChangeRepository.get_bounds)
+        last_seqs = [bounds.last_seq or 0 for bounds in all_bounds]
+        if last_event_id is None:
+            return last_seqs, False
+        if len(last_event_id) != len(session_factories):
+            # Issued before the number of shards changed
+            return last_seqs, True
+
+        for bounds, last_seq, seen in zip(all_bounds, last_seqs, last_event_id):
+            first_seq = bounds.first_seq if bounds.first_seq is not None else last_seq + 1
+            if seen < first_seq - 1 or seen > last_seq:
+                # Pruned history, or an ID from a different database
+                return last_seqs, True
+        return list(last_event_id), False
+
+    @staticmethod
+    async def stream(
+        subscription: Subscription,
+        session_factories: Sequence[Callable[[], Session]],
+        cursor: List[int],
+        resync: bool,
+        heartbeat_seconds: float
+    ) -> AsyncIterator[str]:
+        """
+        Stream changes after `cursor` as SSE events, forever.
+
+        Args:
+            subscription (Subscription): Broadcast hub subscription, opened before
+                `cursor` was resolved so no live change is missed; closed on exit
+            session_factories (Sequence[Callable[[], Session]]): Session factory per shard
+            cursor (List[int]): Sequence number per shard to stream after
+            resync (bool): Whether to tell the client its history is gone
+            heartbeat_seconds (float): Idle time after which a comment line is sent
+
+        Yields:
+            str: SSE-formatted chunks
+        """
+        event_id = ChangeFeedService.event_id
+        format_event = ChangeFeedService.format_event
+        cursor = list(cursor)
+        try:
+            yield f"retry: {RETRY_MS}\n\n"
+            if resync:
+                yield f"id: {event_id(cursor)}\nevent: resync\ndata: {{}}\n\n"
+
+            catch_up = True
+            while True:
+                if catch_up:
+                    subscription.reset()
+                    while True:
+                        batches = await ChangeFeedService._read_shards(
+                            session_factories,
+                            ApplicationChangeRepository.get_since,
+                            [(seq, CATCH_UP_BATCH_SIZE, shard) for shard, seq in enumerate(cursor)]
+                        )
+                        chunks = []
+                        for change in heapq.merge(*batches, key=attrgetter("changed_at")):
+                            cursor[change.shard] = change.seq
+                            chunks.append(format_event(change, event_id(cursor)))
+                        if chunks:
+                            yield "".join(chunks)
+                        if all(len(changes) < CATCH_UP_BATCH_SIZE for changes in batches):
+                            break
+                    catch_up = False
+
+                changes = await subscription.next_batch(heartbeat_seconds)
+                if subscription.overflowed:
+                    catch_up = True
+                    continue
+                if not changes:
+                    # Keeps proxies from closing idle connections
+                    yield ": keep-alive\n\n"
+                    continue
+
+                chunks = []
+                for change in changes:
+                    if change.seq <= cursor[change.shard]:
+                        continue
+                    if change.seq != cursor[change.shard] + 1:
+                        # Missing sequence numbers: read them from the changelog
+                        catch_up = True
+                        break
+                    cursor[change.shard] = change.seq
+                    chunks.append(format_event(change, event_id(cursor)))
+                if chunks:
+                    yield "".join(chunks)
+        finally:
+            subscription.close()
@@ -0,0 +1,214 @@
+"""
+Health service for liveness and readiness reporting.
+
+This module probes the database (every shard, if sharded) and the worker's
+resources (connection pools, thread pool) to decide whether the process should
+receive traffic. Probe results are cached briefly so frequent health checks
+cannot become a load source.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional, Sequence, Tuple
+from anyio import to_thread
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from starlette.concurrency import run_in_threadpool
+from app.config import get_settings
+from app.db.database import engines as default_engines
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+class HealthService:
+    """
+    Service for computing liveness and readiness of the API worker.
+    """
+
+    # Named reporters for caches/queues owned by other modules, e.g. {"openapi_cache": fn}
+    _components: Dict[str, Callable[[], dict]] = {}
+
+    # (monotonic timestamp, readiness report) of the last probe
+    _cached: Optional[Tuple[float, dict]] = None
+    _probe_lock: Optional[asyncio.Lock] = None
+
+    @classmethod
+    def register_component(cls, name: str, reporter: Callable[[], dict]) -> None:
+        """
+        Register a component whose state is included in the readiness report.
+
+        A reporter returns a small dict; if it contains "ready": False the worker
+        is reported as not ready.
+
+        Args:
+            name (str): Component name shown in the report
+            reporter (Callable[[], dict]): Function returning the component state
+        """
+        cls._components[name] = reporter
+
+    @staticmethod
+    def liveness() -> dict:
+        """
+        Report that the process is up. Never touches external dependencies.
+
+        Returns:
+            dict: Liveness status
+        """
+        return {"status": "alive"}
+
+    @classmethod
+    async def readiness(cls, engines: Sequence[Engine] = default_engines) -> dict:
+        """
+        Report whether this worker should receive traffic.
+
+        Results are reused for HEALTH_PROBE_CACHE_SECONDS, and only one probe runs
+        at a time; concurrent callers wait for it and share the result.
+
+        Args:
+            engines (Sequence[Engine]): Database engines to probe, one per shard
+
+        Returns:
+            dict: Readiness report with a boolean "ready" key
+        """
+        settings = get_settings()
+
+        cached = cls._fresh_report(settings.health_probe_cache_seconds)
+        if cached is not None:
+            return cached
+
+        if cls._probe_lock is None:
+            cls._probe_lock = asyncio.Lock()
+
+        async with cls._probe_lock:
+            # Another caller may have refreshed the report while we waited
+            cached = cls._fresh_report(settings.health_probe_cache_seconds)
+            if cached is not None:
+                return cached
+
+            report = await cls._probe(engines)
+            cls._cached = (time.monotonic(), report)
+            return dict(report, cached=False)
+
+    @classmethod
+    def _fresh_report(cls, max_age: float) -> Optional[dict]:
+        """Return the cached report if it is younger than max_age seconds."""
+        if cls._cached is None:
+            return None
+        checked_at, report = cls._cached
+        if time.monotonic() - checked_at > max_age:
+            return None
+        return dict(report, cached=True)
+
+    @classmethod
+    async def _probe(cls, engines: Sequence[Engine]) -> dict:
+        """Run all readiness checks and build the report."""
+        settings = get_settings()
+
+        pools = [cls._pool_stats(engine) for engine in engines]
+        threadpool = cls._threadpool_stats()
+
+        async def probe_shard(engine: Engine, pool: dict) -> dict:
+            # An exhausted pool would make the probe itself block until the pool timeout
+            if pool.get("available") == 0:
+                return {"ok": False, "latency_ms": None, "error": "connection pool exhausted"}
+            return await cls._probe_database(engine, settings.health_probe_timeout_seconds)
+
+        databases = await asyncio.gather(*(probe_shard(engine, pool) for engine, pool in zip(engines, pools)))
+
+        # The worst shard decides readiness
+        database = next(
+            (result for result in databases if not result["ok"]),
+            max(databases, key=lambda result: result["latency_ms"])
+        )
+        pool = max(pools, key=lambda stats: stats.get("saturation") or 0)
+
+        components = {}
+        for name, reporter in cls._components.items():
+            try:
+                components[name] = reporter()
+            except Exception as e:
+                logger.error(f"Health reporter '{name}' failed: {str(e)}")
+                components[name] = {"ready": False, "error": "reporter failed"}
+
+        reasons = []
+        if not database["ok"]:
+            reasons.append("database unavailable")
+        elif database["latency_ms"] > settings.readiness_max_db_latency_ms:
+            reasons.append("database latency above threshold")
+        if pool.get("saturation") is not None and pool["saturation"] >= settings.readiness_max_pool_saturation:
+            reasons.append("connection pool saturated")
+        reasons.extend(f"{name} not ready" for name, state in components.items() if state.get("ready") is False)
+
+        checks = {
+            "database": dict(database, threshold_ms=settings.readiness_max_db_latency_ms),
+            "pool": pool,
+            "threadpool": threadpool,
+        }
+        if len(engines) > 1:
+            checks["shards"] = [
+                {"database": shard_database, "pool": shard_pool}
+                for shard_database, shard_pool in zip(databases, pools)
+            ]
+
+        return {
+            "status": "ready" if not reasons else "not_ready",
+            "ready": not reasons,
+            "reasons": reasons,
+            "checked_at": datetime.utcnow().isoformat() + "Z",
+            "checks": checks,
+            "components": components,
+        }
+
+    @staticmethod
+    async def _probe_database(engine: Engine, timeout: float) -> dict:
+        """Time a trivial query on a pooled connection."""
+
+        def ping() -> float:
+            started = time.perf_counter()
+            with engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+            return (time.perf_counter() - started) * 1000
+
+        try:
+            latency_ms = await asyncio.wait_for(run_in_threadpool(ping), timeout=timeout)
+            return {"ok": True, "latency_ms": round(latency_ms, 3)}
+        except asyncio.TimeoutError:
+            logger.warning("Readiness database probe timed out")
+            return {"ok": False, "latency_ms": None, "error": "probe timed out"}
+        except Exception as e:
+            # Log the details but keep the report generic
+            logger.error(f"Readiness database probe failed: {str(e)}")
+            return {"ok": False, "latency_ms": None, "error": "probe failed"}
+
+    @staticmethod
+    def _pool_stats(engine: Engine) -> dict:
+        """Describe connection pool usage, if the pool exposes it."""
+        pool = engine.pool
+        if not hasattr(pool, "checkedout"):
+            return {"type": type(pool).__name__, "saturation": None}
+
+        size = pool.size()
+        checked_out = pool.checkedout()
+        max_overflow = getattr(pool, "_max_overflow", 0)
+        capacity = size + max_overflow if max_overflow >= 0 else None
+
+        return {
+            "type": type(pool).__name__,
+            "size": size,
+            "checked_out": checked_out,
+            "overflow": max(pool.overflow(), 0),
+            "available": None if capacity is None else max(capacity - checked_out, 0),
+            "saturation": None if not capacity else round(checked_out / capacity, 3),
+        }
+
+    @staticmethod
+    def _threadpool_stats() -> dict:
+        """Describe the thread pool running sync dependencies such as get_db."""
+        limiter = to_thread.current_default_thread_limiter()
+        statistics = limiter.statistics()
+        return {
+            "busy": statistics.borrowed_tokens,
+            "limit": statistics.total_tokens,
+            "queue_depth": statistics.tasks_waiting,
+        }
@@ -0,0 +1,129 @@
+"""
+Idempotency service for safely retried submissions.
+
+A POST /applications with an Idempotency-Key header stores the key, a
+fingerprint of the payload and the response in the idempotency_keys table, in
+the same transaction as the new application. A retry with the same key and
+payload replays the stored response without writing anything; reusing the key
+with a different payload is rejected.
+
+The key is unique in the database, so this holds across worker processes: a
+duplicate sent while the first request is still in flight waits for that
+request's transaction (SQLite's write lock, or the uncommitted key on other
+databases), then fails to insert the key and replays the stored response.
+"""
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+from http import HTTPStatus
+from typing import NamedTuple
+from uuid import UUID
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.config import get_settings
+from app.db.repository import IdempotencyKeyRepository
+from app.models.application import IdempotencyKey
+from app.models.schemas import ApplicationCreate
+from app.services.application_service import ApplicationService
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+class StoredResponse(NamedTuple):
+    """The response to send for a keyed request."""
+    status_code: int
+    body: bytes
+    # Whether the response was stored by an earlier request with the same key
+    replayed: bool
+
+class IdempotencyConflictError(Exception):
+    """The idempotency key was already used with a different request payload."""
+
+class IdempotencyService:
+    """
+    Service for creating applications at most once per Idempotency-Key.
+    """
+
+    @staticmethod
+    def make_key(scope: str, idempotency_key: str) -> UUID:
+        """
+        Derive the stored key from the caller scope and the client's key.
+
+        Args:
+            scope (str): Caller identity (e.g. the API key) so clients cannot collide
+            idempotency_key (str): Value of the Idempotency-Key header
+
+        Returns:
+            UUID: 16-byte digest, shaped as a UUID so it can be sharded like an ID
+        """
+        return UUID(bytes=hashlib.blake2b(f"{scope}\0{idempotency_key}".encode("utf-8"), digest_size=16).digest())
+
+    @staticmethod
+    def fingerprint(payload: dict) -> bytes:
+        """
+        Fingerprint a request payload to detect key reuse with different data.
+
+        Args:
+            payload (dict): Validated request payload
+
+        Returns:
+            bytes: 16-byte digest
+        """
+        canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).digest()
+
+    @staticmethod
+    def create_application(
+        db: Session,
+        application_data: ApplicationCreate,
+        key: UUID,
+        fingerprint: bytes
+    ) -> StoredResponse:
+        """
+        Create an application for a keyed request, or replay the response stored for the key.
+
+        Args:
+            db (Session): Database session
+            application_data (ApplicationCreate): Validated application data
+            key (UUID): Key from make_key
+            fingerprint (bytes): Payload fingerprint from fingerprint
+
+        Returns:
+            StoredResponse: The response of the request that first used the key
+
+        Raises:
+            IdempotencyConflictError: If the key was used with a different payload
+            ValueError: If validation fails
+            Exception: For other unexpected errors
+        """
+        record = IdempotencyKeyRepository.get(db, key)
+        if record is not None:
+            expires_before = datetime.utcnow() - timedelta(seconds=get_settings().idempotency_ttl_seconds)
+            if record.created_at >= expires_before:
+                return IdempotencyService._replay(record, fingerprint)
+            # Expired but not purged yet: reuse the key, in the transaction that creates the application
+            IdempotencyKeyRepository.delete_expired(db, record, expires_before)
+
+        try:
+            created_application = ApplicationService.create_application(
+                db,
+                application_data,
+                idempotency_key=IdempotencyKey(key=key, fingerprint=fingerprint, status_code=HTTPStatus.CREATED)
+            )
+        except IntegrityError:
+            # A request with the same key committed first (this one waited for it)
+            record = IdempotencyKeyRepository.get(db, key)
+            if record is None:
+                raise
+            return IdempotencyService._replay(record, fingerprint)
+
+        return StoredResponse(HTTPStatus.CREATED, created_application.json().encode("utf-8"), replayed=False)
+
+    @staticmethod
+    def _replay(record: IdempotencyKey, fingerprint: bytes) -> StoredResponse:
+        """Return the stored response if the payload matches the one it was stored for."""
+        if record.fingerprint != fingerprint:
+            raise IdempotencyConflictError("Idempotency-Key was already used with a different request")
+        logger.info(f"Replaying stored response for application {record.application_id}")
+        return StoredResponse(record.status_code, record.response_body, replayed=True)
@@ -0,0 +1,360 @@
+"""
+Deferred score enrichment on a worker pool.
+
+This module runs the second phase of two-phase scoring. Submissions are always
+scored synchronously with the rules in app/utils/scoring_rules.py. When
+enrichers are configured (SCORING_ENRICHERS), that score is stored as
+provisional together with a queued scoring job, so intake latency does not
+depend on how expensive the enrichers are. The dispatcher claims due jobs from
+every shard, runs the enrichers on a process pool and adds their points to the
+score, which then becomes final.
+
+At most one job per worker process is in flight (fewer with
+SCORING_MAX_IN_FLIGHT), so a claimed job starts running at once instead of
+waiting in the pool. SCORING_JOB_TIMEOUT is enforced inside the worker from
+the moment the job starts; if a worker does not return even after
+WORKER_START_ALLOWANCE more seconds (e.g. it is stuck in C code), the pool is
+terminated and replaced, because a running task cannot be cancelled.
+
+A failed attempt is retried after SCORING_RETRY_BACKOFF seconds, doubling per
+attempt; after SCORING_MAX_ATTEMPTS the application keeps its provisional score
+with the status enrichment_failed. Jobs claimed by a process that died are
+claimed again once their lease has expired. Queue depth and dispatch counters
+are reported on the health endpoint.
+"""
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Callable, Optional, Sequence, Set
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.config import get_settings
+from app.db.database import shard_sessions
+from app.db.repository import ScoringJobRepository
+from app.utils.score_enrichment import EnrichmentInput, load_enrichers, run_enrichers
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Seconds on top of the job timeout before the dispatcher gives up on a worker:
+# time to start a worker process and import the enrichers
+WORKER_START_ALLOWANCE = 15.0
+
+class ScoringDispatcher:
+    """
+    Claims scoring jobs and runs the enrichers on a process pool.
+
+    Runs as an asyncio task of the API worker (start()/stop()), or in a
+    dedicated process through scripts/scoring_jobs.py. Several dispatchers may
+    share the queue; each job is claimed by exactly one of them.
+    """
+
+    def __init__(
+        self,
+        enrichers: Sequence[str],
+        workers: int,
+        max_in_flight: int,
+        poll_interval: float,
+        max_attempts: int,
+        retry_backoff: float,
+        job_timeout: float,
+        session_factories: Sequence[Callable[[], Session]] = shard_sessions
+    ):
+        self.enrichers = tuple(enrichers)
+        self.workers = workers
+        # More jobs than workers would wait in the pool while their time and lease run
+        self.max_in_flight = max(1, min(max_in_flight, workers))
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.job_timeout = job_timeout
+        self.session_factories = list(session_factories)
+
+        self.completed = 0
+        self.retried = 0
+        self.failed = 0
+        self.pool_restarts = 0
+        self.enrichment_seconds = 0.0
+        self._queue = {"queued": 0, "running": 0, "failed": 0, "oldest_queued": None}
+        self._last_poll: Optional[datetime] = None
+        self._next_shard = 0
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._in_flight: Set[asyncio.Task] = set()
+
+    @property
+    def deadline_seconds(self) -> float:
+        """How long the dispatcher waits for a worker to return one job."""
+        return self.job_timeout + WORKER_START_ALLOWANCE
+
+    @property
+    def lease_seconds(self) -> float:
+        """Age after which a running job is assumed abandoned and claimed again."""
+        return 2 * self.deadline_seconds
+
+    @property
+    def enabled(self) -> bool:
+        """Whether submissions get a provisional score and a scoring job."""
+        return bool(self.enrichers)
+
+    def start(self) -> None:
+        """Start dispatching on the running event loop."""
+        if self._task is not None:
+            return
+        # Fail at startup rather than on every job if an enricher cannot be imported
+        load_enrichers(self.enrichers)
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self.run())
+        logger.info(f"Scoring dispatcher started with {self.workers} worker process(es)")
+
+    async def stop(self) -> None:
+        """
+        Stop dispatching and shut the process pool down.
+
+        Jobs still in flight stay claimed and are picked up again when their
+        lease expires.
+        """
+        tasks = [task for task in [self._task, *self._in_flight] if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        self._loop = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def notify(self) -> None:
+        """Wake the dispatcher after a job was queued. Thread-safe; no-op when not running."""
+        loop, wakeup = self._loop, self._wakeup
+        if loop is None or wakeup is None:
+            return
+        try:
+            loop.call_soon_threadsafe(wakeup.set)
+        except RuntimeError:
+            # The loop has been closed (e.g. during shutdown)
+            pass
+
+    async def run(self) -> None:
+        """Dispatch until cancelled, polling every poll_interval or when notified."""
+        if self._wakeup is None:
+            self._loop = asyncio.get_running_loop()
+            self._wakeup = asyncio.Event()
+        while True:
+            try:
+                await self.dispatch_once()
+            except Exception as e:
+                logger.error(f"Error dispatching scoring jobs: {str(e)}")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def drain(self) -> int:
+        """
+        Process due jobs until none are left (jobs waiting for a retry are not due).
+
+        Returns:
+            int: Number of jobs finished, successfully or not
+        """
+        finished_before = self.completed + self.retried + self.failed
+        while True:
+            claimed = await self.dispatch_once()
+            if self._in_flight:
+                await asyncio.wait(self._in_flight, return_when=asyncio.FIRST_COMPLETED)
+            elif not claimed:
+                return self.completed + self.retried + self.failed - finished_before
+
+    async def dispatch_once(self) -> int:
+        """
+        Claim due jobs up to the in-flight limit and start them; refresh the queue statistics.
+
+        Returns:
+            int: Number of jobs claimed
+        """
+        claimed = 0
+        shard_count = len(self.session_factories)
+        # Start at a different shard every time, so a busy shard cannot starve the others
+        order = [(self._next_shard + offset) % shard_count for offset in range(shard_count)]
+        self._next_shard = (self._next_shard + 1) % shard_count
+
+        queue = {"queued": 0, "running": 0, "failed": 0, "oldest_queued": None}
+        for shard in order:
+            factory = self.session_factories[shard]
+            free = self.max_in_flight - len(self._in_flight)
+            if free > 0:
+                jobs, inputs = await run_in_threadpool(self._claim, factory, free)
+                for job in jobs:
+                    task = asyncio.create_task(self._run_job(shard, job, inputs.get(job.application_id)))
+                    self._in_flight.add(task)
+                    task.add_done_callback(self._in_flight.discard)
+                claimed += len(jobs)
+
+            shard_queue = await run_in_threadpool(self._with_session, factory, ScoringJobRepository.queue_stats)
+            for key in ("queued", "running", "failed"):
+                queue[key] += shard_queue[key]
+            if shard_queue["oldest_queued"] is not None:
+                queue["oldest_queued"] = min(
+                    filter(None, [queue["oldest_queued"], shard_queue["oldest_queued"]])
+                )
+        self._queue = queue
+        self._last_poll = datetime.utcnow()
+        return claimed
+
+    def stats(self) -> dict:
+        """
+        Describe the queue and the dispatcher for health reporting.
+
+        Queue counts are as of the last poll, summed over all shards.
+
+        Returns:
+            dict: Queue depth, in-flight jobs and dispatch counters
+        """
+        oldest = self._queue["oldest_queued"]
+        completed = self.completed
+        return {
+            "enabled": self.enabled,
+            "dispatching": self._task is not None,
+            "workers": self.workers,
+            "in_flight": len(self._in_flight),
+            "max_in_flight": self.max_in_flight,
+            "queued": self._queue["queued"],
+            "running": self._queue["running"],
+            "failed": self._queue["failed"],
+            "oldest_queued_age_s": round((datetime.utcnow() - oldest).total_seconds(), 1) if oldest else None,
+            "completed_total": completed,
+            "retried_total": self.retried,
+            "failed_total": self.failed,
+            "pool_restarts": self.pool_restarts,
+            "mean_enrichment_ms": round(self.enrichment_seconds / completed * 1000, 3) if completed else None,
+            "last_poll": self._last_poll.isoformat() + "Z" if self._last_poll else None,
+        }
+
+    @staticmethod
+    def _with_session(factory: Callable[[], Session], operation, *args):
+        """Run a repository operation on a short-lived session."""
+        db = factory()
+        try:
+            return operation(db, *args)
+        finally:
+            db.close()
+
+    def _claim(self, factory: Callable[[], Session], limit: int):
+        """Claim jobs on one shard and load their applications (worker thread)."""
+        db = factory()
+        try:
+            jobs = ScoringJobRepository.claim(db, limit, lease_seconds=self.lease_seconds)
+            inputs = ScoringJobRepository.get_inputs(db, [job.application_id for job in jobs]) if jobs else {}
+            return jobs, inputs
+        finally:
+            db.close()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Create the process pool on first use (spawned, so workers share no state with the API)."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def _discard_executor(self, executor: ProcessPoolExecutor, terminate: bool = False) -> None:
+        """Stop using a process pool (the next job starts a new one), optionally killing its workers."""
+        if self._executor is not executor:
+            # Already replaced after another job found it broken
+            return
+        self._executor = None
+        self.pool_restarts += 1
+        if terminate:
+            # ProcessPoolExecutor has no public way to stop a running task
+            for process in list((getattr(executor, "_processes", None) or {}).values()):
+                process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _run_job(self, shard: int, job, application) -> None:
+        """Run the enrichers for one claimed job and store the outcome."""
+        factory = self.session_factories[shard]
+        if application is None:
+            # Deleted or archived since it was queued; nothing left to score
+            await run_in_threadpool(self._with_session, factory, ScoringJobRepository.complete, job.id, job.application_id, 0)
+            return
+
+        item = EnrichmentInput(
+            application_id=str(application.id),
+            walk_name=application.walk_name,
+            description=application.description,
+            has_briefcase=bool(application.has_briefcase),
+            involves_hopping=bool(application.involves_hopping),
+            number_of_twirls=application.number_of_twirls,
+            hop_count=application.hop_count,
+        )
+        started = time.perf_counter()
+        executor = self._get_executor()
+        try:
+            future = asyncio.get_running_loop().run_in_executor(
+                executor, run_enrichers, self.enrichers, item, self.job_timeout
+            )
+            points = await asyncio.wait_for(future, timeout=self.deadline_seconds)
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            # The worker ignored its own time limit and cannot be cancelled; replace the pool
+            # (jobs running on its other workers fail with BrokenProcessPool and are retried)
+            self._discard_executor(executor, terminate=True)
+            await self._fail(factory, job, f"Worker did not return within {self.deadline_seconds:g} s")
+            return
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool):
+                # A worker died; start a fresh pool for the next jobs
+                self._discard_executor(executor)
+            await self._fail(factory, job, f"{type(e).__name__}: {str(e)}")
+            return
+
+        self.enrichment_seconds += time.perf_counter() - started
+        try:
+            await run_in_threadpool(
+                self._with_session, factory, ScoringJobRepository.complete, job.id, job.application_id, points
+            )
+            self.completed += 1
+        except Exception as e:
+            # The job stays claimed and is retried when its lease expires
+            logger.error(f"Error storing enrichment of application {job.application_id}: {str(e)}")
+
+    async def _fail(self, factory: Callable[[], Session], job, error: str) -> None:
+        """Retry a failed job with backoff, or give up after max_attempts."""
+        try:
+            if job.attempts >= self.max_attempts:
+                logger.error(f"Scoring job {job.id} failed after {job.attempts} attempt(s): {error}")
+                await run_in_threadpool(
+                    self._with_session, factory, ScoringJobRepository.complete,
+                    job.id, job.application_id, None, error
+                )
+                self.failed += 1
+            else:
+                delay = self.retry_backoff * 2 ** (job.attempts - 1)
+                logger.warning(f"Scoring job {job.id} attempt {job.attempts} failed, retrying in {delay:g} s: {error}")
+                await run_in_threadpool(self._with_session, factory, ScoringJobRepository.retry, job.id, error, delay)
+                self.retried += 1
+        except Exception as e:
+            logger.error(f"Error recording failure of scoring job {job.id}: {str(e)}")
+
+_settings = get_settings()
+
+# Process-wide dispatcher; disabled (no enrichers) unless SCORING_ENRICHERS is set
+scoring_dispatcher = ScoringDispatcher(
+    enrichers=_settings.scoring_enrichers,
+    workers=_settings.scoring_workers,
+    max_in_flight=_settings.scoring_max_in_flight,
+    poll_interval=_settings.scoring_poll_interval,
+    max_attempts=_settings.scoring_max_attempts,
+    retry_backoff=_settings.scoring_retry_backoff,
+    job_timeout=_settings.scoring_job_timeout
+)
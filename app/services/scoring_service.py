@@ -4,11 +4,15 @@ Scoring service for silly walk grant applications.
 This module implements the algorithm to calculate the "silliness score" of walk applications
 based on the criteria defined in the project specifications.
 """
-import re
-from typing import Optional
+import logging
 from sqlalchemy.orm import Session
 from app.db.repository import ApplicationRepository
+from app.services.archive_service import ArchiveService
 from app.models.schemas import ApplicationCreate
+from app.utils.scoring_rules import ScoreBreakdown, count_hops, score_breakdown
+
+# Set up logging
+logger = logging.getLogger(__name__)
 
 class ScoringService:
     """
@@ -39,27 +43,69 @@ class ScoringService:
         Returns:
             int: The calculated silliness score
         """
-        score = 0
+        return ScoringService.calculate_breakdown(application, db, check_uniqueness).total
+
+    @staticmethod
+    def calculate_breakdown(
+        application: ApplicationCreate,
+        db: Session,
+        check_uniqueness: bool = True
+    ) -> ScoreBreakdown:
+        """
+        Calculate the points awarded by each scoring rule.
+
+        Args:
+            application (ApplicationCreate): The application to score
+            db (Session): Database session for checking walk name uniqueness
+            check_uniqueness (bool): Whether to check for name uniqueness (default: True)
+
+        Returns:
+            ScoreBreakdown: Points per scoring rule
+        """
+        return score_breakdown(
+            description_length=len(application.description),
+            hop_count=count_hops(application.description),
+            has_briefcase=application.has_briefcase,
+            number_of_twirls=application.number_of_twirls,
+            is_original=check_uniqueness and ScoringService.is_original(db, application.walk_name),
+        )
 
-        # Base score: 10 points if description is longer than 20 characters
-        if len(application.description) > 20:
-            score += 10
+    @staticmethod
+    def is_original(db: Session, walk_name: str) -> bool:
+        """
+        Check whether a walk name earns the originality bonus.
 
-        # Briefcase bonus: +5 points if application involves a briefcase
-        if application.has_briefcase:
-            score += 5
+        Args:
+            db (Session): Database session
+            walk_name (str): Walk name to check
 
-        # Hopping bonus: +3 points for each mention of "hop" or "hopping" in the description (max 15)
-        hop_count = len(re.findall(r'\bhop(?:ping)?\b', application.description.lower()))
-        hopping_bonus = min(hop_count * 3, 15)  # Cap at 15 points
-        score += hopping_bonus
+        Returns:
+            bool: True if no other application, active or archived, uses the name
+        """
+        return (
+            ApplicationRepository.is_walk_name_unique(db, walk_name)
+            and not ArchiveService.is_walk_name_archived(db, walk_name)
+        )
 
-        # Twirltastic score: +2 points for each twirl, up to a maximum of 20 points
-        twirl_points = min(application.number_of_twirls * 2, 20)  # Cap at 20 points
-        score += twirl_points
+    @staticmethod
+    def rescore_all(db: Session) -> int:
+        """
+        Recompute every application's score from its stored features.
+
+        Run after changing the weights in app.utils.scoring_rules. Descriptions
+        are not read; only rows whose score changes are updated. Archived
+        applications keep the score they were decided with.
 
-        # Originality bonus: +7 points if the walk name is unique
-        if check_uniqueness and ApplicationRepository.is_walk_name_unique(db, application.walk_name):
-            score += 7
+        Args:
+            db (Session): Database session
 
-        return score
+        Returns:
+            int: Number of applications whose score changed
+        """
+        try:
+            rescored = ApplicationRepository.rescore_all(db)
+            logger.info(f"Rescored {rescored} applications")
+            return rescored
+        except Exception as e:
+            logger.error(f"Error rescoring applications: {str(e)}")
+            raise
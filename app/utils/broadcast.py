@@ -0,0 +1,176 @@
+"""
+In-process broadcast hub.
+
+This module fans published events out to asyncio subscribers. Every subscriber
+has a small bounded buffer: a subscriber that falls behind is marked as
+overflowed instead of slowing down publishers or growing without limit, and is
+expected to catch up from durable storage. Idle subscribers hold no task or
+timer of their own beyond the coroutine waiting on them.
+"""
+import asyncio
+import logging
+from collections import deque
+from typing import Any, List, Optional, Sequence, Set
+from app.config import get_settings
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+class SubscriberLimitError(Exception):
+    """The hub already has the maximum number of subscribers."""
+
+class Subscription:
+    """
+    A subscriber's view of a BroadcastHub.
+
+    Must only be used from the event loop the hub delivers to.
+    """
+
+    __slots__ = ("_hub", "_buffer", "_buffer_size", "_waiter", "overflowed")
+
+    def __init__(self, hub: "BroadcastHub", buffer_size: int):
+        self._hub = hub
+        self._buffer: deque = deque()
+        self._buffer_size = buffer_size
+        self._waiter: Optional[asyncio.Future] = None
+        # Set when events were dropped because the buffer was full
+        self.overflowed = False
+
+    async def next_batch(self, timeout: float) -> List[Any]:
+        """
+        Wait for events.
+
+        Args:
+            timeout (float): Maximum seconds to wait
+
+        Returns:
+            List[Any]: Buffered events, or an empty list if the timeout expired or
+            the subscription overflowed (check `overflowed`)
+        """
+        if not self._buffer and not self.overflowed:
+            self._waiter = asyncio.get_running_loop().create_future()
+            try:
+                await asyncio.wait_for(self._waiter, timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                self._waiter = None
+
+        events = list(self._buffer)
+        self._buffer.clear()
+        return events
+
+    def reset(self) -> None:
+        """Clear the overflow flag after the subscriber has caught up."""
+        self.overflowed = False
+        self._buffer.clear()
+
+    def close(self) -> None:
+        """Stop receiving events."""
+        self._hub.unsubscribe(self)
+
+    def _deliver(self, events: Sequence[Any]) -> None:
+        """Buffer events and wake the waiting consumer (event loop thread only)."""
+        if self.overflowed:
+            return
+        if len(self._buffer) + len(events) > self._buffer_size:
+            # Drop everything: the consumer re-reads from storage anyway
+            self.overflowed = True
+            self._buffer.clear()
+            self._hub.overflows += 1
+        else:
+            self._buffer.extend(events)
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+class BroadcastHub:
+    """
+    Fan-out of published events to bounded per-subscriber buffers.
+
+    publish() may be called from any thread; events are handed to the event
+    loop the subscribers live on.
+    """
+
+    def __init__(self, buffer_size: int, max_subscribers: int):
+        self.buffer_size = buffer_size
+        self.max_subscribers = max_subscribers
+        self._subscribers: Set[Subscription] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.published = 0
+        self.overflows = 0
+
+    def subscribe(self) -> Subscription:
+        """
+        Register a new subscriber on the running event loop.
+
+        Returns:
+            Subscription: The new subscription; close it when done
+
+        Raises:
+            SubscriberLimitError: If max_subscribers is reached
+        """
+        if len(self._subscribers) >= self.max_subscribers:
+            raise SubscriberLimitError("Too many change feed subscribers")
+        self._loop = asyncio.get_running_loop()
+        subscription = Subscription(self, self.buffer_size)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """
+        Remove a subscriber.
+
+        Args:
+            subscription (Subscription): Subscription to remove
+        """
+        self._subscribers.discard(subscription)
+
+    def publish(self, events: Sequence[Any]) -> None:
+        """
+        Deliver events to all current subscribers. Thread-safe and non-blocking.
+
+        Args:
+            events (Sequence[Any]): Events in publication order
+        """
+        loop = self._loop
+        if not events or loop is None or not self._subscribers:
+            return
+        try:
+            loop.call_soon_threadsafe(self._dispatch, list(events))
+        except RuntimeError:
+            # The loop has been closed (e.g. during shutdown)
+            logger.debug("Dropping broadcast events: event loop is closed")
+
+    def _dispatch(self, events: List[Any]) -> None:
+        """Hand events to every subscriber (event loop thread only)."""
+        self.published += len(events)
+        for subscription in list(self._subscribers):
+            subscription._deliver(events)
+
+    def stats(self) -> dict:
+        """
+        Describe the hub for health reporting.
+
+        Returns:
+            dict: Subscriber count and delivery counters
+        """
+        return {
+            "subscribers": len(self._subscribers),
+            "max_subscribers": self.max_subscribers,
+            "published": self.published,
+            "overflows": self.overflows,
+        }
+
+_settings = get_settings()
+
+# Process-wide hub fed by ApplicationRepository and read by the change feed
+change_feed_hub = BroadcastHub(
+    buffer_size=_settings.change_feed_buffer_size,
+    max_subscribers=_settings.change_feed_max_subscribers
+)
@@ -0,0 +1,207 @@
+"""
+Response compression middleware.
+
+This module compresses response bodies with brotli or gzip, negotiated from the
+client's Accept-Encoding header. Brotli is used only when the optional `brotli`
+package is installed.
+"""
+import zlib
+from typing import Optional
+
+try:
+    import brotli
+except ImportError:  # Optional dependency
+    brotli = None
+
+# Content types worth compressing; everything else (and event streams) passes through
+_COMPRESSIBLE_TYPES = ("application/json", "text/html", "text/plain", "text/css", "application/javascript")
+
+def _parse_accept_encoding(value: str) -> dict:
+    """Parse an Accept-Encoding header into {coding: q}."""
+    codings = {}
+    for item in value.split(","):
+        parts = [part.strip() for part in item.split(";")]
+        if not parts[0]:
+            continue
+        q = 1.0
+        for param in parts[1:]:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        codings[parts[0].lower()] = q
+    return codings
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Pick the best supported content coding for a request.
+
+    Args:
+        accept_encoding (str): Accept-Encoding header value
+
+    Returns:
+        Optional[str]: "br", "gzip" or None
+    """
+    codings = _parse_accept_encoding(accept_encoding)
+    wildcard = codings.get("*", 0.0)
+    candidates = []
+    if brotli is not None:
+        candidates.append(("br", codings.get("br", wildcard)))
+    candidates.append(("gzip", codings.get("gzip", wildcard)))
+
+    best, best_q = None, 0.0
+    for coding, q in candidates:
+        # Ties keep the earlier (better compressing) coding
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+class _StreamCompressor:
+    """Incremental gzip/brotli compressor."""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=brotli_quality)
+            self._finish = self._compressor.finish
+            self._compress = self._compressor.process
+        else:
+            # wbits=31 produces a gzip container
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+            self._finish = self._compressor.flush
+            self._compress = self._compressor.compress
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress a chunk; output may be empty until enough input is buffered."""
+        return self._compress(data) if data else b""
+
+    def finish(self) -> bytes:
+        """Flush the remaining output and end the stream."""
+        return self._finish()
+
+class CompressionMiddleware:
+    """
+    ASGI middleware that compresses response bodies above a size threshold.
+
+    Body chunks are buffered only until the threshold is reached; larger or
+    streamed bodies are then compressed incrementally. Content types outside
+    the compressible list, such as Server-Sent Events, pass through untouched.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for name, value in scope.get("headers", []):
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+
+        encoding = negotiate_encoding(accept_encoding) if accept_encoding else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        state = {"start": None, "mode": None, "buffer": [], "size": 0, "compressor": None}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = message.get("headers", [])
+                if self._eligible(message["status"], headers):
+                    # Hold the start message until we know whether to compress
+                    state["start"] = message
+                    state["mode"] = "buffering"
+                else:
+                    state["mode"] = "passthrough"
+                    if self._is_compressible_type(headers):
+                        message["headers"] = self._vary(headers)
+                    await send(message)
+                return
+
+            if message["type"] != "http.response.body" or state["mode"] == "passthrough":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if state["mode"] == "buffering":
+                state["buffer"].append(body)
+                state["size"] += len(body)
+                if more_body and state["size"] < self.minimum_size:
+                    return
+
+                buffered = b"".join(state["buffer"])
+                state["buffer"] = []
+                start_message = state["start"]
+
+                if not more_body and state["size"] < self.minimum_size:
+                    # Small complete body: send as is
+                    state["mode"] = "passthrough"
+                    start_message["headers"] = self._vary(start_message.get("headers", []))
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": buffered})
+                    return
+
+                state["mode"] = "compressing"
+                state["compressor"] = _StreamCompressor(encoding, self.gzip_level, self.brotli_quality)
+                headers = [
+                    (name, value) for name, value in self._vary(start_message.get("headers", []))
+                    if name != b"content-length"
+                ]
+                headers.append((b"content-encoding", encoding.encode("latin-1")))
+                if not more_body:
+                    # Whole body known: compress in one go and set the length
+                    compressed = state["compressor"].compress(buffered) + state["compressor"].finish()
+                    headers.append((b"content-length", str(len(compressed)).encode("latin-1")))
+                    start_message["headers"] = headers
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": compressed})
+                    return
+                start_message["headers"] = headers
+                await send(start_message)
+                body = buffered
+
+            # Streaming compression
+            chunk = state["compressor"].compress(body)
+            if not more_body:
+                chunk += state["compressor"].finish()
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _eligible(self, status_code: int, headers) -> bool:
+        """Decide from the status and headers whether a response may be compressed."""
+        if status_code < 200 or status_code in (204, 304):
+            return False
+        if any(name == b"content-encoding" for name, _ in headers):
+            return False
+        return self._is_compressible_type(headers)
+
+    @staticmethod
+    def _is_compressible_type(headers) -> bool:
+        """Check the Content-Type header against the compressible types."""
+        for name, value in headers:
+            if name == b"content-type":
+                return value.decode("latin-1").split(";")[0].strip().lower() in _COMPRESSIBLE_TYPES
+        return False
+
+    @staticmethod
+    def _vary(headers) -> list:
+        """Add Accept-Encoding to the Vary header."""
+        headers = list(headers)
+        for index, (name, value) in enumerate(headers):
+            if name == b"vary":
+                if b"accept-encoding" not in value.lower():
+                    headers[index] = (name, value + b", Accept-Encoding")
+                return headers
+        headers.append((b"vary", b"Accept-Encoding"))
+        return headers
@@ -0,0 +1,134 @@
+"""
+HTTP caching utilities.
+
+This module builds validators (ETag, Last-Modified) from stored row versions and
+timestamps, and evaluates conditional request headers, so unchanged resources
+can be answered with 304 Not Modified without serialising them.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Iterable, Optional, Tuple
+from uuid import UUID
+
+# Bump whenever the JSON representation of applications changes, so clients
+# holding validators from an older release refetch.
+REPRESENTATION_VERSION = 2
+
+def application_etag(version: int) -> str:
+    """
+    Build the ETag of a single application from its row version.
+
+    Args:
+        version (int): Application row version
+
+    Returns:
+        str: Weak ETag (weak because compression may change the bytes)
+    """
+    return f'W/"r{REPRESENTATION_VERSION}-v{version}"'
+
+def collection_etag(rows: Iterable[Tuple[UUID, int]], *qualifiers) -> str:
+    """
+    Build the ETag of a page of applications from their IDs and versions.
+
+    Args:
+        rows (Iterable[Tuple[UUID, int]]): (id, version) of every item on the page
+        *qualifiers: Anything else that shapes the response (e.g. query parameters)
+
+    Returns:
+        str: Weak ETag
+    """
+    digest = hashlib.blake2b(digest_size=12)
+    digest.update(repr(qualifiers).encode("utf-8"))
+    for application_id, version in rows:
+        digest.update(application_id.bytes)
+        digest.update(version.to_bytes(8, "big", signed=True))
+    return f'W/"r{REPRESENTATION_VERSION}-{digest.hexdigest()}"'
+
+def format_http_date(value: datetime) -> str:
+    """
+    Format a naive UTC datetime as an HTTP date.
+
+    Args:
+        value (datetime): Naive UTC timestamp
+
+    Returns:
+        str: e.g. "Fri, 14 Jul 2023 12:34:56 GMT"
+    """
+    return format_datetime(value.replace(tzinfo=timezone.utc, microsecond=0), usegmt=True)
+
+def _parse_http_date(value: str) -> Optional[datetime]:
+    """Parse an HTTP date into a naive UTC datetime, or None if invalid."""
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def _weak_match(etag: str, candidates: str) -> bool:
+    """Weak comparison of an ETag against an If-None-Match header value."""
+    if candidates.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in candidates.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+def has_conditional_headers(headers) -> bool:
+    """
+    Check whether a request carries cache validators.
+
+    Args:
+        headers: Request headers
+
+    Returns:
+        bool: True if If-None-Match or If-Modified-Since is present
+    """
+    return "if-none-match" in headers or "if-modified-since" in headers
+
+def is_not_modified(headers, etag: str, last_modified: Optional[datetime]) -> bool:
+    """
+    Evaluate If-None-Match / If-Modified-Since against the current validators.
+
+    If-None-Match takes precedence over If-Modified-Since (RFC 9110).
+
+    Args:
+        headers: Request headers
+        etag (str): Current ETag
+        last_modified (Optional[datetime]): Current modification time (naive UTC)
+
+    Returns:
+        bool: True if the client's copy is still current
+    """
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        return _weak_match(etag, if_none_match)
+
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since is not None and last_modified is not None:
+        since = _parse_http_date(if_modified_since)
+        return since is not None and last_modified.replace(microsecond=0) <= since
+
+    return False
+
+def cache_headers(etag: str, last_modified: Optional[datetime]) -> dict:
+    """
+    Build the validator headers for a response.
+
+    Args:
+        etag (str): ETag value
+        last_modified (Optional[datetime]): Modification time (naive UTC)
+
+    Returns:
+        dict: ETag, Last-Modified and Cache-Control headers
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_http_date(last_modified)
+    return headers
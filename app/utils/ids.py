@@ -0,0 +1,57 @@
+"""
+Identifier utilities.
+
+This module generates time-ordered but non-guessable UUIDs for primary keys.
+"""
+import secrets
+import time
+import uuid
+from typing import Optional
+
+# Number of random bits in a UUIDv7 (12 bits rand_a + 62 bits rand_b)
+_RANDOM_BITS = 74
+
+def uuid7(timestamp_ms: Optional[int] = None, random_bits: Optional[int] = None) -> uuid.UUID:
+    """
+    Generate a UUIDv7 (RFC 9562): a 48-bit Unix timestamp in milliseconds
+    followed by 74 random bits.
+
+    IDs sort by creation time, so inserts append to the right edge of the
+    primary-key index instead of landing on random pages, while the random
+    part keeps them unguessable.
+
+    Args:
+        timestamp_ms (Optional[int]): Milliseconds since the Unix epoch (default: now)
+        random_bits (Optional[int]): 74 random bits (default: from the secrets module)
+
+    Returns:
+        uuid.UUID: A version 7 UUID
+    """
+    if timestamp_ms is None:
+        timestamp_ms = time.time_ns() // 1_000_000
+    if random_bits is None:
+        random_bits = secrets.randbits(_RANDOM_BITS)
+
+    rand_a = (random_bits >> 62) & 0xFFF
+    rand_b = random_bits & ((1 << 62) - 1)
+
+    value = (timestamp_ms & ((1 << 48) - 1)) << 80
+    value |= 0x7 << 76          # version
+    value |= rand_a << 64
+    value |= 0b10 << 62         # RFC 4122 variant
+    value |= rand_b
+    return uuid.UUID(int=value)
+
+def uuid7_timestamp_ms(value: uuid.UUID) -> Optional[int]:
+    """
+    Return the embedded creation time of a UUIDv7, or None for other versions.
+
+    Args:
+        value (uuid.UUID): The UUID to inspect
+
+    Returns:
+        Optional[int]: Milliseconds since the Unix epoch
+    """
+    if value.version != 7:
+        return None
+    return value.int >> 80
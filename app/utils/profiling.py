@@ -0,0 +1,335 @@
+"""
+Opt-in request profiling and slow-request capture.
+
+This module provides an ASGI middleware that records, per request, the time of
+every SQL statement (from SQLAlchemy engine events) and, for requests chosen
+for profiling, a cProfile call-stack profile. A request is profiled when it is
+sampled (PROFILING_SAMPLE_RATE) or carries an X-Debug-Profile header matching
+PROFILING_DEBUG_KEY. Captures of profiled requests, and of every request slower
+than PROFILING_SLOW_REQUEST_MS, are written to a bounded on-disk ring buffer
+that the admin endpoints read.
+
+SQL timings are kept for every request (a list append per statement), so slow
+requests always show where their database time went; only profiled requests
+pay for cProfile. The profiler covers the event loop thread, which runs the
+route handlers and the code they call; other requests interleaving at await
+points can appear in it. One request per worker is profiled at a time.
+Statement parameters are never recorded.
+"""
+import cProfile
+import json
+import logging
+import os
+import pstats
+import random
+import re
+import secrets
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.concurrency import run_in_threadpool
+from app.config import get_settings
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Header that requests profiling of a single request
+DEBUG_HEADER = b"x-debug-profile"
+
+# Response header naming the capture of a profiled request
+PROFILE_ID_HEADER = b"x-profile-id"
+
+# Per capture: statements kept, characters kept per statement, functions in the summary
+MAX_STATEMENTS = 200
+MAX_STATEMENT_LENGTH = 500
+TOP_FUNCTIONS = 40
+
+_ID_PATTERN = re.compile(r"^[0-9]{13}-[0-9a-f]{8}$")
+_WHITESPACE = re.compile(r"\s+")
+
+class RequestCapture:
+    """SQL timings (and optionally a profiler) of one request in flight."""
+
+    __slots__ = ("statements", "statement_count", "sql_seconds", "profiler")
+
+    def __init__(self):
+        self.statements: List[tuple] = []
+        self.statement_count = 0
+        self.sql_seconds = 0.0
+        self.profiler: Optional[cProfile.Profile] = None
+
+    def add_statement(self, statement: str, seconds: float) -> None:
+        """Record one executed statement."""
+        self.statement_count += 1
+        self.sql_seconds += seconds
+        if len(self.statements) < MAX_STATEMENTS:
+            self.statements.append((statement, seconds))
+
+# Capture of the request the current task or thread is working for
+current_capture: ContextVar[Optional[RequestCapture]] = ContextVar("current_capture", default=None)
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_capture.get() is not None:
+        conn.info.setdefault("profiling_started", []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    capture = current_capture.get()
+    if capture is None:
+        return
+    started = conn.info.get("profiling_started")
+    if not started:
+        return
+    capture.add_statement(statement, time.perf_counter() - started.pop())
+
+def _normalise_statement(statement: str) -> str:
+    """Collapse whitespace and shorten a statement for storage."""
+    statement = _WHITESPACE.sub(" ", statement).strip()
+    if len(statement) > MAX_STATEMENT_LENGTH:
+        statement = statement[:MAX_STATEMENT_LENGTH] + "..."
+    return statement
+
+def _top_functions(profiler: cProfile.Profile) -> List[dict]:
+    """Summarise a profile as the functions with the highest cumulative time."""
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, line, name), (_, calls, total, cumulative, _) in stats.stats.items():
+        rows.append({
+            "function": f"{filename}:{line}({name})",
+            "calls": calls,
+            "total_ms": round(total * 1000, 3),
+            "cumulative_ms": round(cumulative * 1000, 3),
+        })
+    rows.sort(key=lambda row: row["cumulative_ms"], reverse=True)
+    return rows[:TOP_FUNCTIONS]
+
+class ProfileStore:
+    """
+    Ring buffer of request captures on disk.
+
+    Each capture is a JSON file (plus a .prof file with the raw cProfile data
+    for profiled requests) named after its ID, which sorts by capture time. The
+    oldest captures are deleted once more than `max_entries` are stored.
+    """
+
+    def __init__(self, directory: str, max_entries: int):
+        self.directory = directory
+        self.max_entries = max_entries
+
+    @staticmethod
+    def new_id() -> str:
+        """Return a new capture ID (millisecond timestamp and random suffix)."""
+        return f"{int(time.time() * 1000):013d}-{uuid.uuid4().hex[:8]}"
+
+    @staticmethod
+    def is_valid_id(capture_id: str) -> bool:
+        """Whether a string has the form of a capture ID (and so is safe in a path)."""
+        return bool(_ID_PATTERN.match(capture_id))
+
+    def path(self, capture_id: str, suffix: str = ".json") -> str:
+        """Path of a capture file."""
+        return os.path.join(self.directory, capture_id + suffix)
+
+    def write(self, capture_id: str, record: dict, profiler: Optional[cProfile.Profile] = None) -> None:
+        """
+        Store a capture and evict the oldest ones beyond max_entries.
+
+        Args:
+            capture_id (str): ID from new_id()
+            record (dict): JSON-serialisable capture
+            profiler (Optional[cProfile.Profile]): Profiler of the request, if it was profiled
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        if profiler is not None:
+            record = dict(record, profile=_top_functions(profiler))
+            profiler.dump_stats(self.path(capture_id, ".prof"))
+        temp_path = self.path(capture_id, ".tmp")
+        with open(temp_path, "w", encoding="utf-8") as capture_file:
+            json.dump(record, capture_file)
+        os.replace(temp_path, self.path(capture_id))
+
+        stored = self.ids()
+        for old_id in stored[:max(len(stored) - self.max_entries, 0)]:
+            for suffix in (".json", ".prof"):
+                try:
+                    os.unlink(self.path(old_id, suffix))
+                except FileNotFoundError:
+                    pass
+
+    def ids(self) -> List[str]:
+        """IDs of the stored captures, oldest first."""
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted(name[:-5] for name in names if name.endswith(".json") and self.is_valid_id(name[:-5]))
+
+    def list_captures(self) -> List[dict]:
+        """
+        Summaries of the stored captures, newest first.
+
+        Returns:
+            List[dict]: id, reason, method, path, status, duration_ms, sql_count,
+            sql_ms and started_at per capture
+        """
+        summaries = []
+        for capture_id in reversed(self.ids()):
+            record = self.get(capture_id)
+            if record is None:
+                continue
+            summaries.append({
+                key: record.get(key)
+                for key in ("id", "reason", "method", "path", "status", "duration_ms", "started_at")
+            })
+            summaries[-1]["sql_count"] = record["sql"]["count"]
+            summaries[-1]["sql_ms"] = record["sql"]["total_ms"]
+        return summaries
+
+    def get(self, capture_id: str) -> Optional[dict]:
+        """
+        Read a capture.
+
+        Args:
+            capture_id (str): Capture ID
+
+        Returns:
+            Optional[dict]: The capture, or None if it does not exist (or was evicted)
+        """
+        if not self.is_valid_id(capture_id):
+            return None
+        try:
+            with open(self.path(capture_id), encoding="utf-8") as capture_file:
+                return json.load(capture_file)
+        except FileNotFoundError:
+            return None
+
+    def raw_profile_path(self, capture_id: str) -> Optional[str]:
+        """Path of the raw cProfile data of a capture, or None if there is none."""
+        if not self.is_valid_id(capture_id):
+            return None
+        path = self.path(capture_id, ".prof")
+        return path if os.path.exists(path) else None
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that times SQL per request and profiles chosen requests.
+
+    Event streams are never profiled or captured; they do not end.
+    """
+
+    def __init__(
+        self,
+        app,
+        store: ProfileStore,
+        sample_rate: float = 0.0,
+        debug_key: str = "",
+        slow_request_ms: float = 0.0
+    ):
+        self.app = app
+        self.store = store
+        self.sample_rate = sample_rate
+        self.debug_key = debug_key.encode("latin-1")
+        self.slow_request_ms = slow_request_ms
+        self._profiling = False
+
+    def _reason(self, scope) -> Optional[str]:
+        """Why a request should be profiled, or None."""
+        if self.debug_key:
+            for name, value in scope.get("headers", []):
+                if name == DEBUG_HEADER:
+                    if secrets.compare_digest(value, self.debug_key):
+                        return "debug"
+                    break
+        if self.sample_rate and random.random() < self.sample_rate:
+            return "sampled"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        reason = self._reason(scope)
+        if reason is None and not self.slow_request_ms:
+            await self.app(scope, receive, send)
+            return
+
+        capture = RequestCapture()
+        capture_id = ProfileStore.new_id() if reason else None
+        state = {"status": 500, "stream": False, "profiling": False}
+        token = current_capture.set(capture)
+
+        if reason and not self._profiling:
+            self._profiling = state["profiling"] = True
+            capture.profiler = cProfile.Profile()
+            capture.profiler.enable()
+
+        def stop_profiler() -> None:
+            if state["profiling"]:
+                capture.profiler.disable()
+                self._profiling = state["profiling"] = False
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+                headers = message.get("headers", [])
+                state["stream"] = any(
+                    name == b"content-type" and value.startswith(b"text/event-stream") for name, value in headers
+                )
+                if state["stream"]:
+                    stop_profiler()
+                elif capture_id is not None:
+                    message["headers"] = list(headers) + [(PROFILE_ID_HEADER, capture_id.encode("latin-1"))]
+            await send(message)
+
+        started_at = datetime.utcnow()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            stop_profiler()
+            current_capture.reset(token)
+
+            if not state["stream"]:
+                if reason is None and duration_ms >= self.slow_request_ms:
+                    reason, capture_id = "slow", ProfileStore.new_id()
+                if reason is not None:
+                    await self._save(capture_id, reason, scope, state["status"], started_at, duration_ms, capture)
+
+    async def _save(self, capture_id, reason, scope, status_code, started_at, duration_ms, capture) -> None:
+        """Write a capture to the store, off the event loop."""
+        record = {
+            "id": capture_id,
+            "reason": reason,
+            "method": scope["method"],
+            "path": scope["path"],
+            "query_string": scope.get("query_string", b"").decode("latin-1"),
+            "status": status_code,
+            "started_at": started_at.isoformat() + "Z",
+            "duration_ms": round(duration_ms, 3),
+            "sql": {
+                "count": capture.statement_count,
+                "total_ms": round(capture.sql_seconds * 1000, 3),
+                "statements": [
+                    {"statement": _normalise_statement(statement), "duration_ms": round(seconds * 1000, 3)}
+                    for statement, seconds in capture.statements
+                ],
+            },
+            "profile": None,
+        }
+        try:
+            await run_in_threadpool(self.store.write, capture_id, record, capture.profiler)
+            logger.info(f"Stored {reason} request capture {capture_id} ({record['path']}, {duration_ms:.0f} ms)")
+        except Exception as e:
+            logger.error(f"Error storing request capture: {str(e)}")
+
+_settings = get_settings()
+
+# Process-wide capture store read by the admin endpoints
+profile_store = ProfileStore(_settings.profiling_dir, _settings.profiling_max_entries)
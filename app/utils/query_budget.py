@@ -0,0 +1,249 @@
+"""
+SQL statement counting for query budgets and N+1 detection.
+
+This module provides QueryCounter, a context manager that records every
+statement SQLAlchemy sends to the database while it is active, classified by
+kind (select, insert, update, delete, other) and by shape: the statement with
+literals and IN lists collapsed, so the same query with different parameters
+has the same shape. Tests and scripts use it to assert budgets ("creating an
+application issues at most 4 statements", "a list page issues exactly 1
+whatever its size") and to flag SELECT shapes repeated within one operation,
+the usual symptom of an N+1 query pattern.
+
+The counter listens on engine events for the whole process, so it also counts
+statements from other threads (fan-out readers, the TestClient's event loop).
+It is meant for tests and offline checks; use the profiling middleware
+(app/utils/profiling.py) to look at production requests.
+"""
+import re
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Statement kinds, by leading keyword
+KINDS = ("select", "insert", "update", "delete", "other")
+
+# Default number of executions of one SELECT shape that counts as an N+1 suspect
+N_PLUS_ONE_THRESHOLD = 3
+
+_WHITESPACE = re.compile(r"\s+")
+_IN_LIST = re.compile(r"\bIN \((?:[^()]|\([^()]*\))*\)", re.IGNORECASE)
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_VALUES_ROWS = re.compile(r"(\([?, ]*\))(?:, \1)+")
+
+class QueryBudgetExceeded(AssertionError):
+    """An operation issued more (or other) statements than its budget allows."""
+
+class RecordedStatement(NamedTuple):
+    """One statement sent to the database."""
+
+    kind: str
+    shape: str
+    statement: str
+    executemany: bool
+
+def statement_kind(statement: str) -> str:
+    """
+    Classify a statement by its leading keyword.
+
+    Args:
+        statement (str): SQL statement
+
+    Returns:
+        str: One of KINDS (WITH queries count as select)
+    """
+    keyword = statement.lstrip(" \t\n(").split(None, 1)[0].lower() if statement.strip() else ""
+    if keyword == "with":
+        return "select"
+    return keyword if keyword in KINDS else "other"
+
+def statement_shape(statement: str) -> str:
+    """
+    Reduce a statement to its shape.
+
+    Collapses whitespace, replaces string and number literals with ?, IN lists
+    with IN (...) and multi-row VALUES with one row, so executions that differ
+    only in their values (or in how many IDs or rows they carry) compare equal.
+
+    Args:
+        statement (str): SQL statement
+
+    Returns:
+        str: Normalised statement
+    """
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _IN_LIST.sub("IN (...)", shape)
+    shape = _STRING_LITERAL.sub("?", shape)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    return _VALUES_ROWS.sub(r"\1", shape)
+
+class QueryCounter:
+    """
+    Record the statements executed while the counter is active.
+
+    Example:
+        with QueryCounter() as queries:
+            ApplicationService.get_all_applications(db, 0, 100)
+        queries.assert_exactly(1)
+        queries.assert_no_n_plus_one()
+    """
+
+    def __init__(self, target=Engine, n_plus_one_threshold: int = N_PLUS_ONE_THRESHOLD):
+        """
+        Args:
+            target: Engine (or the Engine class, for all engines) to listen on
+            n_plus_one_threshold (int): Executions of one SELECT shape that make it an N+1 suspect
+        """
+        self.target = target
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.statements: List[RecordedStatement] = []
+        self._listening = False
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(
+            RecordedStatement(statement_kind(statement), statement_shape(statement), statement, executemany)
+        )
+
+    def start(self) -> "QueryCounter":
+        """Start recording."""
+        if not self._listening:
+            event.listen(self.target, "before_cursor_execute", self._before_cursor_execute)
+            self._listening = True
+        return self
+
+    def stop(self) -> None:
+        """Stop recording (the recorded statements are kept)."""
+        if self._listening:
+            event.remove(self.target, "before_cursor_execute", self._before_cursor_execute)
+            self._listening = False
+
+    def reset(self) -> None:
+        """Forget the statements recorded so far."""
+        self.statements = []
+
+    def __enter__(self) -> "QueryCounter":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
+
+    @property
+    def count(self) -> int:
+        """Number of statements recorded."""
+        return len(self.statements)
+
+    def count_of(self, kind: str) -> int:
+        """Number of statements of one kind."""
+        return sum(1 for recorded in self.statements if recorded.kind == kind)
+
+    def by_kind(self) -> Counter:
+        """Number of statements per kind."""
+        return Counter(recorded.kind for recorded in self.statements)
+
+    def shapes(self) -> Counter:
+        """Number of executions per statement shape."""
+        return Counter(recorded.shape for recorded in self.statements)
+
+    def n_plus_one_suspects(self, threshold: Optional[int] = None) -> List[Tuple[str, int]]:
+        """
+        SELECT shapes executed at least `threshold` times.
+
+        Args:
+            threshold (Optional[int]): Defaults to the counter's n_plus_one_threshold
+
+        Returns:
+            List[Tuple[str, int]]: (shape, executions), most repeated first
+        """
+        threshold = threshold or self.n_plus_one_threshold
+        repeated = Counter(recorded.shape for recorded in self.statements if recorded.kind == "select")
+        return [(shape, executions) for shape, executions in repeated.most_common() if executions >= threshold]
+
+    def report(self) -> str:
+        """Human-readable list of the recorded statements, for failure messages."""
+        kinds = ", ".join(f"{kind} {count}" for kind, count in sorted(self.by_kind().items()))
+        lines = [f"{self.count} statement(s) ({kinds or 'none'}):"]
+        for number, recorded in enumerate(self.statements, start=1):
+            suffix = " [executemany]" if recorded.executemany else ""
+            lines.append(f"  {number}. {recorded.shape}{suffix}")
+        return "\n".join(lines)
+
+    def _counted(self, kind: Optional[str]) -> Tuple[int, str]:
+        if kind is None:
+            return self.count, "statement(s)"
+        if kind not in KINDS:
+            raise ValueError(f"Unknown statement kind {kind!r}; expected one of {', '.join(KINDS)}")
+        return self.count_of(kind), f"{kind} statement(s)"
+
+    def assert_at_most(self, limit: int, kind: Optional[str] = None) -> None:
+        """
+        Assert that at most `limit` statements (of `kind`, if given) were recorded.
+
+        Raises:
+            QueryBudgetExceeded: If more were recorded
+        """
+        actual, label = self._counted(kind)
+        if actual > limit:
+            raise QueryBudgetExceeded(f"Expected at most {limit} {label}, got {actual}\n{self.report()}")
+
+    def assert_exactly(self, expected: int, kind: Optional[str] = None) -> None:
+        """
+        Assert that exactly `expected` statements (of `kind`, if given) were recorded.
+
+        Raises:
+            QueryBudgetExceeded: If a different number was recorded
+        """
+        actual, label = self._counted(kind)
+        if actual != expected:
+            raise QueryBudgetExceeded(f"Expected exactly {expected} {label}, got {actual}\n{self.report()}")
+
+    def assert_no_n_plus_one(self, threshold: Optional[int] = None) -> None:
+        """
+        Assert that no SELECT shape was repeated `threshold` times or more.
+
+        Raises:
+            QueryBudgetExceeded: If there are N+1 suspects
+        """
+        suspects = self.n_plus_one_suspects(threshold)
+        if suspects:
+            listed = "\n".join(f"  {executions}x {shape}" for shape, executions in suspects)
+            raise QueryBudgetExceeded(f"Repeated SELECT shapes (N+1 suspects):\n{listed}\n{self.report()}")
+
+@contextmanager
+def query_budget(
+    max_statements: Optional[int] = None,
+    exactly: Optional[int] = None,
+    kind: Optional[str] = None,
+    allow_n_plus_one: bool = False,
+    target=Engine
+) -> Iterator[QueryCounter]:
+    """
+    Check the statements of a block against a budget when the block ends.
+
+    Example:
+        with query_budget(max_statements=4):
+            ApplicationService.create_application(db, payload)
+
+    Args:
+        max_statements (Optional[int]): Most statements allowed
+        exactly (Optional[int]): Exact number of statements required
+        kind (Optional[str]): Only count statements of this kind
+        allow_n_plus_one (bool): Skip the repeated-SELECT check
+        target: Engine (or the Engine class) to listen on
+
+    Yields:
+        QueryCounter: The active counter
+
+    Raises:
+        QueryBudgetExceeded: If the block exceeded its budget
+    """
+    with QueryCounter(target) as queries:
+        yield queries
+    if max_statements is not None:
+        queries.assert_at_most(max_statements, kind)
+    if exactly is not None:
+        queries.assert_exactly(exactly, kind)
+    if not allow_n_plus_one:
+        queries.assert_no_n_plus_one()
@@ -0,0 +1,123 @@
+"""
+Pluggable score enrichment.
+
+This module defines the interface of score enrichers: functions that award
+extra points for qualities too costly to assess while a submission waits, such
+as text analysis of the description or similarity to earlier walks. Enrichers
+are configured as "module:function" strings (SCORING_ENRICHERS) and run in the
+worker processes of the scoring job dispatcher, so like scoring_rules this
+module has no database or model dependencies; an enricher that needs the
+database opens its own session.
+"""
+import importlib
+import re
+import signal
+import threading
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+class EnrichmentInput(NamedTuple):
+    """The application data an enricher sees."""
+    application_id: str
+    walk_name: str
+    description: str
+    has_briefcase: bool
+    involves_hopping: bool
+    number_of_twirls: int
+    hop_count: int
+
+# An enricher returns the points it awards (0 or more)
+Enricher = Callable[[EnrichmentInput], int]
+
+class EnrichmentTimeout(Exception):
+    """The enrichers of one application ran longer than their time limit."""
+
+# Example enricher: one point per this many distinct words in the description, capped
+VOCABULARY_WORDS_PER_POINT = 5
+VOCABULARY_POINTS_CAP = 5
+
+_WORD_PATTERN = re.compile(r"[a-z']+")
+
+# Enrichers already imported in this process, by their configuration
+_loaded: Dict[Tuple[str, ...], List[Enricher]] = {}
+
+def load_enrichers(specs: Sequence[str]) -> List[Enricher]:
+    """
+    Import enrichers from "module:function" specifications.
+
+    Args:
+        specs (Sequence[str]): Enricher specifications
+
+    Returns:
+        List[Enricher]: The enricher functions, in order
+
+    Raises:
+        ValueError: If a specification is malformed or does not name a callable
+    """
+    key = tuple(specs)
+    if key not in _loaded:
+        enrichers = []
+        for spec in specs:
+            module_name, _, function_name = spec.partition(":")
+            if not module_name or not function_name:
+                raise ValueError(f"Enricher {spec!r} must have the form module:function")
+            enricher = getattr(importlib.import_module(module_name), function_name, None)
+            if not callable(enricher):
+                raise ValueError(f"Enricher {spec!r} is not a callable")
+            enrichers.append(enricher)
+        _loaded[key] = enrichers
+    return _loaded[key]
+
+def _raise_timeout(signum, frame):
+    raise EnrichmentTimeout("Enrichers exceeded their time limit")
+
+def run_enrichers(specs: Tuple[str, ...], item: EnrichmentInput, timeout: Optional[float] = None) -> int:
+    """
+    Score one application with all enrichers (runs in a worker process).
+
+    The time limit starts once the enrichers are imported, so neither waiting
+    for nor starting a worker counts against it. It is enforced with SIGALRM
+    where the platform has it (on the main thread of the worker); elsewhere only
+    the dispatcher's own, longer deadline applies.
+
+    Args:
+        specs (Tuple[str, ...]): Enricher specifications
+        item (EnrichmentInput): Application to score
+        timeout (Optional[float]): Seconds the enrichers may run in total
+
+    Returns:
+        int: Sum of the points awarded
+
+    Raises:
+        EnrichmentTimeout: If the enrichers ran longer than `timeout`
+        ValueError: If an enricher returns a negative or non-integer score
+    """
+    enrichers = load_enrichers(specs)
+    use_alarm = bool(timeout) and hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+    if use_alarm:
+        previous_handler = signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        total = 0
+        for enricher in enrichers:
+            points = enricher(item)
+            if not isinstance(points, int) or isinstance(points, bool) or points < 0:
+                raise ValueError(f"Enricher {enricher.__name__} returned {points!r}; expected a non-negative int")
+            total += points
+        return total
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous_handler)
+
+def vocabulary_points(item: EnrichmentInput) -> int:
+    """
+    Example enricher: reward descriptions with a varied vocabulary.
+
+    Args:
+        item (EnrichmentInput): Application to score
+
+    Returns:
+        int: One point per VOCABULARY_WORDS_PER_POINT distinct words, at most VOCABULARY_POINTS_CAP
+    """
+    distinct_words = set(_WORD_PATTERN.findall(item.description.lower()))
+    return min(len(distinct_words) // VOCABULARY_WORDS_PER_POINT, VOCABULARY_POINTS_CAP)
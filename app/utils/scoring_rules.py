@@ -0,0 +1,83 @@
+"""
+Scoring rules and feature extraction.
+
+This module holds the silliness scoring weights and the pure functions that
+derive scoring features from an application and turn features into points.
+It has no database or model dependencies, so the Application model can keep
+its stored features up to date and ScoringService can rescore from them.
+"""
+import re
+from typing import NamedTuple
+
+# Base score: awarded when the description is longer than this many characters
+BASE_MIN_DESCRIPTION_LENGTH = 20
+BASE_POINTS = 10
+
+# Briefcase bonus
+BRIEFCASE_POINTS = 5
+
+# Hopping bonus per mention of "hop" or "hopping", capped
+HOP_POINTS = 3
+HOP_POINTS_CAP = 15
+
+# Twirltastic score per twirl, capped
+TWIRL_POINTS = 2
+TWIRL_POINTS_CAP = 20
+
+# Originality bonus for a walk name nobody has used before
+ORIGINALITY_POINTS = 7
+
+_HOP_PATTERN = re.compile(r'\bhop(?:ping)?\b')
+
+class ScoreBreakdown(NamedTuple):
+    """Points awarded by each scoring rule."""
+    base: int
+    briefcase: int
+    hopping: int
+    twirls: int
+    originality: int
+
+    @property
+    def total(self) -> int:
+        """Silliness score: the sum of all components."""
+        return self.base + self.briefcase + self.hopping + self.twirls + self.originality
+
+def count_hops(description: str) -> int:
+    """
+    Count mentions of "hop" or "hopping" in a description (case-insensitive).
+
+    Args:
+        description (str): Walk description
+
+    Returns:
+        int: Number of hop words
+    """
+    return len(_HOP_PATTERN.findall(description.lower()))
+
+def score_breakdown(
+    description_length: int,
+    hop_count: int,
+    has_briefcase: bool,
+    number_of_twirls: int,
+    is_original: bool
+) -> ScoreBreakdown:
+    """
+    Score an application from its features.
+
+    Args:
+        description_length (int): Number of characters in the description
+        hop_count (int): Number of hop words in the description
+        has_briefcase (bool): Whether the walk involves a briefcase
+        number_of_twirls (int): Number of twirls
+        is_original (bool): Whether the walk name was unique when submitted
+
+    Returns:
+        ScoreBreakdown: Points per scoring rule
+    """
+    return ScoreBreakdown(
+        base=BASE_POINTS if description_length > BASE_MIN_DESCRIPTION_LENGTH else 0,
+        briefcase=BRIEFCASE_POINTS if has_briefcase else 0,
+        hopping=min(hop_count * HOP_POINTS, HOP_POINTS_CAP),
+        twirls=min(number_of_twirls * TWIRL_POINTS, TWIRL_POINTS_CAP),
+        originality=ORIGINALITY_POINTS if is_original else 0,
+    )
@@ -0,0 +1,216 @@
+"""
+Compression codec for large text stored in the database.
+
+This module compresses text above a size threshold with zlib or, when the
+optional `zstandard` package is installed, zstd. Both can use a shared
+dictionary trained on typical values (see scripts/train_description_dictionary.py),
+which is what makes compressing short, similar texts worthwhile.
+
+Compressed values are bytes with a small header:
+
+    1 byte   method (1 = zlib raw deflate, 2 = zstd)
+    4 bytes  dictionary ID (big-endian CRC32 of the dictionary, 0 = none)
+    ...      compressed UTF-8 text
+
+Values below the threshold, or that do not shrink, stay plain strings, so
+existing rows and disabled compression need no migration.
+"""
+import logging
+import struct
+import threading
+import zlib
+from typing import Dict, Iterable, Optional, Union
+from app.config import get_settings
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency
+    zstandard = None
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+METHOD_ZLIB = 1
+METHOD_ZSTD = 2
+
+_HEADER = struct.Struct(">BI")
+
+class TextCodecError(Exception):
+    """A stored value cannot be decoded (unknown method or missing dictionary)."""
+
+def dictionary_id(dictionary: bytes) -> int:
+    """
+    Identify a dictionary by the CRC32 of its content.
+
+    Args:
+        dictionary (bytes): Dictionary content
+
+    Returns:
+        int: Non-zero 32-bit ID
+    """
+    return zlib.crc32(dictionary) or 1
+
+class TextCodec:
+    """
+    Threshold-based text compressor with optional shared dictionaries.
+
+    Several dictionaries can be loaded so values written with an older one stay
+    readable; new values use the first.
+    """
+
+    def __init__(
+        self,
+        method: str = "off",
+        min_size: int = 256,
+        level: Optional[int] = None,
+        dictionaries: Iterable[bytes] = ()
+    ):
+        self._local = threading.local()
+        self.configure(method, min_size, level, dictionaries)
+
+    def configure(
+        self,
+        method: str = "off",
+        min_size: int = 256,
+        level: Optional[int] = None,
+        dictionaries: Iterable[bytes] = ()
+    ) -> None:
+        """
+        (Re)configure the codec.
+
+        Args:
+            method (str): "off", "zlib" or "zstd" (falls back to zlib without zstandard)
+            min_size (int): Minimum UTF-8 size in bytes for a value to be compressed
+            level (Optional[int]): Compression level (codec default if None)
+            dictionaries (Iterable[bytes]): Dictionaries; the first one is used for writing
+        """
+        if method == "zstd" and zstandard is None:
+            logger.warning("zstandard is not installed; compressing descriptions with zlib instead")
+            method = "zlib"
+        if method not in ("off", "zlib", "zstd"):
+            raise ValueError(f"Unknown text compression method: {method}")
+
+        self.method = method
+        self.min_size = min_size
+        self.level = level
+        self._dictionaries: Dict[int, bytes] = {}
+        self._write_dictionary_id = 0
+        for dictionary in dictionaries:
+            if not self._dictionaries:
+                self._write_dictionary_id = dictionary_id(dictionary)
+            self._dictionaries[dictionary_id(dictionary)] = dictionary
+        # Per-thread zstd (de)compressors, rebuilt after reconfiguration
+        self._local = threading.local()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether new values are compressed."""
+        return self.method != "off"
+
+    def encode(self, text: str) -> Union[str, bytes]:
+        """
+        Compress a text if it is large enough and compression pays off.
+
+        Args:
+            text (str): Text to store
+
+        Returns:
+            Union[str, bytes]: The original text, or the header-prefixed compressed bytes
+        """
+        if not self.enabled:
+            return text
+        raw = text.encode("utf-8")
+        if len(raw) < self.min_size:
+            return text
+
+        dict_id = self._write_dictionary_id
+        if self.method == "zstd":
+            payload = self._zstd_compressor(dict_id).compress(raw)
+            method = METHOD_ZSTD
+        else:
+            compressor = zlib.compressobj(
+                self.level if self.level is not None else 6,
+                zlib.DEFLATED,
+                -15,
+                **({"zdict": self._dictionaries[dict_id]} if dict_id else {})
+            )
+            payload = compressor.compress(raw) + compressor.flush()
+            method = METHOD_ZLIB
+
+        if _HEADER.size + len(payload) >= len(raw):
+            return text
+        return _HEADER.pack(method, dict_id) + payload
+
+    def decode(self, value: Union[str, bytes, memoryview]) -> str:
+        """
+        Return the text for a stored value.
+
+        Args:
+            value (Union[str, bytes, memoryview]): Stored value
+
+        Returns:
+            str: Decompressed text
+
+        Raises:
+            TextCodecError: If the value uses an unknown method or dictionary
+        """
+        if isinstance(value, str):
+            return value
+        value = bytes(value)
+        method, dict_id = _HEADER.unpack_from(value)
+        payload = value[_HEADER.size:]
+        if dict_id and dict_id not in self._dictionaries:
+            raise TextCodecError(f"Compression dictionary {dict_id:08x} is not loaded")
+
+        if method == METHOD_ZLIB:
+            decompressor = zlib.decompressobj(
+                -15, **({"zdict": self._dictionaries[dict_id]} if dict_id else {})
+            )
+            raw = decompressor.decompress(payload) + decompressor.flush()
+        elif method == METHOD_ZSTD:
+            if zstandard is None:
+                raise TextCodecError("Value is zstd-compressed but zstandard is not installed")
+            raw = self._zstd_decompressor(dict_id).decompress(payload)
+        else:
+            raise TextCodecError(f"Unknown compression method {method}")
+        return raw.decode("utf-8")
+
+    def _zstd_dict(self, dict_id: int):
+        """Wrap a loaded dictionary for zstandard."""
+        return zstandard.ZstdCompressionDict(self._dictionaries[dict_id]) if dict_id else None
+
+    def _zstd_compressor(self, dict_id: int):
+        """Per-thread zstd compressor (zstandard objects are not thread-safe)."""
+        compressors = self._local.__dict__.setdefault("compressors", {})
+        if dict_id not in compressors:
+            compressors[dict_id] = zstandard.ZstdCompressor(
+                level=self.level if self.level is not None else 3,
+                dict_data=self._zstd_dict(dict_id),
+                write_content_size=True,
+            )
+        return compressors[dict_id]
+
+    def _zstd_decompressor(self, dict_id: int):
+        """Per-thread zstd decompressor."""
+        decompressors = self._local.__dict__.setdefault("decompressors", {})
+        if dict_id not in decompressors:
+            decompressors[dict_id] = zstandard.ZstdDecompressor(dict_data=self._zstd_dict(dict_id))
+        return decompressors[dict_id]
+
+def _load_dictionaries(paths: Iterable[str]) -> list:
+    """Read dictionary files."""
+    dictionaries = []
+    for path in paths:
+        with open(path, "rb") as dictionary_file:
+            dictionaries.append(dictionary_file.read())
+    return dictionaries
+
+_settings = get_settings()
+
+# Codec for Application.description (see DESCRIPTION_COMPRESSION* settings)
+description_codec = TextCodec(
+    method=_settings.description_compression,
+    min_size=_settings.description_compression_min_size,
+    level=_settings.description_compression_level,
+    dictionaries=_load_dictionaries(_settings.description_compression_dictionaries)
+)
@@ -0,0 +1,333 @@
+"""
+Capture of sanitised API traffic for offline replay.
+
+This module provides an ASGI middleware that records each request (method,
+path, query, headers and JSON body, redacted with sanitize_log_data) with its
+start time, duration, status and a fingerprint of its response to a compact
+binary log, and the reader that benchmarks/replay.py uses to re-drive the
+recorded traffic against a local app instance.
+
+A log file starts with MAGIC followed by a single deflate stream of
+newline-delimited JSON records, flushed after every record so that everything
+written so far stays readable if the process dies. Each process writes its own
+files (capture-<time>-<pid>-<n>.swt) in TRAFFIC_CAPTURE_DIR, so several workers
+can capture at once; the reader merges files by start time.
+
+Response fingerprints hash the JSON body with UUIDs and timestamps masked, so
+a replay against an equivalent database yields the same fingerprint when it
+returns the same data. The ID returned by a create is stored too, so the replay
+can substitute the IDs its own creates return.
+"""
+import glob
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+import zlib
+from typing import Iterable, Iterator, List, Optional
+from urllib.parse import parse_qsl, urlencode
+from starlette.concurrency import run_in_threadpool
+from app.config import get_settings
+from app.utils.profiling import DEBUG_HEADER
+from app.utils.security import sanitize_log_data
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# First bytes of every capture file (format version 1)
+MAGIC = b"SWTRAFFIC1\n"
+
+# Headers never recorded: credentials sanitize_log_data does not recognise (including the
+# profiling debug key, which would also profile every replayed request), and per-connection ones
+DROPPED_HEADERS = {"authorization", "cookie", DEBUG_HEADER.decode("latin-1"), "host", "content-length", "connection"}
+
+# Response JSON fields that differ between otherwise identical runs
+VOLATILE_FIELDS = {"submission_timestamp", "updated_at", "changed_at", "started_at"}
+
+# Response bodies larger than this are not fingerprinted
+MAX_FINGERPRINT_BYTES = 1024 * 1024
+
+_UUID = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", re.IGNORECASE)
+
+def sanitize_headers(headers: Iterable[tuple]) -> dict:
+    """
+    Redact request headers for the capture log.
+
+    Header names are lower-cased with "-" replaced by "_" so that
+    sanitize_log_data recognises e.g. X-API-Key as x_api_key.
+
+    Args:
+        headers (Iterable[tuple]): ASGI (name, value) byte pairs
+
+    Returns:
+        dict: Normalised name -> value, with sensitive values redacted
+    """
+    normalised = {}
+    for name, value in headers:
+        name = name.decode("latin-1").lower()
+        if name not in DROPPED_HEADERS:
+            normalised[name.replace("-", "_")] = value.decode("latin-1")
+    return sanitize_log_data(normalised)
+
+def sanitize_query(query_string: bytes) -> str:
+    """Redact sensitive query parameters, keeping their order."""
+    pairs = parse_qsl(query_string.decode("latin-1"), keep_blank_values=True)
+    return urlencode([item for key, value in pairs for item in sanitize_log_data({key: value}).items()])
+
+def fingerprint_response(body: bytes) -> Optional[str]:
+    """
+    Fingerprint a response body for comparison between runs.
+
+    JSON bodies are compared by content: keys are sorted, VOLATILE_FIELDS are
+    dropped and UUIDs are masked. Other bodies are hashed as they are.
+
+    Args:
+        body (bytes): Uncompressed response body
+
+    Returns:
+        Optional[str]: 16 hex digits, or None for bodies too large to fingerprint
+    """
+    if len(body) > MAX_FINGERPRINT_BYTES:
+        return None
+    try:
+        canonical = json.dumps(_without_volatile(json.loads(body)), sort_keys=True, separators=(",", ":"))
+        body = _UUID.sub("<id>", canonical).encode("utf-8")
+    except ValueError:
+        pass
+    return hashlib.sha256(body).hexdigest()[:16]
+
+def _without_volatile(value):
+    """Drop VOLATILE_FIELDS from a decoded JSON value, recursively."""
+    if isinstance(value, dict):
+        return {key: _without_volatile(item) for key, item in value.items() if key not in VOLATILE_FIELDS}
+    if isinstance(value, list):
+        return [_without_volatile(item) for item in value]
+    return value
+
+def _response_id(body: bytes) -> Optional[str]:
+    """The "id" of a JSON object response (e.g. a created application), if any."""
+    if not body.startswith(b"{"):
+        return None
+    try:
+        value = json.loads(body).get("id")
+    except ValueError:
+        return None
+    return value if isinstance(value, str) else None
+
+class TrafficLog:
+    """
+    Append-only capture log of one process.
+
+    The file is created on the first append. Once `max_bytes` have been written,
+    further records are dropped (and a warning is logged once).
+    """
+
+    def __init__(self, directory: str, max_bytes: int, level: int = 6):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.level = level
+        self.path: Optional[str] = None
+        self.records = 0
+        self.bytes_written = 0
+        self.files = 0
+        self._file = None
+        self._compressor = None
+        self._full = False
+        self._lock = threading.Lock()
+
+    def _open(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        self.files += 1
+        name = f"capture-{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-{self.files}.swt"
+        self.path = os.path.join(self.directory, name)
+        self._file = open(self.path, "xb")
+        self._file.write(MAGIC)
+        self.bytes_written = len(MAGIC)
+        self._compressor = zlib.compressobj(self.level)
+
+    def append(self, record: dict) -> bool:
+        """
+        Write one record and flush it to the file.
+
+        Args:
+            record (dict): JSON-serialisable record
+
+        Returns:
+            bool: False if the record was dropped because the log is full
+        """
+        line = json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n"
+        with self._lock:
+            if self._full:
+                return False
+            if self._file is None:
+                self._open()
+            data = self._compressor.compress(line) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+            if self.bytes_written + len(data) > self.max_bytes:
+                self._full = True
+                logger.warning(f"Traffic capture {self.path} reached {self.max_bytes} bytes; capture stopped")
+                return False
+            self._file.write(data)
+            self._file.flush()
+            self.bytes_written += len(data)
+            self.records += 1
+            return True
+
+    def close(self) -> None:
+        """Finish the deflate stream and close the file (a later append starts a new one)."""
+        with self._lock:
+            if self._file is not None:
+                self._file.write(self._compressor.flush())
+                self._file.close()
+                self._file = None
+
+    def stats(self) -> dict:
+        """Capture state for the health endpoint."""
+        return {"path": self.path, "records": self.records, "bytes": self.bytes_written, "full": self._full}
+
+def read_capture_file(path: str) -> Iterator[dict]:
+    """
+    Read the records of one capture file.
+
+    A record cut off by a crash at the end of the file is skipped.
+
+    Args:
+        path (str): Capture file
+
+    Yields:
+        dict: Records in write order
+
+    Raises:
+        ValueError: If the file is not a capture log
+    """
+    with open(path, "rb") as capture_file:
+        if capture_file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a traffic capture file")
+        decompressor = zlib.decompressobj()
+        pending = b""
+        while True:
+            chunk = capture_file.read(1 << 16)
+            if not chunk:
+                break
+            try:
+                pending += decompressor.decompress(chunk)
+            except zlib.error:
+                # Torn write at the end of a crashed capture
+                break
+            *lines, pending = pending.split(b"\n")
+            for line in lines:
+                yield json.loads(line)
+
+def read_capture(paths: Iterable[str]) -> List[dict]:
+    """
+    Read capture files (or directories of them) merged in start-time order.
+
+    Args:
+        paths (Iterable[str]): Capture files and/or directories
+
+    Returns:
+        List[dict]: All records sorted by "started"
+    """
+    files = []
+    for path in paths:
+        files.extend(sorted(glob.glob(os.path.join(path, "*.swt"))) if os.path.isdir(path) else [path])
+    records = [record for path in files for record in read_capture_file(path)]
+    records.sort(key=lambda record: record["started"])
+    return records
+
+class TrafficCaptureMiddleware:
+    """
+    ASGI middleware that records sampled HTTP requests to a TrafficLog.
+
+    Event streams are not captured; they do not end. Request bodies that are
+    not JSON objects or arrays, or are larger than `max_body_bytes`, are
+    recorded without their body (and skipped by the replay).
+    """
+
+    def __init__(self, app, log: TrafficLog, sample_rate: float = 1.0, max_body_bytes: int = 65536):
+        self.app = app
+        self.log = log
+        self.sample_rate = sample_rate
+        self.max_body_bytes = max_body_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or (self.sample_rate < 1.0 and random.random() >= self.sample_rate):
+            await self.app(scope, receive, send)
+            return
+
+        request_chunks: List[bytes] = []
+        response_chunks: List[bytes] = []
+        state = {"status": 500, "stream": False, "request_size": 0, "response_size": 0}
+
+        async def receive_wrapper():
+            message = await receive()
+            if message["type"] == "http.request":
+                body = message.get("body", b"")
+                state["request_size"] += len(body)
+                if state["request_size"] <= self.max_body_bytes:
+                    request_chunks.append(body)
+            return message
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+                state["stream"] = any(
+                    name == b"content-type" and value.startswith(b"text/event-stream")
+                    for name, value in message.get("headers", [])
+                )
+            elif message["type"] == "http.response.body" and not state["stream"]:
+                body = message.get("body", b"")
+                state["response_size"] += len(body)
+                if state["response_size"] <= MAX_FINGERPRINT_BYTES:
+                    response_chunks.append(body)
+            await send(message)
+
+        started = time.time()
+        started_counter = time.perf_counter()
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            duration_ms = (time.perf_counter() - started_counter) * 1000
+            if not state["stream"]:
+                record = self._record(scope, started, duration_ms, state, request_chunks, response_chunks)
+                try:
+                    await run_in_threadpool(self.log.append, record)
+                except Exception as e:
+                    logger.error(f"Error writing traffic capture: {str(e)}")
+
+    def _record(self, scope, started, duration_ms, state, request_chunks, response_chunks) -> dict:
+        """Build the sanitised capture record of a finished request."""
+        body = None
+        body_omitted = state["request_size"] > 0
+        if 0 < state["request_size"] <= self.max_body_bytes:
+            try:
+                body = json.loads(b"".join(request_chunks))
+                body_omitted = not isinstance(body, (dict, list))
+            except ValueError:
+                pass
+        if isinstance(body, dict):
+            body = sanitize_log_data(body)
+
+        response_body = b"".join(response_chunks)
+        complete = state["response_size"] <= MAX_FINGERPRINT_BYTES
+        return {
+            "started": round(started, 6),
+            "method": scope["method"],
+            "path": scope["path"],
+            "query": sanitize_query(scope.get("query_string", b"")),
+            "headers": sanitize_headers(scope.get("headers", [])),
+            "body": None if body_omitted else body,
+            "body_omitted": body_omitted,
+            "status": state["status"],
+            "duration_ms": round(duration_ms, 3),
+            "fingerprint": fingerprint_response(response_body) if complete else None,
+            "response_id": _response_id(response_body) if complete else None,
+        }
+
+_settings = get_settings()
+
+# This process's capture log (the file is only created once something is captured)
+traffic_log = TrafficLog(_settings.traffic_capture_dir, _settings.traffic_capture_max_bytes)
@@ -0,0 +1,196 @@
+"""
+Benchmark of analytics reports over a memory-mapped snapshot.
+
+Builds a synthetic snapshot (default 10M applications, generated with numpy
+using the distributions of benchmarks/fixtures.py) and times each report from
+app/analytics/queries.py on it, including opening the snapshot.
+
+With --sql-rows, a SQLite database of that many fixture rows is also seeded,
+exported through export_snapshot(), and the score report is timed both as a
+SQL GROUP BY and on the exported snapshot.
+
+Needs numpy.
+
+Usage:
+    python benchmarks/analytics.py [--rows 10000000] [--sql-rows 200000]
+                                   [--json results/analytics.json] [--baseline baseline/analytics.json]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import compare_to_baseline, environment_info, report_regressions, write_results
+
+
+def build_snapshot(path: str, rows: int, seed: int, batch_size: int = 1000000) -> None:
+    """
+    Write a synthetic snapshot with numpy.
+
+    Args:
+        path (str): Snapshot file
+        rows (int): Number of applications
+        seed (int): Random seed
+        batch_size (int): Rows generated per batch
+    """
+    import numpy as np
+    from app.analytics.snapshot import SnapshotWriter
+    from app.utils import scoring_rules
+    from fixtures import STATUS_WEIGHTS, STATUSES
+
+    rng = np.random.default_rng(seed)
+    writer = SnapshotWriter(path, rows)
+    status_codes = np.array([writer.status_code(status) for status in STATUSES])
+    started_at = int(time.time()) - 365 * 86400
+    next_timestamp = started_at
+
+    for start in range(0, rows, batch_size):
+        count = min(batch_size, rows - start)
+        description_length = np.minimum(rng.lognormal(np.log(180), 0.8, count), 20000).astype(np.int32)
+        hop_count = np.where(rng.random(count) < 0.55, 0, rng.geometric(1 / 2.0, count))
+        has_briefcase = rng.random(count) < 0.35
+        twirls = np.where(rng.random(count) < 0.3, 0, np.minimum(rng.geometric(1 / 4.0, count), 100))
+        is_original = rng.random(count) >= 0.08
+
+        score_base = np.where(description_length > scoring_rules.BASE_MIN_DESCRIPTION_LENGTH, scoring_rules.BASE_POINTS, 0)
+        score_briefcase = np.where(has_briefcase, scoring_rules.BRIEFCASE_POINTS, 0)
+        score_hopping = np.minimum(hop_count * scoring_rules.HOP_POINTS, scoring_rules.HOP_POINTS_CAP)
+        score_twirls = np.minimum(twirls * scoring_rules.TWIRL_POINTS, scoring_rules.TWIRL_POINTS_CAP)
+        score_originality = np.where(is_original, scoring_rules.ORIGINALITY_POINTS, 0)
+
+        timestamps = next_timestamp + np.cumsum(rng.exponential(3.0, count)).astype(np.int64)
+        next_timestamp = int(timestamps[-1])
+
+        writer.append({
+            "silliness_score": score_base + score_briefcase + score_hopping + score_twirls + score_originality,
+            "score_base": score_base,
+            "score_briefcase": score_briefcase,
+            "score_hopping": score_hopping,
+            "score_twirls": score_twirls,
+            "score_originality": score_originality,
+            "has_briefcase": has_briefcase,
+            "involves_hopping": hop_count > 0,
+            "is_original": is_original,
+            "number_of_twirls": twirls,
+            "hop_count": hop_count,
+            "description_length": description_length,
+            "status": status_codes[rng.choice(len(STATUSES), count, p=STATUS_WEIGHTS)],
+            "submission_timestamp": timestamps,
+            "updated_at": timestamps,
+            "archived": np.zeros(count, dtype=np.uint8),
+        })
+    writer.close()
+
+
+def time_reports(path: str) -> dict:
+    """Open the snapshot and time each report in milliseconds."""
+    from app.analytics import queries
+    from app.analytics.snapshot import Snapshot
+
+    timings = {}
+    started = time.perf_counter()
+    snapshot = Snapshot(path)
+    timings["open"] = (time.perf_counter() - started) * 1000
+
+    reports = {
+        "scores": queries.average_score_by_features,
+        "twirls": queries.twirl_distribution,
+        "daily": queries.submissions_per_day,
+        "statuses": queries.status_counts,
+    }
+    for name, report in reports.items():
+        started = time.perf_counter()
+        report(snapshot)
+        timings[name] = (time.perf_counter() - started) * 1000
+    snapshot.close()
+    timings["total"] = sum(timings.values())
+    return timings
+
+
+def compare_with_sql(tmp_dir: str, rows: int, seed: int) -> dict:
+    """Time the score report as SQL and on an exported snapshot of the same data."""
+    from sqlalchemy import create_engine
+    from app.analytics import queries
+    from app.analytics.snapshot import Snapshot, export_snapshot
+    from app.db.database import Base
+    from fixtures import FixtureGenerator, bulk_load
+
+    engine = create_engine(f"sqlite:///{os.path.join(tmp_dir, 'analytics.db')}")
+    Base.metadata.create_all(engine)
+    bulk_load(engine, rows, FixtureGenerator(seed=seed))
+
+    with engine.connect() as connection:
+        started = time.perf_counter()
+        connection.exec_driver_sql(
+            "SELECT has_briefcase, involves_hopping, COUNT(*), AVG(silliness_score) "
+            "FROM applications GROUP BY has_briefcase, involves_hopping"
+        ).all()
+        sql_ms = (time.perf_counter() - started) * 1000
+
+    path = os.path.join(tmp_dir, "exported.snapshot")
+    started = time.perf_counter()
+    export_snapshot(engine, path, include_archived=False)
+    export_s = time.perf_counter() - started
+    engine.dispose()
+
+    with Snapshot(path) as snapshot:
+        started = time.perf_counter()
+        queries.average_score_by_features(snapshot)
+        snapshot_ms = (time.perf_counter() - started) * 1000
+
+    return {"export_rows_per_s": rows / export_s, "sql_scores_ms": sql_ms, "snapshot_scores_ms": snapshot_ms}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark analytics reports over a snapshot.")
+    parser.add_argument("--rows", type=int, default=10000000, help="Applications in the synthetic snapshot")
+    parser.add_argument("--sql-rows", type=int, default=0, help="Also compare with SQL on this many fixture rows")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="Baseline JSON file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative slowdown")
+    args = parser.parse_args()
+
+    benchmarks = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # The app is only imported for its snapshot code; keep its default database out of the way
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp_dir, 'unused.db')}"
+
+        path = os.path.join(tmp_dir, "synthetic.snapshot")
+        started = time.perf_counter()
+        build_snapshot(path, args.rows, args.seed)
+        print(f"built {args.rows:,}-row snapshot ({os.path.getsize(path) / 1048576:.0f} MiB) in {time.perf_counter() - started:.1f} s")
+
+        benchmarks["reports"] = time_reports(path)
+        for name, elapsed_ms in benchmarks["reports"].items():
+            print(f"{name:<10} {elapsed_ms:9.1f} ms")
+
+        if args.sql_rows:
+            benchmarks["sql_comparison"] = compare_with_sql(tmp_dir, args.sql_rows, args.seed)
+            result = benchmarks["sql_comparison"]
+            print(
+                f"{args.sql_rows:,} rows: export {result['export_rows_per_s']:,.0f} rows/s, scores via SQL "
+                f"{result['sql_scores_ms']:.1f} ms vs snapshot {result['snapshot_scores_ms']:.1f} ms"
+            )
+
+    results = {"environment": environment_info(), "benchmarks": benchmarks}
+    if args.json_path:
+        write_results(args.json_path, results)
+
+    regressions = []
+    if args.baseline:
+        regressions = compare_to_baseline(
+            benchmarks,
+            args.baseline,
+            args.tolerance,
+            lower_is_better=["open", "scores", "twirls", "daily", "statuses", "total", "snapshot_scores_ms"],
+            higher_is_better=["export_rows_per_s"],
+        )
+    return report_regressions(regressions, args.baseline)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""
+Benchmark of hot/cold tiering of decided applications.
+
+Seeds a throw-away SQLite database with the realistic status mix of
+benchmarks/fixtures.py, archives every decided application, and reports:
+- database size before and after (VACUUMed) and the size of the segment files
+- archiving throughput
+- get-by-ID latency for active applications, archived applications with a cold
+  and a warm row group cache, and unknown IDs (which now also check the archive index)
+
+Usage:
+    python benchmarks/archive.py [--rows 100000] [--reads 2000]
+                                 [--json results/archive.json] [--baseline baseline/archive.json]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import compare_to_baseline, environment_info, latency_summary, report_regressions, write_results
+
+
+def vacuumed_size(engine, path: str) -> int:
+    """VACUUM the database and return its file size."""
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.exec_driver_sql("VACUUM")
+    return os.path.getsize(path)
+
+
+def time_reads(session_factory, ids: list, before_each=None) -> dict:
+    """
+    Time ApplicationService.get_application_by_id for each ID, one session per read.
+
+    Args:
+        session_factory: Session factory
+        ids (list): IDs to read
+        before_each: Optional callable run untimed before each read
+
+    Returns:
+        dict: Latency summary
+    """
+    from app.services.application_service import ApplicationService
+
+    latencies = []
+    for application_id in ids:
+        if before_each is not None:
+            before_each()
+        db = session_factory()
+        try:
+            started = time.perf_counter()
+            ApplicationService.get_application_by_id(db, application_id)
+            latencies.append(time.perf_counter() - started)
+        finally:
+            db.close()
+    return latency_summary(latencies, sum(latencies))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark archiving decided applications.")
+    parser.add_argument("--rows", type=int, default=100000, help="Applications to seed")
+    parser.add_argument("--reads", type=int, default=2000, help="Reads per scenario")
+    parser.add_argument("--segment-rows", type=int, default=10000, help="Applications per segment")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="Baseline JSON file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative slowdown")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Must be set before the app (and its engine and archive store) is imported
+        db_path = os.path.join(tmp_dir, "archive.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+        os.environ["ARCHIVE_DIR"] = os.path.join(tmp_dir, "segments")
+
+        from sqlalchemy import select
+        from app.db.archive import archive_store
+        from app.db.database import SessionLocal, create_tables, engine
+        from app.models.application import Application
+        from app.services.archive_service import ARCHIVABLE_STATUSES, ArchiveService
+        from fixtures import FixtureGenerator, bulk_load
+
+        create_tables()
+        bulk_load(engine, args.rows, FixtureGenerator(seed=args.seed))
+        size_before = vacuumed_size(engine, db_path)
+
+        db = SessionLocal()
+        try:
+            decided = set(db.execute(
+                select(Application.id).where(Application.status.in_(ARCHIVABLE_STATUSES))
+            ).scalars())
+            active = list(db.execute(
+                select(Application.id).where(Application.status.notin_(ARCHIVABLE_STATUSES))
+            ).scalars())
+            started = time.perf_counter()
+            archived = ArchiveService.archive_decided(db, datetime.utcnow(), args.segment_rows)
+            archive_s = time.perf_counter() - started
+        finally:
+            db.close()
+
+        size_after = vacuumed_size(engine, db_path)
+        segment_bytes = sum(
+            os.path.getsize(archive_store.segment_path(segment)) for segment in archive_store.segments()
+        )
+
+        rng = random.Random(args.seed)
+        decided = sorted(decided)
+        active_ids = rng.choices(active, k=args.reads)
+        archived_ids = rng.choices(decided, k=args.reads)
+        unknown_ids = [uuid.uuid4() for _ in range(args.reads)]
+
+        reads = {
+            "active": time_reads(SessionLocal, active_ids),
+            "archived_cold": time_reads(SessionLocal, archived_ids, archive_store._row_group.cache_clear),
+            "archived_warm": time_reads(SessionLocal, archived_ids[:50] * (args.reads // 50 or 1)),
+            "unknown": time_reads(SessionLocal, unknown_ids),
+        }
+        engine.dispose()
+
+    print(
+        f"archived {archived:,} of {args.rows:,} applications in {archive_s:.1f} s "
+        f"({archived / archive_s:,.0f}/s)"
+    )
+    print(
+        f"database {size_before / 1048576:.1f} MiB -> {size_after / 1048576:.1f} MiB, "
+        f"segments {segment_bytes / 1048576:.1f} MiB"
+    )
+    for name, result in reads.items():
+        print(f"get {name:<14} p50 {result['p50_ms']:7.3f} ms   p99 {result['p99_ms']:7.3f} ms")
+
+    benchmarks = {
+        "archive": {
+            "rows_per_s": archived / archive_s,
+            "db_bytes_before": size_before,
+            "db_bytes_after": size_after,
+            "segment_bytes": segment_bytes,
+        },
+    }
+    for name, result in reads.items():
+        benchmarks[f"get_{name}"] = {"p50_ms": result["p50_ms"], "p99_ms": result["p99_ms"]}
+
+    results = {"environment": environment_info(), "benchmarks": benchmarks}
+    if args.json_path:
+        write_results(args.json_path, results)
+
+    regressions = []
+    if args.baseline:
+        regressions = compare_to_baseline(
+            benchmarks,
+            args.baseline,
+            args.tolerance,
+            lower_is_better=["p50_ms", "p99_ms", "db_bytes_after", "segment_bytes"],
+            higher_is_better=["rows_per_s"],
+        )
+    return report_regressions(regressions, args.baseline)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Covers latency statistics, result files and baseline comparison so every
+benchmark reports and flags regressions the same way.
+"""
+import json
+import math
+import os
+import platform
+import sys
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+
+def percentile(sorted_values: Sequence[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted sequence.
+
+    Args:
+        sorted_values (Sequence[float]): Values sorted ascending
+        pct (float): Percentile between 0 and 100
+
+    Returns:
+        float: The percentile value (0.0 for an empty sequence)
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100.0 * len(sorted_values)), 1)
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def latency_summary(latencies_s: List[float], elapsed_s: float) -> dict:
+    """
+    Summarise request latencies as throughput and percentiles in milliseconds.
+
+    Args:
+        latencies_s (List[float]): Per-request latencies in seconds
+        elapsed_s (float): Wall-clock time of the whole run in seconds
+
+    Returns:
+        dict: count, throughput_rps and p50/p90/p99/max latency in ms
+    """
+    values = sorted(latencies_s)
+    return {
+        "count": len(values),
+        "throughput_rps": len(values) / elapsed_s if elapsed_s > 0 else 0.0,
+        "p50_ms": percentile(values, 50) * 1000,
+        "p90_ms": percentile(values, 90) * 1000,
+        "p99_ms": percentile(values, 99) * 1000,
+        "max_ms": (values[-1] * 1000) if values else 0.0,
+    }
+
+
+def environment_info() -> dict:
+    """Describe the machine the benchmark ran on."""
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+    }
+
+
+def write_results(path: str, results: dict) -> None:
+    """
+    Write benchmark results as JSON.
+
+    Args:
+        path (str): Output file
+        results (dict): Results to store
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as results_file:
+        json.dump(results, results_file, indent=2, sort_keys=True)
+
+
+def compare_to_baseline(
+    results: Dict[str, dict],
+    baseline_path: str,
+    tolerance: float,
+    lower_is_better: Sequence[str],
+    higher_is_better: Sequence[str] = (),
+) -> List[str]:
+    """
+    Compare benchmark metrics against a stored baseline.
+
+    Both files map a benchmark name to a dict of metrics. A metric regresses when
+    it is worse than the baseline by more than the tolerance fraction.
+
+    Args:
+        results (Dict[str, dict]): Current results keyed by benchmark name
+        baseline_path (str): Baseline JSON file written by an earlier run
+        tolerance (float): Allowed relative slowdown, e.g. 0.1 for 10%
+        lower_is_better (Sequence[str]): Metric names where smaller is better
+        higher_is_better (Sequence[str]): Metric names where larger is better
+
+    Returns:
+        List[str]: Human-readable regression descriptions (empty if none)
+    """
+    with open(baseline_path, "r", encoding="utf-8") as baseline_file:
+        baseline = json.load(baseline_file).get("benchmarks", {})
+
+    regressions = []
+    for name, metrics in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        for metric in lower_is_better:
+            if metric in metrics and base.get(metric) and metrics[metric] > base[metric] * (1 + tolerance):
+                regressions.append(f"{name}.{metric}: {metrics[metric]:.3f} vs baseline {base[metric]:.3f}")
+        for metric in higher_is_better:
+            if metric in metrics and base.get(metric) and metrics[metric] < base[metric] * (1 - tolerance):
+                regressions.append(f"{name}.{metric}: {metrics[metric]:.3f} vs baseline {base[metric]:.3f}")
+    return regressions
+
+
+def report_regressions(regressions: List[str], baseline_path: Optional[str]) -> int:
+    """
+    Print regressions and return a process exit code.
+
+    Args:
+        regressions (List[str]): Output of compare_to_baseline
+        baseline_path (Optional[str]): Baseline that was used, if any
+
+    Returns:
+        int: 1 if any regression was found, otherwise 0
+    """
+    if not baseline_path:
+        return 0
+    if not regressions:
+        print(f"No regressions against {baseline_path}")
+        return 0
+    print(f"REGRESSIONS against {baseline_path}:")
+    for regression in regressions:
+        print(f"  {regression}")
+    return 1
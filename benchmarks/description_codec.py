@@ -0,0 +1,170 @@
+"""
+Benchmark of description compression at rest.
+
+Loads the same realistic corpus (benchmarks/fixtures.py) into one throw-away
+SQLite database per codec configuration and reports:
+- database file size after VACUUM
+- bulk write rate
+- get-by-ID latency (reads and decompresses the description)
+- summary list page latency (must not change: descriptions are never loaded)
+
+Dictionaries are trained on a separate sample of the same generator.
+
+Usage:
+    python benchmarks/description_codec.py [--rows 20000] [--description-median 600]
+                                           [--json results/description_codec.json]
+                                           [--baseline baseline/description_codec.json]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import (
+    REPO_ROOT,
+    compare_to_baseline,
+    environment_info,
+    latency_summary,
+    report_regressions,
+    write_results,
+)
+
+
+def configurations(training: list) -> dict:
+    """Return codec settings (method, dictionaries) keyed by name."""
+    sys.path.insert(0, os.path.join(REPO_ROOT, "scripts"))
+    from train_description_dictionary import build_zlib_dictionary, build_zstd_dictionary
+    from app.utils.text_codec import zstandard
+
+    configs = {
+        "off": ("off", []),
+        "zlib": ("zlib", []),
+        "zlib_dict": ("zlib", [build_zlib_dictionary(training, 32 * 1024)]),
+    }
+    if zstandard is not None:
+        configs["zstd"] = ("zstd", [])
+        configs["zstd_dict"] = ("zstd", [build_zstd_dictionary(training, 64 * 1024)])
+    return configs
+
+
+def run_configuration(path: str, rows: int, generator_kwargs: dict, reads: int) -> dict:
+    """
+    Load the corpus into a new database and measure it.
+
+    Args:
+        path (str): SQLite file to create
+        rows (int): Number of applications
+        generator_kwargs (dict): FixtureGenerator parameters
+        reads (int): Number of get-by-ID and list reads
+
+    Returns:
+        dict: Size, write rate and read latencies
+    """
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.services.application_service import ApplicationService
+    from fixtures import FixtureGenerator, bulk_load
+
+    engine = create_engine(f"sqlite:///{path}")
+    session_factory = sessionmaker(bind=engine)
+
+    started = time.perf_counter()
+    ids = bulk_load(engine, rows, FixtureGenerator(**generator_kwargs), defer_indexes=False)
+    write_s = time.perf_counter() - started
+
+    with engine.connect() as connection:
+        connection.exec_driver_sql("VACUUM")
+    size = os.path.getsize(path)
+
+    rng = random.Random(1)
+    get_latencies = []
+    for application_id in rng.choices(ids, k=reads):
+        db = session_factory()
+        try:
+            request_started = time.perf_counter()
+            ApplicationService.get_application_by_id(db, application_id)
+            get_latencies.append(time.perf_counter() - request_started)
+        finally:
+            db.close()
+
+    list_latencies = []
+    for _ in range(reads):
+        skip = rng.randrange(0, max(rows - 100, 1))
+        db = session_factory()
+        try:
+            request_started = time.perf_counter()
+            ApplicationService.get_application_summaries(db, skip, 100)
+            list_latencies.append(time.perf_counter() - request_started)
+        finally:
+            db.close()
+
+    engine.dispose()
+    get_summary = latency_summary(get_latencies, sum(get_latencies))
+    list_summary = latency_summary(list_latencies, sum(list_latencies))
+    return {
+        "db_bytes": size,
+        "write_rows_per_s": rows / write_s,
+        "get_p50_ms": get_summary["p50_ms"],
+        "get_p99_ms": get_summary["p99_ms"],
+        "list_summary_p50_ms": list_summary["p50_ms"],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark description compression at rest.")
+    parser.add_argument("--rows", type=int, default=20000, help="Applications per database")
+    parser.add_argument("--description-median", type=int, default=600, help="Median description length")
+    parser.add_argument("--min-size", type=int, default=256, help="DESCRIPTION_COMPRESSION_MIN_SIZE")
+    parser.add_argument("--reads", type=int, default=2000, help="Reads per read scenario")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed of the corpus")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="Baseline JSON file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative slowdown")
+    args = parser.parse_args()
+
+    benchmarks = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Each configuration uses its own engine; this only keeps the app's default one out of the way
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp_dir, 'unused.db')}"
+
+        from app.utils.text_codec import description_codec
+        from fixtures import FixtureGenerator
+
+        generator_kwargs = {"seed": args.seed, "description_median": args.description_median}
+        # Train on a different sample than the one that is stored
+        training_generator = FixtureGenerator(**dict(generator_kwargs, seed=args.seed + 1))
+        training = [payload["description"] for payload in training_generator.payloads(5000)]
+
+        for name, (method, dictionaries) in configurations(training).items():
+            description_codec.configure(method, min_size=args.min_size, dictionaries=dictionaries)
+            result = run_configuration(os.path.join(tmp_dir, f"{name}.db"), args.rows, generator_kwargs, args.reads)
+            benchmarks[name] = result
+            print(
+                f"{name:<10} size {result['db_bytes'] / 1048576:8.2f} MiB   write {result['write_rows_per_s']:9,.0f} rows/s   "
+                f"get p50 {result['get_p50_ms']:6.3f} ms   p99 {result['get_p99_ms']:6.3f} ms   "
+                f"summary page p50 {result['list_summary_p50_ms']:6.3f} ms"
+            )
+        description_codec.configure("off")
+
+    results = {"environment": environment_info(), "benchmarks": benchmarks}
+    if args.json_path:
+        write_results(args.json_path, results)
+
+    regressions = []
+    if args.baseline:
+        regressions = compare_to_baseline(
+            benchmarks,
+            args.baseline,
+            args.tolerance,
+            lower_is_better=["db_bytes", "get_p50_ms", "get_p99_ms", "list_summary_p50_ms"],
+            higher_is_better=["write_rows_per_s"],
+        )
+    return report_regressions(regressions, args.baseline)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
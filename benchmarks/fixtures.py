@@ -0,0 +1,348 @@
+"""
+Synthetic data generator for large `applications` fixtures.
+
+Generates applications with realistic distributions (description length,
+hop-word frequency, duplicate walk names, twirl counts, statuses) and either
+bulk-loads them straight into the `applications` table through SQLAlchemy Core
+or writes them as NDJSON request payloads for replay against the API.
+
+Usage:
+    python benchmarks/fixtures.py load --rows 10000000 --database-url sqlite:///./big.db
+    python benchmarks/fixtures.py ndjson --rows 100000 --output payloads.ndjson
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import common  # noqa: F401  (puts the repository root on sys.path)
+
+from app.utils.ids import uuid7
+from app.utils.scoring_rules import score_breakdown
+
+EPOCH = datetime(1970, 1, 1)
+
+# Words used to build description filler text. None of them contains "hop",
+# so the number of hop words in a description is exactly what we insert.
+FILLER_WORDS = (
+    "a very silly walk involving high leg lifts and a dramatic lean backwards "
+    "the walker swings the left leg out sideways then drags the right foot "
+    "while raising a bowler hat to passing civil servants with great dignity "
+    "knees bend at improbable angles arms flail in a windmill pattern and the "
+    "whole performance ends with a stiff salute towards the ministry building "
+    "each stride is longer than the last until the walker nearly topples over "
+    "umbrella held aloft like a conductor leading an orchestra of pigeons"
+).split()
+
+HOP_WORDS = ("hop", "hopping", "Hop", "HOPPING")
+
+FIRST_NAMES = ("John", "Michael", "Terry", "Graham", "Eric", "Carol", "Connie", "Neil", "Gwen", "Ian")
+LAST_NAMES = ("Cleese", "Palin", "Jones", "Chapman", "Idle", "Gilliam", "Cleveland", "Booth", "Innes", "Dowie")
+WALK_ADJECTIVES = ("Ministry", "Wobbly", "Flamingo", "Bureaucratic", "Spiral", "Lopsided", "Galloping", "Stately")
+WALK_NOUNS = ("Walk", "Shuffle", "Strut", "Saunter", "Stride", "Amble", "Prance", "Trot")
+
+# Status mix of a mature system
+STATUSES = ("PendingReview", "UnderSillyCouncilReview", "ApprovedForFunding", "RegrettablyNotSillyEnough")
+STATUS_WEIGHTS = (0.70, 0.15, 0.08, 0.07)
+
+
+class FixtureGenerator:
+    """
+    Generates synthetic applications with realistic distributions.
+
+    Distribution parameters (all overridable):
+    - description length: log-normal, median `description_median` characters
+    - hop words: none with probability `p_no_hops`, otherwise geometric with mean `mean_hops`
+    - walk names: a fraction `duplicate_name_rate` reuses a recent name
+    - submissions: Poisson arrivals, `mean_gap_seconds` apart on average, starting `days` ago
+    - twirls: zero with probability `p_no_twirls`, otherwise geometric with mean `mean_twirls`, capped at 100
+    """
+
+    def __init__(
+        self,
+        seed: int = 42,
+        description_median: int = 180,
+        description_sigma: float = 0.8,
+        max_description_length: int = 20000,
+        p_no_hops: float = 0.55,
+        mean_hops: float = 2.0,
+        duplicate_name_rate: float = 0.08,
+        p_no_twirls: float = 0.3,
+        mean_twirls: float = 4.0,
+        p_briefcase: float = 0.35,
+        days: int = 365,
+        mean_gap_seconds: float = 3.0,
+        name_pool_size: int = 100000,
+    ):
+        self.rng = random.Random(seed)
+        self.description_mu = math.log(description_median)
+        self.description_sigma = description_sigma
+        self.max_description_length = max_description_length
+        self.p_no_hops = p_no_hops
+        self.mean_hops = mean_hops
+        self.duplicate_name_rate = duplicate_name_rate
+        self.p_no_twirls = p_no_twirls
+        self.mean_twirls = mean_twirls
+        self.p_briefcase = p_briefcase
+        self.mean_gap_seconds = mean_gap_seconds
+        self.name_pool_size = name_pool_size
+
+        # One long filler text; descriptions are random slices of it
+        words = [self.rng.choice(FILLER_WORDS) for _ in range(max_description_length // 3)]
+        self.filler = " ".join(words)
+
+        # Bounded pool of recent names that duplicates are drawn from
+        self.name_pool: List[str] = []
+        self.clock = datetime.utcnow() - timedelta(days=days)
+
+    def _geometric(self, mean: float) -> int:
+        """Draw from a geometric distribution (support 1, 2, ...) with the given mean."""
+        p = 1.0 / mean
+        return 1 + int(math.log(1.0 - self.rng.random()) / math.log(1.0 - p)) if p < 1 else 1
+
+    def _description(self) -> Tuple[str, int]:
+        """Return a description and the number of hop words in it."""
+        rng = self.rng
+        length = int(rng.lognormvariate(self.description_mu, self.description_sigma))
+        length = min(max(length, 5), self.max_description_length)
+        offset = rng.randrange(0, len(self.filler) - length)
+        text = self.filler[offset:offset + length].strip() or "silly"
+
+        hops = 0 if rng.random() < self.p_no_hops else self._geometric(self.mean_hops)
+        if hops:
+            # Splice whole hop words in at word boundaries
+            parts = text.split(" ")
+            for _ in range(hops):
+                parts.insert(rng.randrange(0, len(parts) + 1), rng.choice(HOP_WORDS))
+            text = " ".join(parts)
+        return text, hops
+
+    def _walk_name(self) -> Tuple[str, bool]:
+        """Return a walk name and whether it is new, reusing a recent one at the duplicate rate."""
+        rng = self.rng
+        if self.name_pool and rng.random() < self.duplicate_name_rate:
+            return rng.choice(self.name_pool), False
+        # The random suffix makes new names unique without remembering all of them
+        name = f"The {rng.choice(WALK_ADJECTIVES)} {rng.choice(WALK_NOUNS)} {rng.getrandbits(40):010x}"
+        if len(self.name_pool) < self.name_pool_size:
+            self.name_pool.append(name)
+        else:
+            self.name_pool[rng.randrange(self.name_pool_size)] = name
+        return name, True
+
+    def payload(self) -> dict:
+        """
+        Generate one application as an API request payload.
+
+        Returns:
+            dict: Payload accepted by POST /api/v1/applications
+        """
+        rng = self.rng
+        description, hops = self._description()
+        walk_name, new_name = self._walk_name()
+        twirls = 0 if rng.random() < self.p_no_twirls else min(self._geometric(self.mean_twirls), 100)
+        return {
+            "applicant_name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "walk_name": walk_name,
+            "description": description,
+            "has_briefcase": rng.random() < self.p_briefcase,
+            "involves_hopping": hops > 0 or rng.random() < 0.05,
+            "number_of_twirls": twirls,
+            "_hop_count": hops,
+            "_new_name": new_name,
+        }
+
+    def row(self) -> dict:
+        """
+        Generate one application as a row of the `applications` table.
+
+        The silliness score follows the scoring rules, with the originality bonus
+        given to the first application using a walk name.
+
+        Returns:
+            dict: Column values for Application.__table__
+        """
+        rng = self.rng
+        payload = self.payload()
+        hops = payload.pop("_hop_count")
+        new_name = payload.pop("_new_name")
+
+        # Bulk inserts bypass the model, so fill in the derived scoring columns here
+        description_length = len(payload["description"])
+        breakdown = score_breakdown(
+            description_length=description_length,
+            hop_count=hops,
+            has_briefcase=payload["has_briefcase"],
+            number_of_twirls=payload["number_of_twirls"],
+            is_original=new_name,
+        )
+
+        self.clock += timedelta(seconds=rng.expovariate(1.0 / self.mean_gap_seconds))
+        payload.update(
+            id=uuid7(int((self.clock - EPOCH).total_seconds() * 1000), rng.getrandbits(74)),
+            silliness_score=breakdown.total,
+            description_length=description_length,
+            hop_count=hops,
+            is_original=new_name,
+            score_base=breakdown.base,
+            score_briefcase=breakdown.briefcase,
+            score_hopping=breakdown.hopping,
+            score_twirls=breakdown.twirls,
+            score_originality=breakdown.originality,
+            status=rng.choices(STATUSES, weights=STATUS_WEIGHTS)[0],
+            submission_timestamp=self.clock,
+            updated_at=self.clock,
+        )
+        return payload
+
+    def rows(self, count: int) -> Iterator[dict]:
+        """Yield `count` table rows."""
+        for _ in range(count):
+            yield self.row()
+
+    def payloads(self, count: int) -> Iterator[dict]:
+        """Yield `count` API payloads."""
+        for _ in range(count):
+            payload = self.payload()
+            payload.pop("_hop_count")
+            payload.pop("_new_name")
+            yield payload
+
+
+def bulk_load(
+    engine,
+    rows: int,
+    generator: Optional[FixtureGenerator] = None,
+    batch_size: int = 20000,
+    defer_indexes: bool = True,
+    progress: bool = False,
+) -> List[uuid.UUID]:
+    """
+    Bulk-load generated rows into the `applications` table with SQLAlchemy Core.
+
+    Args:
+        engine: Target SQLAlchemy engine
+        rows (int): Number of rows to insert
+        generator (Optional[FixtureGenerator]): Generator to use (default: seed 42)
+        batch_size (int): Rows per executemany batch
+        defer_indexes (bool): Drop secondary indexes during the load and rebuild them afterwards
+        progress (bool): Print progress to stdout
+
+    Returns:
+        List[uuid.UUID]: A sample of up to 10,000 inserted IDs (for read benchmarks)
+    """
+    from app.db.database import Base
+    from app.models.application import Application
+
+    generator = generator or FixtureGenerator()
+    table = Application.__table__
+    Base.metadata.create_all(bind=engine)
+
+    secondary_indexes = [index for index in table.indexes if not index.unique] if defer_indexes else []
+    sample: List[uuid.UUID] = []
+    started = time.perf_counter()
+
+    # A single connection so the SQLite pragmas apply to every batch
+    with engine.connect() as connection:
+        if engine.dialect.name == "sqlite":
+            # Fixture databases are disposable, trade durability for speed
+            connection.exec_driver_sql("PRAGMA synchronous=OFF")
+            connection.exec_driver_sql("PRAGMA journal_mode=MEMORY")
+            connection.commit()
+
+        for index in secondary_indexes:
+            index.drop(connection, checkfirst=True)
+        connection.commit()
+
+        inserted = 0
+        source = generator.rows(rows)
+        while inserted < rows:
+            batch: List[Dict] = [next(source) for _ in range(min(batch_size, rows - inserted))]
+            connection.execute(table.insert(), batch)
+            connection.commit()
+            if len(sample) < 10000:
+                sample.extend(row["id"] for row in batch[:10000 - len(sample)])
+            inserted += len(batch)
+            if progress:
+                elapsed = time.perf_counter() - started
+                print(f"\r{inserted:>12,} rows  {inserted / elapsed:10,.0f} rows/s", end="", flush=True)
+
+        for index in secondary_indexes:
+            index.create(connection, checkfirst=True)
+        connection.commit()
+
+    if progress:
+        print(f"\nLoaded {rows:,} rows in {time.perf_counter() - started:.1f} s")
+    return sample
+
+
+def write_ndjson(path: str, rows: int, generator: Optional[FixtureGenerator] = None) -> None:
+    """
+    Write API payloads as newline-delimited JSON.
+
+    Args:
+        path (str): Output file
+        rows (int): Number of payloads
+        generator (Optional[FixtureGenerator]): Generator to use (default: seed 42)
+    """
+    generator = generator or FixtureGenerator()
+    with open(path, "w", encoding="utf-8") as output_file:
+        for payload in generator.payloads(rows):
+            output_file.write(json.dumps(payload, separators=(",", ":")))
+            output_file.write("\n")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Generate large synthetic application fixtures.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    load_parser = subparsers.add_parser("load", help="Bulk-load rows into a database")
+    load_parser.add_argument("--database-url", required=True, help="Target database URL")
+    load_parser.add_argument("--batch-size", type=int, default=20000, help="Rows per insert batch")
+    load_parser.add_argument("--keep-indexes", action="store_true", help="Maintain indexes during the load")
+
+    ndjson_parser = subparsers.add_parser("ndjson", help="Write API payloads as NDJSON")
+    ndjson_parser.add_argument("--output", required=True, help="Output file")
+
+    for sub in (load_parser, ndjson_parser):
+        sub.add_argument("--rows", type=int, required=True, help="Number of applications to generate")
+        sub.add_argument("--seed", type=int, default=42, help="Random seed")
+        sub.add_argument("--duplicate-name-rate", type=float, default=0.08, help="Fraction of reused walk names")
+        sub.add_argument("--description-median", type=int, default=180, help="Median description length")
+
+    args = parser.parse_args()
+    generator = FixtureGenerator(
+        seed=args.seed,
+        duplicate_name_rate=args.duplicate_name_rate,
+        description_median=args.description_median,
+    )
+
+    if args.command == "ndjson":
+        write_ndjson(args.output, args.rows, generator)
+        print(f"Wrote {args.rows:,} payloads to {args.output}")
+        return 0
+
+    from sqlalchemy import create_engine
+
+    engine = create_engine(args.database_url)
+    bulk_load(
+        engine,
+        args.rows,
+        generator,
+        batch_size=args.batch_size,
+        defer_indexes=not args.keep_indexes,
+        progress=True,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
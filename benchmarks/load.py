@@ -0,0 +1,190 @@
+"""
+In-process ASGI load generator for the API.
+
+Seeds a throw-away SQLite database with the fixture generator (or reuses an
+existing database), then drives POST /api/v1/applications and
+the read endpoints through the ASGI app (no network) at a configurable
+concurrency, and reports throughput and latency percentiles per scenario.
+
+Usage:
+    python benchmarks/load.py [--requests 2000] [--concurrency 16] [--seed-rows 5000]
+                              [--json results/load.json] [--baseline baseline/load.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import compare_to_baseline, environment_info, latency_summary, report_regressions, write_results
+
+SCENARIOS = ("create", "get_by_id", "list")
+
+
+def seed_database(rows: int, seed: int) -> list:
+    """
+    Bulk-load seed applications with the fixture generator.
+
+    Args:
+        rows (int): Number of applications to insert
+        seed (int): Random seed for the generator
+
+    Returns:
+        list: A sample of the seeded application IDs
+    """
+    from app.db.database import create_tables, engine
+    from fixtures import FixtureGenerator, bulk_load
+
+    create_tables()
+    return bulk_load(engine, rows, FixtureGenerator(seed=seed))
+
+
+def sample_existing_ids(limit: int = 10000) -> list:
+    """Read a sample of application IDs from an already populated database."""
+    from app.db.database import SessionLocal
+    from app.models.application import Application
+
+    db = SessionLocal()
+    try:
+        return [row[0] for row in db.query(Application.id).limit(limit).all()]
+    finally:
+        db.close()
+
+
+def load_payloads(path: str, count: int, seed: int) -> list:
+    """
+    Return `count` POST payloads, from an NDJSON file or freshly generated.
+
+    Args:
+        path (str): NDJSON file written by fixtures.py (None to generate)
+        count (int): Number of payloads needed
+        seed (int): Random seed used when generating
+
+    Returns:
+        list: Payload dicts (a file shorter than `count` is cycled)
+    """
+    if path:
+        with open(path, "r", encoding="utf-8") as payload_file:
+            payloads = [json.loads(line) for line in payload_file if line.strip()]
+        return [payloads[i % len(payloads)] for i in range(count)]
+
+    from fixtures import FixtureGenerator
+
+    # A different seed from the seeding run so new walk names stay unique
+    return list(FixtureGenerator(seed=seed + 1).payloads(count))
+
+
+async def run_load(app, api_key: str, seeded_ids: list, args, rng: random.Random) -> dict:
+    """
+    Drive the app with a weighted mix of scenarios.
+
+    Returns:
+        dict: Latency summary per scenario plus an "all" entry
+    """
+    import httpx
+
+    weights = [args.create_weight, args.get_weight, args.list_weight]
+    plan = rng.choices(SCENARIOS, weights=weights, k=args.requests)
+    payloads = load_payloads(args.payloads, len(plan), args.seed)
+    latencies = {name: [] for name in SCENARIOS}
+    errors = {name: 0 for name in SCENARIOS}
+    queue: asyncio.Queue = asyncio.Queue()
+    for index, scenario in enumerate(plan):
+        queue.put_nowait((index, scenario))
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+
+        async def send(index: int, scenario: str) -> httpx.Response:
+            if scenario == "create":
+                return await client.post("/api/v1/applications", json=payloads[index], headers={"X-API-Key": api_key})
+            if scenario == "get_by_id":
+                return await client.get(f"/api/v1/applications/{rng.choice(seeded_ids)}")
+            return await client.get("/api/v1/applications", params={"skip": rng.randint(0, 50) * args.page_size, "limit": args.page_size})
+
+        async def worker():
+            while True:
+                try:
+                    index, scenario = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                started = time.perf_counter()
+                response = await send(index, scenario)
+                latencies[scenario].append(time.perf_counter() - started)
+                if response.status_code >= 400:
+                    errors[scenario] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    results = {}
+    for scenario in SCENARIOS:
+        if latencies[scenario]:
+            results[scenario] = dict(latency_summary(latencies[scenario], elapsed), errors=errors[scenario])
+    all_latencies = [value for values in latencies.values() for value in values]
+    results["all"] = dict(latency_summary(all_latencies, elapsed), errors=sum(errors.values()))
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="In-process load test of the API.")
+    parser.add_argument("--requests", type=int, default=2000, help="Total requests to send")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent in-flight requests")
+    parser.add_argument("--seed-rows", type=int, default=5000, help="Applications to seed before the run")
+    parser.add_argument("--payloads", help="NDJSON file of POST payloads (see fixtures.py ndjson)")
+    parser.add_argument("--page-size", type=int, default=50, help="Page size for list requests")
+    parser.add_argument("--create-weight", type=float, default=1.0, help="Relative weight of POST requests")
+    parser.add_argument("--get-weight", type=float, default=3.0, help="Relative weight of get-by-id requests")
+    parser.add_argument("--list-weight", type=float, default=1.0, help="Relative weight of list requests")
+    parser.add_argument("--database-url", help="Use this database instead of a temporary SQLite file (with --seed-rows 0 to reuse its rows)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="Baseline JSON file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative regression")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Must be set before the app (and its engine) is imported
+        os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(tmp_dir, 'load.db')}"
+
+        from app.config import get_settings
+        from app.main import app
+
+        seeded_ids = seed_database(args.seed_rows, args.seed) if args.seed_rows else sample_existing_ids()
+        benchmarks = asyncio.run(run_load(app, get_settings().api_key, seeded_ids, args, rng))
+
+    for name, summary in benchmarks.items():
+        print(
+            f"{name:<10} n={summary['count']:<6} {summary['throughput_rps']:8.1f} req/s   "
+            f"p50 {summary['p50_ms']:7.2f} ms   p90 {summary['p90_ms']:7.2f} ms   "
+            f"p99 {summary['p99_ms']:7.2f} ms   errors {summary['errors']}"
+        )
+
+    results = {
+        "environment": environment_info(),
+        "parameters": {key: value for key, value in vars(args).items() if key not in ("json_path", "baseline")},
+        "benchmarks": benchmarks,
+    }
+    if args.json_path:
+        write_results(args.json_path, results)
+
+    regressions = []
+    if args.baseline:
+        regressions = compare_to_baseline(
+            benchmarks, args.baseline, args.tolerance,
+            lower_is_better=["p50_ms", "p99_ms"],
+            higher_is_better=["throughput_rps"],
+        )
+    return report_regressions(regressions, args.baseline)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+Micro-benchmarks for the hot functions on the request path.
+
+Measures:
+- ScoringService.calculate_score (without the uniqueness query)
+- ApplicationCreate schema validation
+- sanitize_log_data
+- ApplicationResponse.from_orm
+
+Usage:
+    python benchmarks/micro.py [--json results/micro.json] [--baseline baseline/micro.json]
+"""
+import argparse
+import os
+import sys
+import timeit
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import compare_to_baseline, environment_info, report_regressions, write_results
+
+from app.models.application import Application
+from app.models.schemas import ApplicationCreate, ApplicationResponse
+from app.services.scoring_service import ScoringService
+from app.utils.security import sanitize_log_data
+
+PAYLOAD = {
+    "applicant_name": "John Cleese",
+    "walk_name": "The Ministry Walk",
+    "description": (
+        "A very silly walk involving high leg lifts, a hop, another hop and "
+        "some vigorous hopping along Whitehall while holding a bowler hat. " * 4
+    ),
+    "has_briefcase": True,
+    "involves_hopping": True,
+    "number_of_twirls": 3,
+}
+
+
+def build_cases() -> dict:
+    """Return the callables to benchmark keyed by name."""
+    application = ApplicationCreate(**PAYLOAD)
+    orm_application = Application(
+        id=uuid.uuid4(),
+        silliness_score=35,
+        status="PendingReview",
+        submission_timestamp=datetime.utcnow(),
+        **PAYLOAD,
+    )
+    log_payload = dict(PAYLOAD, api_key="secret", auth_token="secret")
+
+    return {
+        "calculate_score": lambda: ScoringService.calculate_score(application, None, check_uniqueness=False),
+        "schema_validation": lambda: ApplicationCreate(**PAYLOAD),
+        "sanitize_log_data": lambda: sanitize_log_data(log_payload),
+        "response_from_orm": lambda: ApplicationResponse.from_orm(orm_application),
+    }
+
+
+def measure(func, repeat: int, min_time: float) -> dict:
+    """
+    Time a callable with timeit, auto-scaling the loop count.
+
+    Args:
+        func: Callable to measure
+        repeat (int): Number of timing repeats (the best one is reported)
+        min_time (float): Minimum duration of one repeat in seconds
+
+    Returns:
+        dict: Loops per repeat and best/median time per call in microseconds
+    """
+    timer = timeit.Timer(func)
+    loops, elapsed = timer.autorange()
+    if elapsed < min_time:
+        loops = max(int(loops * min_time / max(elapsed, 1e-9)), loops)
+    timings = sorted(t / loops for t in timer.repeat(repeat=repeat, number=loops))
+    return {
+        "loops": loops,
+        "best_us": timings[0] * 1e6,
+        "median_us": timings[len(timings) // 2] * 1e6,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run micro-benchmarks.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repeats per benchmark")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per repeat")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="Baseline JSON file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative slowdown")
+    args = parser.parse_args()
+
+    benchmarks = {}
+    for name, func in build_cases().items():
+        benchmarks[name] = measure(func, args.repeat, args.min_time)
+        print(f"{name:<20} best {benchmarks[name]['best_us']:9.2f} us   median {benchmarks[name]['median_us']:9.2f} us")
+
+    results = {"environment": environment_info(), "benchmarks": benchmarks}
+    if args.json_path:
+        write_results(args.json_path, results)
+
+    regressions = []
+    if args.baseline:
+        regressions = compare_to_baseline(benchmarks, args.baseline, args.tolerance, lower_is_better=["best_us"])
+    return report_regressions(regressions, args.baseline)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
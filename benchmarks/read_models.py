@@ -0,0 +1,141 @@
+"""
+Benchmark of the full and summary read paths for list pages.
+
+Seeds a throw-away SQLite database with large descriptions, then serves pages
+through both list paths at the service layer, as the list endpoint does:
+- full: ORM Application objects -> ApplicationResponse -> JSON
+- summary: Core column projection -> ApplicationSummary rows -> JSON
+
+Reports time per page and peak traced memory per page for each path.
+
+Usage:
+    python benchmarks/read_models.py [--rows 5000] [--description-median 4000] [--page-size 100]
+                                     [--json results/read_models.json] [--baseline baseline/read_models.json]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import compare_to_baseline, environment_info, percentile, report_regressions, write_results
+
+
+def build_cases() -> dict:
+    """Return a function per read path that serves one page as JSON bytes."""
+    from fastapi.encoders import jsonable_encoder
+    from app.models.schemas import dump_summaries
+    from app.services.application_service import ApplicationService
+
+    def full(db, skip: int, limit: int) -> bytes:
+        applications = ApplicationService.get_all_applications(db, skip, limit)
+        return json.dumps(jsonable_encoder(applications)).encode("utf-8")
+
+    def summary(db, skip: int, limit: int) -> bytes:
+        return dump_summaries(ApplicationService.get_application_summaries(db, skip, limit))
+
+    return {"full": full, "summary": summary}
+
+
+def measure(func, session_factory, rows: int, page_size: int, pages: int, seed: int) -> dict:
+    """
+    Serve random pages and record latency and peak traced memory.
+
+    Args:
+        func: Read path taking (db, skip, limit)
+        session_factory: Session factory for the seeded database
+        rows (int): Number of rows in the database
+        page_size (int): Applications per page
+        pages (int): Number of pages to serve
+        seed (int): Random seed for the page offsets
+
+    Returns:
+        dict: Median/p90 milliseconds per page, peak KiB per page and response size
+    """
+    rng = random.Random(seed)
+    offsets = [rng.randrange(0, max(rows - page_size, 1)) for _ in range(pages)]
+    latencies = []
+    peaks = []
+    size = 0
+
+    for skip in offsets:
+        # A fresh session per page, like a request, so the identity map starts empty
+        db = session_factory()
+        try:
+            started = time.perf_counter()
+            body = func(db, skip, page_size)
+            latencies.append(time.perf_counter() - started)
+        finally:
+            db.close()
+
+        db = session_factory()
+        try:
+            tracemalloc.start()
+            body = func(db, skip, page_size)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        finally:
+            db.close()
+        size = len(body)
+
+    latencies.sort()
+    return {
+        "median_ms": statistics.median(latencies) * 1000,
+        "p90_ms": percentile(latencies, 90) * 1000,
+        "peak_kib": statistics.median(peaks) / 1024,
+        "response_bytes": size,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare the full and summary list read paths.")
+    parser.add_argument("--rows", type=int, default=5000, help="Applications to seed")
+    parser.add_argument("--description-median", type=int, default=4000, help="Median description length")
+    parser.add_argument("--page-size", type=int, default=100, help="Applications per page")
+    parser.add_argument("--pages", type=int, default=50, help="Pages to serve per read path")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="Baseline JSON file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative slowdown")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Must be set before the app (and its engine) is imported
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp_dir, 'read_models.db')}"
+
+        from app.db.database import SessionLocal, create_tables, engine
+        from fixtures import FixtureGenerator, bulk_load
+
+        create_tables()
+        bulk_load(engine, args.rows, FixtureGenerator(seed=args.seed, description_median=args.description_median))
+
+        benchmarks = {}
+        for name, func in build_cases().items():
+            benchmarks[name] = measure(func, SessionLocal, args.rows, args.page_size, args.pages, args.seed)
+            result = benchmarks[name]
+            print(
+                f"{name:<8} median {result['median_ms']:8.2f} ms   p90 {result['p90_ms']:8.2f} ms   "
+                f"peak {result['peak_kib']:9.1f} KiB   body {result['response_bytes']:>9,} B"
+            )
+        engine.dispose()
+
+    results = {"environment": environment_info(), "benchmarks": benchmarks}
+    if args.json_path:
+        write_results(args.json_path, results)
+
+    regressions = []
+    if args.baseline:
+        regressions = compare_to_baseline(
+            benchmarks, args.baseline, args.tolerance, lower_is_better=["median_ms", "p90_ms", "peak_kib"]
+        )
+    return report_regressions(regressions, args.baseline)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,279 @@
+"""
+Replay of captured API traffic against an in-process app instance.
+
+Reads capture files written by the traffic capture middleware
+(app/utils/traffic_capture.py, enabled with TRAFFIC_CAPTURE_ENABLED=true) and
+re-drives the requests through the ASGI app (no network), either at the
+recorded pace (--speed 1, or 2 for twice as fast) or as fast as possible with
+--speed 0 and a fixed --concurrency. Reports throughput and latency
+percentiles per route next to the recorded latencies, and counts responses
+whose status or body fingerprint differs from the recording.
+
+Requests are replayed in recorded order. IDs returned by recorded creates are
+mapped to the IDs the replay's creates return, and a request that uses such
+an ID waits for its create, so lookups and status changes of applications
+created during the capture work against an empty database. Applications that
+already existed need a copy of the database taken when the capture started
+(--database-url). Redacted API keys are replaced with --api-key.
+
+Responses are only expected to match the recording when requests run in the
+recorded order: at the recorded pace, or with --speed 0 --concurrency 1.
+Higher concurrency can reorder conflicting writes (e.g. two status changes of
+one application) and so report differences that are not regressions.
+
+Usage:
+    python benchmarks/replay.py traffic/ [--speed 1.0] [--concurrency 16] [--database-url sqlite:///./copy.db]
+                                [--show-diffs 10] [--json results/replay.json] [--baseline baseline/replay.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import compare_to_baseline, environment_info, latency_summary, percentile, report_regressions, write_results
+
+REDACTED = "***REDACTED***"
+_UUID = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", re.IGNORECASE)
+
+
+def route_of(record: dict) -> str:
+    """Method and path of a record with IDs replaced, e.g. "GET /api/v1/applications/{id}"."""
+    return f"{record['method']} {_UUID.sub('{id}', record['path'])}"
+
+
+def referenced_ids(record: dict) -> set:
+    """UUIDs mentioned in a record's path, query or body."""
+    text = record["path"] + record["query"] + (json.dumps(record["body"]) if record["body"] is not None else "")
+    return {match.lower() for match in _UUID.findall(text)}
+
+
+def substitute_ids(text: str, id_map: dict) -> str:
+    """Replace recorded IDs with the IDs created by the replay."""
+    return _UUID.sub(lambda match: id_map.get(match.group(0).lower(), match.group(0)), text)
+
+
+def build_request(record: dict, id_map: dict, api_key: str) -> dict:
+    """
+    Turn a capture record into httpx request arguments.
+
+    Args:
+        record (dict): Capture record
+        id_map (dict): Recorded ID -> replayed ID
+        api_key (str): Key sent in place of redacted credentials
+
+    Returns:
+        dict: method, url, headers and content for httpx.AsyncClient.request
+    """
+    url = substitute_ids(record["path"], id_map)
+    if record["query"]:
+        url += "?" + substitute_ids(record["query"], id_map)
+    headers = {
+        name.replace("_", "-"): api_key if value == REDACTED else value
+        for name, value in record["headers"].items()
+    }
+    content = None
+    if record["body"] is not None:
+        content = substitute_ids(json.dumps(record["body"]), id_map).encode("utf-8")
+    return {"method": record["method"], "url": url, "headers": headers, "content": content}
+
+
+async def replay(app, records: list, api_key: str, speed: float, concurrency: int) -> dict:
+    """
+    Replay records against the app.
+
+    Args:
+        app: ASGI application
+        records (list): Capture records in start-time order
+        api_key (str): Key sent in place of redacted credentials
+        speed (float): Multiple of the recorded pace; 0 replays as fast as possible
+        concurrency (int): In-flight requests when speed is 0
+
+    Returns:
+        dict: Per-route "latencies", "recorded" latencies, "status_diffs", "body_diffs", "errors",
+        the list of "diffs" and the "elapsed" time
+    """
+    import httpx
+    from app.utils.traffic_capture import fingerprint_response
+
+    loop = asyncio.get_running_loop()
+    # Recorded ID -> future of the ID the replayed create returns, and the index of that create
+    created = {}
+    creators = {}
+    for index, record in enumerate(records):
+        recorded_id = (record["response_id"] or "").lower()
+        if recorded_id and record["method"] == "POST" and record["status"] == 201 and recorded_id not in created:
+            created[recorded_id] = loop.create_future()
+            creators[recorded_id] = index
+    id_map = {}
+    results = {
+        "latencies": defaultdict(list),
+        "recorded": defaultdict(list),
+        "status_diffs": defaultdict(int),
+        "body_diffs": defaultdict(int),
+        "errors": defaultdict(int),
+        "diffs": [],
+    }
+
+    # Unhandled app exceptions come back as 500 responses instead of aborting the replay
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://replay") as client:
+
+        async def send(index: int, record: dict) -> None:
+            recorded_id = (record["response_id"] or "").lower()
+            own_id = recorded_id if creators.get(recorded_id) == index else None
+            for referenced_id in referenced_ids(record):
+                if referenced_id in created and creators[referenced_id] < index:
+                    id_map[referenced_id] = await created[referenced_id]
+
+            route = route_of(record)
+            replayed_id = own_id
+            try:
+                started = time.perf_counter()
+                response = await client.request(**build_request(record, id_map, api_key))
+                results["latencies"][route].append(time.perf_counter() - started)
+                results["recorded"][route].append(record["duration_ms"] / 1000)
+                if own_id and response.status_code < 300:
+                    replayed_id = str(response.json().get("id", own_id)).lower()
+            except httpx.HTTPError as e:
+                # Count the failure and keep replaying the rest of the capture
+                results["errors"][route] += 1
+                results["diffs"].append((route, f"request failed: {e!r}"))
+                return
+            finally:
+                # Release the requests waiting for this create, even if it failed
+                if own_id:
+                    created[own_id].set_result(replayed_id)
+
+            if response.status_code >= 500:
+                results["errors"][route] += 1
+            if response.status_code != record["status"]:
+                results["status_diffs"][route] += 1
+                results["diffs"].append((route, f"status {record['status']} -> {response.status_code}"))
+            elif record["fingerprint"] and fingerprint_response(response.content) != record["fingerprint"]:
+                results["body_diffs"][route] += 1
+                results["diffs"].append((route, "response body differs"))
+
+        started = time.perf_counter()
+        if speed > 0:
+            first = records[0]["started"] if records else 0.0
+
+            async def send_at(index: int, record: dict) -> None:
+                await asyncio.sleep(max((record["started"] - first) / speed - (time.perf_counter() - started), 0))
+                await send(index, record)
+
+            await asyncio.gather(*(send_at(index, record) for index, record in enumerate(records)))
+        else:
+            queue: asyncio.Queue = asyncio.Queue()
+            for index, record in enumerate(records):
+                queue.put_nowait((index, record))
+
+            async def worker() -> None:
+                while not queue.empty():
+                    await send(*queue.get_nowait())
+
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+        results["elapsed"] = time.perf_counter() - started
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Replay captured API traffic against an in-process app.")
+    parser.add_argument("paths", nargs="+", help="Capture files or directories")
+    parser.add_argument("--speed", type=float, default=1.0, help="Multiple of the recorded pace (0 = as fast as possible)")
+    parser.add_argument("--concurrency", type=int, default=16, help="In-flight requests with --speed 0")
+    parser.add_argument("--limit", type=int, help="Replay only the first N requests")
+    parser.add_argument("--database-url", help="Database to replay against (a copy taken when the capture started)")
+    parser.add_argument("--api-key", help="API key sent in place of redacted keys (defaults to SILLY_WALK_API_KEY)")
+    parser.add_argument("--show-diffs", type=int, default=10, help="Differing responses to print")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="Baseline JSON file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative regression")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Must be set before the app (and its settings) is imported; never capture the replay itself
+        os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(tmp_dir, 'replay.db')}"
+        os.environ.pop("DATABASE_SHARD_URLS", None)
+        os.environ["TRAFFIC_CAPTURE_ENABLED"] = "false"
+
+        from app.config import get_settings
+        from app.db.database import create_tables
+        from app.main import app
+        from app.utils.traffic_capture import read_capture
+
+        records = read_capture(args.paths)
+        skipped = sum(1 for record in records if record["body_omitted"])
+        records = [record for record in records if not record["body_omitted"]][:args.limit]
+        if not records:
+            print("No replayable requests found")
+            return 1
+
+        create_tables()
+        results = asyncio.run(
+            replay(app, records, args.api_key or get_settings().api_key, args.speed, args.concurrency)
+        )
+
+    elapsed = results["elapsed"]
+    benchmarks = {}
+    all_latencies = []
+    for route in sorted(results["latencies"]):
+        latencies = results["latencies"][route]
+        all_latencies.extend(latencies)
+        recorded = sorted(results["recorded"][route])
+        benchmarks[route] = dict(
+            latency_summary(latencies, elapsed),
+            recorded_p50_ms=percentile(recorded, 50) * 1000,
+            recorded_p99_ms=percentile(recorded, 99) * 1000,
+            status_diffs=results["status_diffs"][route],
+            body_diffs=results["body_diffs"][route],
+            errors=results["errors"][route],
+        )
+    benchmarks["all"] = dict(
+        latency_summary(all_latencies, elapsed),
+        status_diffs=sum(results["status_diffs"].values()),
+        body_diffs=sum(results["body_diffs"].values()),
+        errors=sum(results["errors"].values()),
+    )
+
+    pace = f"{args.speed:g}x recorded pace" if args.speed > 0 else f"as fast as possible, concurrency {args.concurrency}"
+    print(f"Replayed {len(records)} request(s) ({pace}); {skipped} without a replayable body skipped")
+    for route, summary in benchmarks.items():
+        recorded = f"   recorded p50 {summary['recorded_p50_ms']:7.2f} ms" if "recorded_p50_ms" in summary else ""
+        print(
+            f"{route:<52} n={summary['count']:<6} {summary['throughput_rps']:8.1f} req/s   "
+            f"p50 {summary['p50_ms']:7.2f} ms   p99 {summary['p99_ms']:7.2f} ms{recorded}   "
+            f"status diffs {summary['status_diffs']}   body diffs {summary['body_diffs']}"
+        )
+    for route, description in results["diffs"][:args.show_diffs]:
+        print(f"  differs: {route}: {description}")
+
+    output = {
+        "environment": environment_info(),
+        "parameters": {
+            "captures": args.paths, "requests": len(records), "skipped": skipped,
+            "speed": args.speed, "concurrency": args.concurrency,
+        },
+        "benchmarks": benchmarks,
+    }
+    if args.json_path:
+        write_results(args.json_path, output)
+
+    regressions = []
+    if args.baseline:
+        regressions = compare_to_baseline(
+            benchmarks, args.baseline, args.tolerance,
+            lower_is_better=["p50_ms", "p99_ms"],
+            higher_is_better=["throughput_rps"],
+        )
+    return report_regressions(regressions, args.baseline)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""
+Benchmark of aggregate write throughput over hash-sharded SQLite files.
+
+For each shard count (default 1, 2 and 4), creates that many throw-away SQLite
+files and starts --processes writer processes, each with DATABASE_SHARD_URLS
+pointing at them. Every process submits --rows-per-process fixture payloads
+through ApplicationService.create_application (originality check, scoring,
+insert, changelog, commit), and the aggregate rate over the whole run is
+reported. SQLite serialises writers per file, so the rate should grow roughly
+with the number of shards until the processes, not the files, are the limit.
+
+Usage:
+    python benchmarks/sharding.py [--shards 1,2,4] [--processes 4] [--rows-per-process 2000]
+                                  [--json results/sharding.json] [--baseline baseline/sharding.json]
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import compare_to_baseline, environment_info, latency_summary, report_regressions, write_results
+
+
+def write_applications(shard_urls: str, rows: int, seed: int, start_at: float) -> dict:
+    """
+    Submit applications from one writer process.
+
+    Args:
+        shard_urls (str): Value for DATABASE_SHARD_URLS
+        rows (int): Applications to submit
+        seed (int): Fixture seed of this process (walk names must not collide)
+        start_at (float): time.time() at which all writers start
+
+    Returns:
+        dict: Start and end wall-clock times, failed submissions and per-request latencies
+    """
+    # Set before the app (and its engines) is imported in this process
+    os.environ["DATABASE_SHARD_URLS"] = shard_urls
+
+    from app.db.database import SessionLocal
+    from app.models.schemas import ApplicationCreate
+    from app.services.application_service import ApplicationService
+    from fixtures import FixtureGenerator
+
+    generator = FixtureGenerator(seed=seed)
+    payloads = [ApplicationCreate(**payload) for payload in generator.payloads(rows)]
+
+    time.sleep(max(start_at - time.time(), 0))
+    started = time.time()
+    latencies = []
+    failed = 0
+    for payload in payloads:
+        db = SessionLocal()
+        try:
+            request_started = time.perf_counter()
+            ApplicationService.create_application(db, payload)
+            latencies.append(time.perf_counter() - request_started)
+        except Exception:
+            failed += 1
+        finally:
+            db.close()
+    return {"started": started, "finished": time.time(), "failed": failed, "latencies": latencies}
+
+
+def run(tmp_dir: str, shard_count: int, processes: int, rows_per_process: int, seed: int, journal_mode: str) -> dict:
+    """Run all writers against `shard_count` fresh shard files and summarise."""
+    from sqlalchemy import create_engine
+    from app.db.database import Base
+    from app.db.migrations import stamp_latest
+    import app.models.application  # noqa: F401  (registers the tables on Base.metadata)
+
+    urls = []
+    for shard in range(shard_count):
+        url = f"sqlite:///{os.path.join(tmp_dir, f'shards{shard_count}-{shard}.db')}"
+        shard_engine = create_engine(url)
+        Base.metadata.create_all(shard_engine)
+        stamp_latest(shard_engine)
+        with shard_engine.connect() as connection:
+            # Persistent: the writers' connections use it too
+            connection.exec_driver_sql(f"PRAGMA journal_mode={journal_mode}")
+        shard_engine.dispose()
+        urls.append(url)
+
+    # Fresh interpreters, so each writer builds its own engines from DATABASE_SHARD_URLS
+    context = multiprocessing.get_context("spawn")
+    start_at = time.time() + 3
+    with context.Pool(processes) as pool:
+        results = pool.starmap(
+            write_applications,
+            [(",".join(urls), rows_per_process, seed + worker, start_at) for worker in range(processes)]
+        )
+
+    elapsed = max(result["finished"] for result in results) - min(result["started"] for result in results)
+    latencies = [latency for result in results for latency in result["latencies"]]
+    summary = latency_summary(latencies, elapsed)
+    written = len(latencies)
+    return {
+        "rows_per_s": written / elapsed,
+        "failed": sum(result["failed"] for result in results),
+        "p50_ms": summary["p50_ms"],
+        "p99_ms": summary["p99_ms"],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark write throughput over sharded SQLite files.")
+    parser.add_argument("--shards", default="1,2,4", help="Comma-separated shard counts to compare")
+    parser.add_argument("--processes", type=int, default=4, help="Concurrent writer processes")
+    parser.add_argument("--rows-per-process", type=int, default=2000, help="Applications submitted per process")
+    parser.add_argument("--journal-mode", default="wal", help="SQLite journal mode of the shard files")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="Baseline JSON file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative slowdown")
+    args = parser.parse_args()
+
+    benchmarks = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # The parent only uses the app's metadata; keep its default database out of the way
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp_dir, 'unused.db')}"
+
+        for shard_count in [int(count) for count in args.shards.split(",")]:
+            result = run(tmp_dir, shard_count, args.processes, args.rows_per_process, args.seed, args.journal_mode)
+            benchmarks[f"shards_{shard_count}"] = result
+            print(
+                f"{shard_count} shard(s): {result['rows_per_s']:8,.0f} applications/s   "
+                f"p50 {result['p50_ms']:6.2f} ms   p99 {result['p99_ms']:7.2f} ms   failed {result['failed']}"
+            )
+
+    results = {"environment": environment_info(), "benchmarks": benchmarks}
+    if args.json_path:
+        write_results(args.json_path, results)
+
+    regressions = []
+    if args.baseline:
+        regressions = compare_to_baseline(
+            benchmarks,
+            args.baseline,
+            args.tolerance,
+            lower_is_better=["p50_ms", "p99_ms"],
+            higher_is_better=["rows_per_s"],
+        )
+    return report_regressions(regressions, args.baseline)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
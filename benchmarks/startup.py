@@ -0,0 +1,93 @@
+"""
+Cold-start benchmark.
+
+Starts fresh interpreters and reports, for each run:
+- import time of app.main
+- time from interpreter start to the first 200 response from /health
+  (including application startup events)
+
+Usage:
+    python benchmarks/startup.py [--runs 5] [--json results.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Executed in a fresh interpreter for every run
+PROBE = r"""
+import json, time
+t0 = time.perf_counter()
+import app.main
+t1 = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app.main.app) as client:
+    response = client.get("/health")
+    t2 = time.perf_counter()
+    assert response.status_code == 200, response.status_code
+print(json.dumps({"import_s": t1 - t0, "first_200_s": t2 - t0}))
+"""
+
+
+def run_once(env: dict) -> dict:
+    """
+    Measure one cold start in a subprocess.
+
+    Args:
+        env (dict): Environment for the child interpreter
+
+    Returns:
+        dict: Timings in seconds
+    """
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=REPO_ROOT,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure API cold-start time.")
+    parser.add_argument("--runs", type=int, default=5, help="Number of cold starts to measure")
+    parser.add_argument("--json", dest="json_path", help="Optional file to write the results to")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        env = dict(os.environ)
+        env.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tmp_dir, 'startup.db')}")
+
+        runs = [run_once(env) for _ in range(args.runs)]
+
+    results = {
+        "runs": args.runs,
+        "import_ms": {
+            "median": statistics.median(r["import_s"] for r in runs) * 1000,
+            "min": min(r["import_s"] for r in runs) * 1000,
+        },
+        "first_200_ms": {
+            "median": statistics.median(r["first_200_s"] for r in runs) * 1000,
+            "min": min(r["first_200_s"] for r in runs) * 1000,
+        },
+    }
+
+    print(f"import app.main:      median {results['import_ms']['median']:.1f} ms (min {results['import_ms']['min']:.1f} ms)")
+    print(f"first 200 on /health: median {results['first_200_ms']['median']:.1f} ms (min {results['first_200_ms']['min']:.1f} ms)")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as json_file:
+            json.dump(results, json_file, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+Primary-key layout benchmark.
+
+Compares insert throughput and primary-key index size in SQLite for:
+- uuid4-hex:    random UUIDv4 stored as a 32-character hex string (previous layout)
+- uuid7-binary: time-ordered UUIDv7 stored as 16 bytes (current layout)
+
+Each scheme inserts into its own database file with a table shaped like
+`applications` (rowid table, PRIMARY KEY index on id). Insert throughput is
+reported for the last 10% of rows, when the index no longer fits in cache.
+
+Usage:
+    python benchmarks/uuid_keys.py [--rows 1000000,10000000] [--cache-mb 64] [--json results/uuid_keys.json]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import environment_info, write_results
+
+from sqlalchemy import Column, Integer, MetaData, Table, Uuid, create_engine
+
+from app.db.types import BinaryUUID
+from app.utils.ids import uuid7
+
+SCHEMES = {
+    "uuid4-hex": (lambda: Uuid(as_uuid=True), uuid.uuid4),
+    "uuid7-binary": (lambda: BinaryUUID(), uuid7),
+}
+
+
+def run_scheme(path: str, column_type, id_factory, rows: int, batch_size: int, cache_mb: int) -> dict:
+    """
+    Insert `rows` keys with one scheme and measure throughput and index size.
+
+    Returns:
+        dict: rows, overall and steady-state inserts/s, index and file size in MB
+    """
+    engine = create_engine(f"sqlite:///{path}")
+    metadata = MetaData()
+    table = Table(
+        "applications",
+        metadata,
+        Column("id", column_type, primary_key=True),
+        Column("silliness_score", Integer, nullable=False),
+    )
+    metadata.create_all(engine)
+
+    tail_start_row = int(rows * 0.9)
+    tail_started = None
+    inserted = 0
+
+    with engine.connect() as connection:
+        # Bound the page cache so the benchmark reflects a table larger than memory
+        connection.exec_driver_sql(f"PRAGMA cache_size = -{cache_mb * 1024}")
+        connection.exec_driver_sql("PRAGMA synchronous = OFF")
+        connection.commit()
+
+        started = time.perf_counter()
+        while inserted < rows:
+            if tail_started is None and inserted >= tail_start_row:
+                tail_started = time.perf_counter()
+            count = min(batch_size, rows - inserted)
+            connection.execute(table.insert(), [{"id": id_factory(), "silliness_score": 0} for _ in range(count)])
+            connection.commit()
+            inserted += count
+        finished = time.perf_counter()
+
+        index_bytes = connection.exec_driver_sql(
+            "SELECT SUM(pgsize) FROM dbstat WHERE name LIKE 'sqlite_autoindex_applications%'"
+        ).scalar() or 0
+
+    engine.dispose()
+    tail_rows = rows - tail_start_row
+    return {
+        "rows": rows,
+        "inserts_per_s": rows / (finished - started),
+        "steady_state_inserts_per_s": tail_rows / (finished - tail_started) if tail_started else None,
+        "pk_index_mb": index_bytes / 1e6,
+        "file_mb": os.path.getsize(path) / 1e6,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare primary-key layouts in SQLite.")
+    parser.add_argument("--rows", default="1000000,10000000", help="Comma-separated row counts")
+    parser.add_argument("--batch-size", type=int, default=10000, help="Rows per insert transaction")
+    parser.add_argument("--cache-mb", type=int, default=64, help="SQLite page cache size in MB")
+    parser.add_argument("--schemes", default=",".join(SCHEMES), help="Comma-separated schemes to run")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    benchmarks = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for rows in (int(value) for value in args.rows.split(",")):
+            for name in args.schemes.split(","):
+                column_type, id_factory = SCHEMES[name]
+                path = os.path.join(tmp_dir, f"{name}-{rows}.db")
+                result = run_scheme(path, column_type(), id_factory, rows, args.batch_size, args.cache_mb)
+                os.remove(path)
+                benchmarks[f"{name}@{rows}"] = result
+                print(
+                    f"{name:<13} {rows:>11,} rows  {result['inserts_per_s']:10,.0f} ins/s  "
+                    f"(last 10%: {result['steady_state_inserts_per_s']:10,.0f} ins/s)  "
+                    f"pk index {result['pk_index_mb']:8.1f} MB  file {result['file_mb']:8.1f} MB"
+                )
+
+    if args.json_path:
+        write_results(args.json_path, {"environment": environment_info(), "benchmarks": benchmarks})
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
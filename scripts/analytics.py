@@ -0,0 +1,116 @@
+"""
+Export and query the analytics snapshot.
+
+`export` writes the applications table, including archived applications, to a
+memory-mapped columnar snapshot. `report` prints aggregates computed from the
+snapshot alone, so analysts never query the live database. Reports need numpy
+(listed in requirements.txt).
+
+Usage:
+    python scripts/analytics.py export [--output analytics/applications.snapshot]
+        [--database-url sqlite:///./silly_walks.db] [--no-archived]
+    python scripts/analytics.py report [--snapshot analytics/applications.snapshot]
+        [--report scores|twirls|daily|statuses] [--since 2024-01-01] [--json]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import date
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def export(args) -> int:
+    """Write a new snapshot from the database."""
+    from app.analytics.snapshot import export_snapshot
+    from app.db.database import create_tables, engines
+
+    # Brings older databases up to date so all snapshot columns exist
+    create_tables()
+
+    started = time.perf_counter()
+    rows = export_snapshot(engines, args.output, include_archived=not args.no_archived)
+    print(f"Exported {rows:,} application(s) to {args.output} in {time.perf_counter() - started:.1f} s")
+    return 0
+
+
+def report(args) -> int:
+    """Print the selected reports."""
+    from app.analytics import queries
+    from app.analytics.snapshot import Snapshot
+
+    since = date.fromisoformat(args.since) if args.since else None
+    reports = {
+        "scores": lambda snapshot: queries.average_score_by_features(snapshot),
+        "twirls": lambda snapshot: queries.twirl_distribution(snapshot),
+        "daily": lambda snapshot: {
+            day.isoformat(): count for day, count in queries.submissions_per_day(snapshot, since).items()
+        },
+        "statuses": lambda snapshot: queries.status_counts(snapshot),
+    }
+    selected = args.report or list(reports)
+
+    results = {}
+    with Snapshot(args.snapshot) as snapshot:
+        print(f"Snapshot of {snapshot.row_count:,} applications taken {snapshot.created_at:%Y-%m-%d %H:%M} UTC", file=sys.stderr)
+        for name in selected:
+            started = time.perf_counter()
+            results[name] = reports[name](snapshot)
+            print(f"{name}: {(time.perf_counter() - started) * 1000:.1f} ms", file=sys.stderr)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    for name, result in results.items():
+        print(f"\n== {name}")
+        if name == "scores":
+            for group in result:
+                print(
+                    f"briefcase={group['has_briefcase']!s:<5}  hopping={group['involves_hopping']!s:<5}  "
+                    f"applications={group['count']:>10,}  average score={group['mean']:6.2f}"
+                )
+        else:
+            for key, count in result.items():
+                print(f"{key!s:<26} {count:>10,}")
+    return 0
+
+
+def main() -> int:
+    sys.path.insert(0, REPO_ROOT)
+    from app.config import get_settings
+
+    parser = argparse.ArgumentParser(description="Analytics snapshot of applications.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="Write a snapshot from the database")
+    export_parser.add_argument("--output", help="Snapshot file (defaults to ANALYTICS_SNAPSHOT_PATH)")
+    export_parser.add_argument("--database-url", help="Database to export (defaults to DATABASE_URL)")
+    export_parser.add_argument("--no-archived", action="store_true", help="Leave out archived applications")
+
+    report_parser = subparsers.add_parser("report", help="Print aggregates from a snapshot")
+    report_parser.add_argument("--snapshot", help="Snapshot file (defaults to ANALYTICS_SNAPSHOT_PATH)")
+    report_parser.add_argument(
+        "--report", action="append", choices=("scores", "twirls", "daily", "statuses"),
+        help="Report to print (repeatable; default all)"
+    )
+    report_parser.add_argument("--since", help="First day (YYYY-MM-DD) for the daily report")
+    report_parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args()
+
+    if getattr(args, "database_url", None):
+        os.environ["DATABASE_URL"] = args.database_url
+        get_settings.cache_clear()
+
+    snapshot_path = get_settings().analytics_snapshot_path
+    if args.command == "export":
+        args.output = args.output or snapshot_path
+        return export(args)
+    args.snapshot = args.snapshot or snapshot_path
+    return report(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
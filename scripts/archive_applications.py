@@ -0,0 +1,81 @@
+"""
+Archive decided applications.
+
+Moves applications that are ApprovedForFunding or RegrettablyNotSillyEnough and
+were last modified more than --older-than-days ago out of the applications table
+into append-only segment files under ARCHIVE_DIR. Archived applications stay
+retrievable through GET /api/v1/applications/{id}. Also purges Idempotency-Key
+records older than IDEMPOTENCY_TTL_SECONDS.
+
+Safe to run repeatedly (e.g. nightly); each run appends new segments.
+
+Usage:
+    python scripts/archive_applications.py [--older-than-days 90] [--segment-rows 10000]
+        [--database-url sqlite:///./silly_walks.db] [--vacuum]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Move old decided applications to archive segments.")
+    parser.add_argument("--older-than-days", type=float, help="Minimum age in days (defaults to ARCHIVE_AFTER_DAYS)")
+    parser.add_argument("--segment-rows", type=int, help="Applications per segment (defaults to ARCHIVE_SEGMENT_ROWS)")
+    parser.add_argument("--database-url", help="Database to archive from (defaults to DATABASE_URL)")
+    parser.add_argument("--vacuum", action="store_true", help="VACUUM the SQLite database afterwards to return space")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+
+    sys.path.insert(0, REPO_ROOT)
+    from app.config import get_settings
+    from app.db.database import SessionLocal, create_tables, engines, shard_sessions
+    from app.db.repository import IdempotencyKeyRepository
+    from app.services.archive_service import ArchiveService
+
+    settings = get_settings()
+    older_than_days = args.older_than_days if args.older_than_days is not None else settings.archive_after_days
+    segment_rows = args.segment_rows or settings.archive_segment_rows
+
+    # Brings older databases up to date so the archive index exists
+    create_tables()
+
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        archived = ArchiveService.archive_decided(
+            db, datetime.utcnow() - timedelta(days=older_than_days), segment_rows
+        )
+    finally:
+        db.close()
+    print(f"Archived {archived} application(s) to {settings.archive_dir} in {time.perf_counter() - started:.1f} s")
+
+    purged = 0
+    for session_factory in shard_sessions:
+        shard_db = session_factory()
+        try:
+            purged += IdempotencyKeyRepository.purge_expired(
+                shard_db, datetime.utcnow() - timedelta(seconds=settings.idempotency_ttl_seconds)
+            )
+        finally:
+            shard_db.close()
+    print(f"Purged {purged} expired idempotency key(s)")
+
+    if args.vacuum and archived:
+        for shard_engine in engines:
+            if shard_engine.dialect.name != "sqlite":
+                continue
+            with shard_engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+                connection.exec_driver_sql("VACUUM")
+            print(f"Vacuumed {shard_engine.url.database}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""
+Build-time OpenAPI schema generation.
+
+Converts the maintained specification in docs/api/openapi.yaml into a JSON file
+that the API can serve directly (see OPENAPI_SCHEMA_FILE), so workers never have
+to generate the schema from the routes at runtime.
+
+Usage:
+    python scripts/build_openapi.py [--source docs/api/openapi.yaml] [--output docs/api/openapi.json]
+    python scripts/build_openapi.py --from-app   # generate from the FastAPI routes instead
+"""
+import argparse
+import json
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SOURCE = os.path.join(REPO_ROOT, "docs", "api", "openapi.yaml")
+DEFAULT_OUTPUT = os.path.join(REPO_ROOT, "docs", "api", "openapi.json")
+
+
+def load_yaml_schema(path: str) -> dict:
+    """
+    Load the OpenAPI specification from a YAML file.
+
+    Args:
+        path (str): Path to the YAML specification
+
+    Returns:
+        dict: Parsed OpenAPI schema
+    """
+    import yaml
+
+    with open(path, "r", encoding="utf-8") as source_file:
+        return yaml.safe_load(source_file)
+
+
+def generate_app_schema() -> dict:
+    """
+    Generate the OpenAPI schema from the FastAPI application routes.
+
+    Returns:
+        dict: OpenAPI schema as served by the application
+    """
+    sys.path.insert(0, REPO_ROOT)
+    # Make sure we generate from the routes, not from a previously built file
+    os.environ.pop("OPENAPI_SCHEMA_FILE", None)
+    from app.main import app
+
+    return app.openapi()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Pre-generate the OpenAPI schema as JSON.")
+    parser.add_argument("--source", default=DEFAULT_SOURCE, help="YAML specification to convert")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Where to write the JSON schema")
+    parser.add_argument("--from-app", action="store_true", help="Generate from the FastAPI routes instead of YAML")
+    args = parser.parse_args()
+
+    schema = generate_app_schema() if args.from_app else load_yaml_schema(args.source)
+
+    with open(args.output, "w", encoding="utf-8") as output_file:
+        json.dump(schema, output_file, separators=(",", ":"), default=str)
+
+    print(f"Wrote OpenAPI schema to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
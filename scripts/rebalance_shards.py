@@ -0,0 +1,166 @@
+"""
+Move applications to their shards after the list of database shards changed.
+
+Applications are assigned to shards by a jump consistent hash of their ID
+(app/db/sharding.py), so when shards are added only the applications that now
+belong to a new shard move, about 1/N of them per added shard. Shards that are
+being removed are listed with --retired-urls and emptied completely; keep them
+at the end of the old list so the remaining shards keep their positions.
+
+Applications, the archive index of archived applications and pending scoring
+jobs are moved (archive segment files are shared and stay where they are).
+Changelog rows are not moved: change feed clients resynchronise anyway when the
+number of shards changes.
+
+Pause writes (or stop the API) while this runs. Every batch is first copied to
+its new shard and committed, then deleted from the old one, so an interrupted
+run leaves at most a duplicate that the next run resolves; re-running is safe.
+
+Usage:
+    python scripts/rebalance_shards.py [--shard-urls sqlite:///./shard0.db,sqlite:///./shard1.db]
+        [--retired-urls sqlite:///./shard2.db] [--batch-size 500] [--dry-run]
+"""
+import argparse
+import os
+import sys
+import time
+from collections import Counter, defaultdict
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def rebalance_table(table, source, source_engine, target_engines, batch_size: int, dry_run: bool, moves: Counter) -> None:
+    """
+    Move the rows of one table that belong to other shards.
+
+    Args:
+        table: Table keyed by application ID
+        source (int): Number of the source shard (beyond the target shards for retired ones)
+        source_engine: Engine of the source shard
+        target_engines (list): Engines of the target shards, in shard order
+        batch_size (int): IDs scanned and moved per batch
+        dry_run (bool): Only count the rows that would move
+        moves (Counter): (source, target) -> rows moved, updated in place
+    """
+    from sqlalchemy import delete, insert, select
+    from app.db.sharding import shard_for
+
+    key = table.c.id
+    last_id = None
+    while True:
+        query = select(key).order_by(key).limit(batch_size)
+        if last_id is not None:
+            query = query.where(key > last_id)
+        with source_engine.connect() as connection:
+            ids = list(connection.execute(query).scalars())
+        if not ids:
+            return
+        last_id = ids[-1]
+
+        ids_by_target = defaultdict(list)
+        for application_id in ids:
+            target = shard_for(application_id, len(target_engines))
+            if target != source:
+                ids_by_target[target].append(application_id)
+
+        for target, moving in sorted(ids_by_target.items()):
+            moves[(source, target)] += len(moving)
+            if dry_run:
+                continue
+            with source_engine.connect() as connection:
+                rows = [dict(row._mapping) for row in connection.execute(select(table).where(key.in_(moving)))]
+            # Replaces copies left behind by an interrupted run
+            with target_engines[target].begin() as connection:
+                connection.execute(delete(table).where(key.in_(moving)))
+                connection.execute(insert(table), rows)
+            with source_engine.begin() as connection:
+                connection.execute(delete(table).where(key.in_(moving)))
+
+
+def rebalance_scoring_jobs(source, source_engine, target_engines, dry_run: bool, moves: Counter) -> None:
+    """
+    Move the scoring jobs of one shard to the shards of their applications.
+
+    Job IDs are per shard, so moved jobs get new IDs on their target shard. The
+    queue is short, so it is read in one go. A job left behind on the old shard
+    by an interrupted run finds no application there and is simply dropped.
+
+    Args:
+        source (int): Number of the source shard (beyond the target shards for retired ones)
+        source_engine: Engine of the source shard
+        target_engines (list): Engines of the target shards, in shard order
+        dry_run (bool): Only count the jobs that would move
+        moves (Counter): (source, target) -> rows moved, updated in place
+    """
+    from sqlalchemy import delete, insert, select
+    from app.db.sharding import shard_for
+    from app.models.application import ScoringJob
+
+    table = ScoringJob.__table__
+    with source_engine.connect() as connection:
+        jobs = [dict(row._mapping) for row in connection.execute(select(table))]
+
+    jobs_by_target = defaultdict(list)
+    for job in jobs:
+        target = shard_for(job["application_id"], len(target_engines))
+        if target != source:
+            jobs_by_target[target].append(job)
+
+    for target, moving in sorted(jobs_by_target.items()):
+        moves[(source, target)] += len(moving)
+        if dry_run:
+            continue
+        with target_engines[target].begin() as connection:
+            connection.execute(insert(table), [
+                {name: value for name, value in job.items() if name != "id"} for job in moving
+            ])
+        with source_engine.begin() as connection:
+            connection.execute(delete(table).where(table.c.id.in_([job["id"] for job in moving])))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Move applications to their shards after the shard list changed.")
+    parser.add_argument("--shard-urls", help="Comma-separated new shard list (defaults to DATABASE_SHARD_URLS)")
+    parser.add_argument("--retired-urls", default="", help="Comma-separated shards to empty and remove")
+    parser.add_argument("--batch-size", type=int, default=500, help="IDs scanned and moved per batch")
+    parser.add_argument("--dry-run", action="store_true", help="Only report how many rows would move")
+    args = parser.parse_args()
+
+    if args.shard_urls:
+        os.environ["DATABASE_SHARD_URLS"] = args.shard_urls
+
+    sys.path.insert(0, REPO_ROOT)
+    from sqlalchemy import create_engine
+    from app.db.database import create_tables, engines
+    from app.db.migrations import run_migrations
+    from app.models.application import Application, ArchivedApplication
+
+    retired_urls = [url.strip() for url in args.retired_urls.split(",") if url.strip()]
+    retired_engines = [create_engine(url) for url in retired_urls]
+
+    # Creates new shards and brings all of them to the latest schema
+    create_tables()
+    for retired_engine in retired_engines:
+        run_migrations(retired_engine)
+
+    sources = list(enumerate(engines)) + [
+        (len(engines) + position, retired_engine) for position, retired_engine in enumerate(retired_engines)
+    ]
+    moves: Counter = Counter()
+    started = time.perf_counter()
+    for table in (Application.__table__, ArchivedApplication.__table__):
+        for source, source_engine in sources:
+            rebalance_table(table, source, source_engine, engines, args.batch_size, args.dry_run, moves)
+    for source, source_engine in sources:
+        rebalance_scoring_jobs(source, source_engine, engines, args.dry_run, moves)
+
+    for (source, target), count in sorted(moves.items()):
+        source_name = f"shard {source}" if source < len(engines) else f"retired {retired_urls[source - len(engines)]}"
+        print(f"{source_name} -> shard {target}: {count} row(s)")
+    verb = "Would move" if args.dry_run else "Moved"
+    print(f"{verb} {sum(moves.values())} row(s) across {len(engines)} shard(s) in {time.perf_counter() - started:.1f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
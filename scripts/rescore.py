@@ -0,0 +1,47 @@
+"""
+Rescore all applications after a scoring rule change.
+
+Recomputes every score from the stored scoring features (description length,
+hop count, briefcase, twirls, originality) using the weights currently in
+app/utils/scoring_rules.py. Descriptions are not read, so this is a single
+set-based UPDATE even on large tables.
+
+Usage:
+    python scripts/rescore.py [--database-url sqlite:///./silly_walks.db]
+"""
+import argparse
+import os
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Recompute silliness scores from stored features.")
+    parser.add_argument("--database-url", help="Database to rescore (defaults to DATABASE_URL)")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+
+    sys.path.insert(0, REPO_ROOT)
+    from app.db.database import SessionLocal, create_tables
+    from app.services.scoring_service import ScoringService
+
+    # Brings older databases up to date so the feature columns exist
+    create_tables()
+
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        rescored = ScoringService.rescore_all(db)
+    finally:
+        db.close()
+
+    print(f"Rescored {rescored} application(s) in {time.perf_counter() - started:.1f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+Inspect and run the deferred scoring queue.
+
+Submissions get a provisional score and a scoring job when enrichers are
+configured (SCORING_ENRICHERS); the API runs the jobs itself unless
+SCORING_DISPATCHER_ENABLED is false. This script reports the queue, runs the
+dispatcher in its own process (e.g. next to API workers started with
+SCORING_DISPATCHER_ENABLED=false), and requeues jobs that used up their
+attempts once the cause has been fixed.
+
+Usage:
+    python scripts/scoring_jobs.py stats
+    python scripts/scoring_jobs.py run [--drain]
+    python scripts/scoring_jobs.py retry-failed
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Inspect and run the deferred scoring queue.")
+    parser.add_argument("command", choices=["stats", "run", "retry-failed"])
+    parser.add_argument("--drain", action="store_true", help="With run: stop once no job is due")
+    parser.add_argument("--database-url", help="Database to use (defaults to DATABASE_URL)")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+
+    sys.path.insert(0, REPO_ROOT)
+    from app.db.database import create_tables, shard_sessions
+    from app.db.repository import ScoringJobRepository
+    from app.services.scoring_job_service import scoring_dispatcher
+
+    # Brings older databases up to date so the queue table exists
+    create_tables()
+
+    if args.command == "stats":
+        for shard, session_factory in enumerate(shard_sessions):
+            db = session_factory()
+            try:
+                stats = ScoringJobRepository.queue_stats(db)
+            finally:
+                db.close()
+            oldest = stats["oldest_queued"].isoformat() + "Z" if stats["oldest_queued"] else "-"
+            print(
+                f"shard {shard}: {stats['queued']} queued (oldest {oldest}), "
+                f"{stats['running']} running, {stats['failed']} failed"
+            )
+        return 0
+
+    if args.command == "retry-failed":
+        requeued = 0
+        for session_factory in shard_sessions:
+            db = session_factory()
+            try:
+                requeued += ScoringJobRepository.requeue_failed(db)
+            finally:
+                db.close()
+        print(f"Requeued {requeued} failed scoring job(s)")
+        return 0
+
+    if not scoring_dispatcher.enabled:
+        print("No enrichers configured (SCORING_ENRICHERS); nothing to run")
+        return 1
+
+    async def run() -> None:
+        try:
+            if args.drain:
+                await scoring_dispatcher.drain()
+            else:
+                await scoring_dispatcher.run()
+        finally:
+            await scoring_dispatcher.stop()
+
+    started = time.perf_counter()
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    stats = scoring_dispatcher.stats()
+    print(
+        f"Completed {stats['completed_total']}, retried {stats['retried_total']} and failed "
+        f"{stats['failed_total']} scoring job(s) in {time.perf_counter() - started:.1f} s; "
+        f"{stats['queued']} still queued"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
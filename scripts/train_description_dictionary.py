@@ -0,0 +1,171 @@
+"""
+Train a shared compression dictionary for application descriptions.
+
+Samples recent descriptions from the database (or an NDJSON payload file) and
+writes a dictionary for DESCRIPTION_COMPRESSION_DICTIONARIES:
+- zstd: trained with zstandard's dictionary builder (needs `pip install zstandard`)
+- zlib: a preset dictionary of the most valuable recurring word sequences,
+  limited to zlib's 32 KiB window, most valuable last
+
+Usage:
+    python scripts/train_description_dictionary.py --output data/descriptions.dict
+        [--method zlib|zstd] [--database-url sqlite:///./silly_walks.db | --ndjson payloads.ndjson]
+        [--samples 20000] [--size 32768]
+
+Keep previously used dictionaries listed after the new one in
+DESCRIPTION_COMPRESSION_DICTIONARIES so existing rows stay readable.
+"""
+import argparse
+import json
+import os
+import sys
+from collections import Counter
+from typing import List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# zlib can only reference the last 32 KiB, so a larger preset dictionary is wasted
+ZLIB_MAX_DICTIONARY_SIZE = 32 * 1024
+
+
+def sample_from_database(samples: int) -> List[str]:
+    """
+    Read the most recent descriptions from the configured database.
+
+    Args:
+        samples (int): Number of descriptions to read
+
+    Returns:
+        List[str]: Descriptions (decompressed)
+    """
+    sys.path.insert(0, REPO_ROOT)
+    from sqlalchemy import select
+    from app.db.database import SessionLocal
+    from app.models.application import Application
+
+    db = SessionLocal()
+    try:
+        statement = select(Application.description).order_by(Application.id.desc()).limit(samples)
+        return list(db.execute(statement).scalars())
+    finally:
+        db.close()
+
+
+def sample_from_ndjson(path: str, samples: int) -> List[str]:
+    """
+    Read descriptions from an NDJSON payload file (see benchmarks/fixtures.py).
+
+    Args:
+        path (str): NDJSON file
+        samples (int): Maximum number of descriptions to read
+
+    Returns:
+        List[str]: Descriptions
+    """
+    descriptions = []
+    with open(path, "r", encoding="utf-8") as payload_file:
+        for line in payload_file:
+            if len(descriptions) >= samples:
+                break
+            if line.strip():
+                descriptions.append(json.loads(line)["description"])
+    return descriptions
+
+
+def build_zlib_dictionary(descriptions: List[str], size: int, max_words: int = 4) -> bytes:
+    """
+    Build a zlib preset dictionary from recurring word sequences.
+
+    Sequences of 1 to `max_words` words are scored by how many bytes they would
+    save (occurrences x length). The best are packed into the dictionary, with
+    the most valuable at the end where zlib references them most cheaply.
+
+    Args:
+        descriptions (List[str]): Sample descriptions
+        size (int): Maximum dictionary size in bytes
+        max_words (int): Longest word sequence considered
+
+    Returns:
+        bytes: Dictionary content
+    """
+    counts: Counter = Counter()
+    for description in descriptions:
+        words = description.split()
+        for n in range(1, max_words + 1):
+            for start in range(len(words) - n + 1):
+                counts[" ".join(words[start:start + n])] += 1
+
+    scored = sorted(
+        ((count * len(sequence.encode("utf-8")), sequence) for sequence, count in counts.items() if count > 1),
+        reverse=True
+    )
+
+    chosen: List[bytes] = []
+    total = 0
+    text_so_far = ""
+    for _, sequence in scored:
+        if sequence in text_so_far:
+            continue
+        encoded = (sequence + " ").encode("utf-8")
+        if total + len(encoded) > size:
+            continue
+        chosen.append(encoded)
+        total += len(encoded)
+        text_so_far += sequence + " "
+        if total >= size:
+            break
+
+    # Most valuable last
+    return b"".join(reversed(chosen))
+
+
+def build_zstd_dictionary(descriptions: List[str], size: int) -> bytes:
+    """
+    Train a zstd dictionary.
+
+    Args:
+        descriptions (List[str]): Sample descriptions
+        size (int): Dictionary size in bytes
+
+    Returns:
+        bytes: Dictionary content
+    """
+    import zstandard
+
+    samples = [description.encode("utf-8") for description in descriptions]
+    return zstandard.train_dictionary(size, samples).as_bytes()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Train a compression dictionary for descriptions.")
+    parser.add_argument("--output", required=True, help="Dictionary file to write")
+    parser.add_argument("--method", choices=("zlib", "zstd"), default="zlib", help="Codec the dictionary is for")
+    parser.add_argument("--database-url", help="Database to sample (defaults to DATABASE_URL)")
+    parser.add_argument("--ndjson", help="Sample an NDJSON payload file instead of the database")
+    parser.add_argument("--samples", type=int, default=20000, help="Number of descriptions to sample")
+    parser.add_argument("--size", type=int, default=ZLIB_MAX_DICTIONARY_SIZE, help="Dictionary size in bytes")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+
+    descriptions = sample_from_ndjson(args.ndjson, args.samples) if args.ndjson else sample_from_database(args.samples)
+    if not descriptions:
+        print("No descriptions to train on")
+        return 1
+
+    if args.method == "zstd":
+        dictionary = build_zstd_dictionary(descriptions, args.size)
+    else:
+        dictionary = build_zlib_dictionary(descriptions, min(args.size, ZLIB_MAX_DICTIONARY_SIZE))
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "wb") as dictionary_file:
+        dictionary_file.write(dictionary)
+
+    print(f"Wrote {len(dictionary):,} byte {args.method} dictionary from {len(descriptions):,} samples to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,35 @@
+"""
+Shared pytest fixtures.
+
+The app reads its settings and creates its engine when it is imported, so the
+test database is configured here, before any test module imports the app.
+"""
+import os
+import shutil
+import tempfile
+import pytest
+
+_DATABASE_DIR = tempfile.mkdtemp(prefix="silly-walk-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_DATABASE_DIR, 'tests.db')}"
+os.environ["ARCHIVE_DIR"] = os.path.join(_DATABASE_DIR, "archive")
+for _name in ("DATABASE_SHARD_URLS", "SCORING_ENRICHERS", "TRAFFIC_CAPTURE_ENABLED"):
+    os.environ.pop(_name, None)
+
+API_KEY_HEADER = "X-API-Key"
+
+@pytest.fixture(scope="session")
+def client():
+    """TestClient of the app, with startup and shutdown events run."""
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+    shutil.rmtree(_DATABASE_DIR, ignore_errors=True)
+
+@pytest.fixture(scope="session")
+def auth_headers():
+    """Headers with the configured API key."""
+    from app.config import get_settings
+
+    return {API_KEY_HEADER: get_settings().api_key}
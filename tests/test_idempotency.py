@@ -0,0 +1,100 @@
+"""
+Idempotency-Key handling of POST /api/v1/applications.
+"""
+import threading
+import time
+import uuid
+import pytest
+from sqlalchemy import func, select
+from app.utils.query_budget import QueryCounter
+
+@pytest.fixture
+def payload() -> dict:
+    """Application payload with a walk name unique to the test."""
+    return {
+        "applicant_name": "Retry Tester",
+        "walk_name": f"Idempotent Walk {uuid.uuid4().hex}",
+        "description": "A hop, a hop and another hop, exactly once",
+        "has_briefcase": False,
+        "involves_hopping": True,
+        "number_of_twirls": 1,
+    }
+
+def post(client, auth_headers, payload: dict, key: str):
+    return client.post("/api/v1/applications", json=payload, headers={**auth_headers, "Idempotency-Key": key})
+
+def count_applications(walk_name: str) -> int:
+    from app.db.database import SessionLocal
+    from app.models.application import Application
+
+    db = SessionLocal()
+    try:
+        return db.execute(select(func.count()).where(Application.walk_name == walk_name)).scalar()
+    finally:
+        db.close()
+
+def test_replay_returns_stored_response_without_writing(client, auth_headers, payload):
+    key = f"retry-{uuid.uuid4()}"
+    first = post(client, auth_headers, payload, key)
+    assert first.status_code == 201
+    assert "idempotent-replayed" not in first.headers
+
+    with QueryCounter() as queries:
+        retry = post(client, auth_headers, payload, key)
+    assert retry.status_code == 201
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert retry.json() == first.json()
+    queries.assert_exactly(1)
+    for kind in ("insert", "update", "delete"):
+        queries.assert_exactly(0, kind=kind)
+    assert count_applications(payload["walk_name"]) == 1
+
+def test_reused_key_with_different_payload_is_rejected(client, auth_headers, payload):
+    key = f"retry-{uuid.uuid4()}"
+    assert post(client, auth_headers, payload, key).status_code == 201
+
+    response = post(client, auth_headers, {**payload, "number_of_twirls": 9}, key)
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Idempotency-Key was already used with a different request"
+    assert count_applications(payload["walk_name"]) == 1
+
+def test_concurrent_duplicate_waits_for_in_flight_request(client, auth_headers, payload, monkeypatch):
+    from app.db.repository import ApplicationChangeRepository
+
+    # Hold the first request inside its transaction, after its application INSERT
+    in_transaction = threading.Event()
+    release = threading.Event()
+    record = ApplicationChangeRepository.record
+
+    def record_after_release(db, changes):
+        if not in_transaction.is_set():
+            in_transaction.set()
+            assert release.wait(timeout=5)
+        return record(db, changes)
+
+    monkeypatch.setattr(ApplicationChangeRepository, "record", staticmethod(record_after_release))
+
+    key = f"retry-{uuid.uuid4()}"
+    responses = {}
+
+    def send(name: str) -> None:
+        responses[name] = post(client, auth_headers, payload, key)
+
+    first = threading.Thread(target=send, args=("first",))
+    first.start()
+    assert in_transaction.wait(timeout=5)
+    duplicate = threading.Thread(target=send, args=("duplicate",))
+    duplicate.start()
+
+    time.sleep(0.3)
+    assert duplicate.is_alive(), "the duplicate should wait for the in-flight request"
+    release.set()
+    first.join(timeout=10)
+    duplicate.join(timeout=10)
+
+    assert responses["first"].status_code == 201
+    assert "idempotent-replayed" not in responses["first"].headers
+    assert responses["duplicate"].status_code == 201
+    assert responses["duplicate"].headers["idempotent-replayed"] == "true"
+    assert responses["duplicate"].json() == responses["first"].json()
+    assert count_applications(payload["walk_name"]) == 1
@@ -0,0 +1,99 @@
+"""
+Tests for the statement counter in app/utils/query_budget.py.
+"""
+import pytest
+from sqlalchemy import create_engine, text
+from app.utils.query_budget import (
+    QueryBudgetExceeded,
+    QueryCounter,
+    query_budget,
+    statement_kind,
+    statement_shape,
+)
+
+@pytest.fixture
+def engine():
+    """In-memory SQLite engine with a small table."""
+    engine = create_engine("sqlite://")
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE walks (id INTEGER PRIMARY KEY, name TEXT)"))
+        connection.execute(text("INSERT INTO walks (id, name) VALUES (1, 'hop'), (2, 'skip'), (3, 'twirl')"))
+    yield engine
+    engine.dispose()
+
+def run(engine, *statements: str) -> None:
+    """Execute statements in one transaction."""
+    with engine.begin() as connection:
+        for statement in statements:
+            connection.execute(text(statement))
+
+@pytest.mark.parametrize("statement, kind", [
+    ("SELECT 1", "select"),
+    ("  (SELECT 1) UNION (SELECT 2)", "select"),
+    ("WITH recent AS (SELECT 1) SELECT * FROM recent", "select"),
+    ("insert into walks values (4, 'x')", "insert"),
+    ("UPDATE walks SET name = 'x'", "update"),
+    ("DELETE FROM walks", "delete"),
+    ("PRAGMA user_version", "other"),
+    ("", "other"),
+])
+def test_statement_kind(statement, kind):
+    assert statement_kind(statement) == kind
+
+def test_statement_shape_collapses_values():
+    assert statement_shape("SELECT *\n  FROM walks WHERE id = 12 AND name = 'it''s'") == (
+        "SELECT * FROM walks WHERE id = ? AND name = ?"
+    )
+    assert statement_shape("SELECT * FROM walks WHERE id IN (1, 2, 3)") == statement_shape(
+        "SELECT * FROM walks WHERE id IN (?)"
+    ) == "SELECT * FROM walks WHERE id IN (...)"
+    assert statement_shape("INSERT INTO walks VALUES (?, ?), (?, ?), (?, ?)") == "INSERT INTO walks VALUES (?, ?)"
+
+def test_statement_shape_keeps_identifiers_with_digits():
+    assert statement_shape("SELECT walks.col2 FROM walks_v2") == "SELECT walks.col2 FROM walks_v2"
+
+def test_counter_records_only_while_active(engine):
+    counter = QueryCounter(engine)
+    run(engine, "SELECT 1")
+    with counter:
+        run(engine, "SELECT * FROM walks WHERE id = 1", "UPDATE walks SET name = 'x' WHERE id = 2")
+    run(engine, "SELECT 2")
+    assert counter.count == 2
+    assert counter.count_of("select") == 1
+    assert counter.by_kind() == {"select": 1, "update": 1}
+
+def test_counter_detects_repeated_select_shapes(engine):
+    with QueryCounter(engine) as queries:
+        run(engine, *(f"SELECT name FROM walks WHERE id = {number}" for number in (1, 2, 3)))
+        run(engine, "SELECT count(*) FROM walks")
+    assert queries.n_plus_one_suspects() == [("SELECT name FROM walks WHERE id = ?", 3)]
+    assert queries.n_plus_one_suspects(threshold=4) == []
+    with pytest.raises(QueryBudgetExceeded, match="N\\+1"):
+        queries.assert_no_n_plus_one()
+
+def test_repeated_writes_are_not_n_plus_one(engine):
+    with QueryCounter(engine) as queries:
+        run(engine, *(f"UPDATE walks SET name = 'x' WHERE id = {number}" for number in (1, 2, 3)))
+    queries.assert_no_n_plus_one()
+
+def test_exact_and_at_most_budgets(engine):
+    with QueryCounter(engine) as queries:
+        run(engine, "SELECT 1", "SELECT 2")
+    queries.assert_exactly(2)
+    queries.assert_at_most(2)
+    queries.assert_exactly(0, kind="insert")
+    with pytest.raises(QueryBudgetExceeded, match="at most 1 statement"):
+        queries.assert_at_most(1)
+    with pytest.raises(QueryBudgetExceeded, match="exactly 3 statement"):
+        queries.assert_exactly(3)
+    with pytest.raises(ValueError):
+        queries.assert_at_most(1, kind="merge")
+
+def test_query_budget_checks_on_exit(engine):
+    with query_budget(exactly=1, target=engine):
+        run(engine, "SELECT 1")
+    with pytest.raises(QueryBudgetExceeded):
+        with query_budget(max_statements=1, target=engine):
+            run(engine, "SELECT 1", "SELECT 2")
+    with query_budget(allow_n_plus_one=True, target=engine):
+        run(engine, *(f"SELECT name FROM walks WHERE id = {number}" for number in (1, 2, 3)))
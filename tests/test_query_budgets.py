@@ -0,0 +1,115 @@
+"""
+SQL statement budgets of the API endpoints.
+
+Each endpoint runs in-process against the test database, seeded with more than
+one full page of applications, and must stay within its budget without
+repeating a SELECT shape (an N+1 suspect). List and bulk endpoints are checked
+at a small and a large size, because their budget must not depend on it.
+
+Raise a budget only together with the change that needs the extra statement,
+so the increase is reviewed rather than discovered in production.
+"""
+import pytest
+from app.utils.query_budget import QueryCounter, query_budget
+
+SEEDED_APPLICATIONS = 150
+
+# Creating an application: the walk name originality check against live
+# applications and against the archive index (different tables and shards),
+# the application INSERT and its changelog INSERT. The row is not reloaded
+# after the commit.
+CREATE_BUDGET = 4
+
+# Creating with an Idempotency-Key adds the lookup of the key and the INSERT of
+# its record (with the stored response), in the same transaction
+IDEMPOTENT_CREATE_BUDGET = CREATE_BUDGET + 2
+
+# Changing a status: the conditional UPDATE ... RETURNING (which returns the
+# whole row for the response) and its changelog INSERT
+STATUS_CHANGE_BUDGET = 2
+
+# Bulk transitions: one UPDATE ... RETURNING per chunk of IDs and one changelog
+# INSERT for all changed applications
+BULK_TRANSITION_BUDGET = 2
+
+def payload(number: int) -> dict:
+    """Application payload with a walk name unique to `number`."""
+    return {
+        "applicant_name": f"Applicant {number}",
+        "walk_name": f"Budget Walk {number}",
+        "description": "A hop, a skip and a hopping twirl along Whitehall",
+        "has_briefcase": number % 2 == 0,
+        "involves_hopping": True,
+        "number_of_twirls": number % 10,
+    }
+
+@pytest.fixture(scope="module")
+def application_ids(client, auth_headers):
+    """IDs of the applications seeded for this module."""
+    ids = []
+    for number in range(SEEDED_APPLICATIONS):
+        response = client.post("/api/v1/applications", json=payload(number), headers=auth_headers)
+        assert response.status_code == 201, response.text
+        ids.append(response.json()["id"])
+    return ids
+
+def test_create_application(client, auth_headers, application_ids):
+    with query_budget(max_statements=CREATE_BUDGET):
+        response = client.post("/api/v1/applications", json=payload(SEEDED_APPLICATIONS), headers=auth_headers)
+    assert response.status_code == 201
+    created = response.json()
+    assert created["description"] == payload(SEEDED_APPLICATIONS)["description"]
+    assert created["version"] == 1
+    assert created["score_breakdown"]["originality"] == 7
+
+def test_create_application_with_idempotency_key(client, auth_headers, application_ids):
+    headers = {**auth_headers, "Idempotency-Key": "budget-create"}
+    with query_budget(max_statements=IDEMPOTENT_CREATE_BUDGET):
+        response = client.post("/api/v1/applications", json=payload(SEEDED_APPLICATIONS + 1), headers=headers)
+    assert response.status_code == 201
+
+def test_get_application(client, application_ids):
+    with query_budget(exactly=1):
+        response = client.get(f"/api/v1/applications/{application_ids[0]}")
+    assert response.status_code == 200
+
+@pytest.mark.parametrize("view", ["full", "summary"])
+@pytest.mark.parametrize("limit", [5, 100])
+def test_list_applications(client, application_ids, view, limit):
+    with query_budget(exactly=1):
+        response = client.get("/api/v1/applications", params={"limit": limit, "view": view})
+    assert response.status_code == 200
+    assert len(response.json()) == limit
+
+def test_list_applications_not_modified(client, application_ids):
+    params = {"limit": 100, "view": "summary"}
+    etag = client.get("/api/v1/applications", params=params).headers["etag"]
+    with query_budget(exactly=1):
+        response = client.get("/api/v1/applications", params=params, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+def test_update_status(client, auth_headers, application_ids):
+    with query_budget(max_statements=STATUS_CHANGE_BUDGET):
+        response = client.put(
+            f"/api/v1/applications/{application_ids[0]}/status",
+            json={"status": "UnderSillyCouncilReview"},
+            headers=auth_headers
+        )
+    assert response.status_code == 200
+    updated = response.json()
+    assert (updated["status"], updated["version"]) == ("UnderSillyCouncilReview", 2)
+    assert updated["description"] == payload(0)["description"]
+
+@pytest.mark.parametrize("first, last", [(1, 6), (6, SEEDED_APPLICATIONS)])
+def test_bulk_status_transition(client, auth_headers, application_ids, first, last):
+    batch = application_ids[first:last]
+    with QueryCounter() as queries:
+        response = client.post(
+            "/api/v1/applications/status-transitions",
+            json={"application_ids": batch, "status": "UnderSillyCouncilReview"},
+            headers=auth_headers
+        )
+    assert response.status_code == 200
+    assert len(response.json()["updated_ids"]) == len(batch)
+    queries.assert_at_most(BULK_TRANSITION_BUDGET)
+    queries.assert_no_n_plus_one()
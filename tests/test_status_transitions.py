@@ -0,0 +1,99 @@
+"""
+Status transitions of single and bulk updates, and optimistic concurrency.
+"""
+import uuid
+import pytest
+
+PENDING = "PendingReview"
+UNDER_REVIEW = "UnderSillyCouncilReview"
+APPROVED = "ApprovedForFunding"
+
+@pytest.fixture
+def create_application(client, auth_headers):
+    """Factory creating a fresh application and returning its JSON."""
+    def create() -> dict:
+        response = client.post("/api/v1/applications", json={
+            "applicant_name": "Transition Tester",
+            "walk_name": f"Transition Walk {uuid.uuid4().hex}",
+            "description": "A sideways lurch with two hops and a twirl",
+            "has_briefcase": True,
+            "involves_hopping": True,
+            "number_of_twirls": 2,
+        }, headers=auth_headers)
+        assert response.status_code == 201, response.text
+        return response.json()
+    return create
+
+def put_status(client, auth_headers, application_id: str, **body):
+    return client.put(f"/api/v1/applications/{application_id}/status", json=body, headers=auth_headers)
+
+def bulk_transition(client, auth_headers, **body):
+    return client.post("/api/v1/applications/status-transitions", json=body, headers=auth_headers)
+
+def test_disallowed_transition_is_a_conflict(client, auth_headers, create_application):
+    application = create_application()
+    response = put_status(client, auth_headers, application["id"], status=APPROVED)
+    assert response.status_code == 409
+    assert "Cannot change status" in response.text
+    assert client.get(f"/api/v1/applications/{application['id']}").json()["status"] == PENDING
+
+def test_stale_version_is_a_conflict(client, auth_headers, create_application):
+    application = create_application()
+    assert application["version"] == 1
+    first = put_status(client, auth_headers, application["id"], status=UNDER_REVIEW, version=1)
+    assert first.status_code == 200
+    assert first.json()["version"] == 2
+
+    # A second client still holding version 1 must not overwrite the change
+    stale = put_status(client, auth_headers, application["id"], status=PENDING, version=1)
+    assert stale.status_code == 409
+    assert "modified by another request" in stale.text
+    current = client.get(f"/api/v1/applications/{application['id']}").json()
+    assert (current["status"], current["version"]) == (UNDER_REVIEW, 2)
+
+    assert put_status(client, auth_headers, application["id"], status=APPROVED, version=2).status_code == 200
+
+def test_bulk_skips_applications_in_wrong_source_status(client, auth_headers, create_application):
+    pending = create_application()["id"]
+    under_review = create_application()["id"]
+    assert put_status(client, auth_headers, under_review, status=UNDER_REVIEW).status_code == 200
+
+    response = bulk_transition(client, auth_headers, application_ids=[pending, under_review], status=APPROVED)
+    assert response.status_code == 200
+    result = response.json()
+    assert result["updated_ids"] == [under_review]
+    assert result["skipped_ids"] == [pending]
+    assert client.get(f"/api/v1/applications/{pending}").json()["status"] == PENDING
+
+def test_bulk_skips_applications_not_in_from_status(client, auth_headers, create_application):
+    pending = create_application()["id"]
+    under_review = create_application()["id"]
+    assert put_status(client, auth_headers, under_review, status=UNDER_REVIEW).status_code == 200
+
+    # Both are allowed sources of UnderSillyCouncilReview, but only PendingReview is requested
+    response = bulk_transition(
+        client, auth_headers, application_ids=[pending, under_review], status=UNDER_REVIEW, from_status=PENDING
+    )
+    assert response.status_code == 200
+    assert (response.json()["updated_ids"], response.json()["skipped_ids"]) == ([pending], [under_review])
+
+    # A from_status that can never lead to the target skips everything
+    response = bulk_transition(
+        client, auth_headers, application_ids=[pending, under_review], status=APPROVED, from_status=PENDING
+    )
+    assert response.status_code == 200
+    assert (response.json()["updated_ids"], response.json()["skipped_ids"]) == ([], [pending, under_review])
+
+def test_bulk_deduplicates_repeated_ids(client, auth_headers, create_application):
+    first = create_application()["id"]
+    second = create_application()["id"]
+
+    response = bulk_transition(client, auth_headers, application_ids=[first, second, first, first], status=UNDER_REVIEW)
+    assert response.status_code == 200
+    result = response.json()
+    assert result["requested"] == 2
+    assert result["updated"] == 2
+    assert result["updated_ids"] == [first, second]
+    assert result["skipped_ids"] == []
+    # Applied once, not once per repetition
+    assert client.get(f"/api/v1/applications/{first}").json()["version"] == 2